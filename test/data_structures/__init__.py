@@ -1,8 +1,10 @@
 
 __all__ = [
     "GateTest",
-    "CircuitTest"
+    "CircuitTest",
+    "DiagramTest"
 ]
 
 from test.data_structures.circuit.circuit_test import CircuitTest
-from test.data_structures.circuit.gate_test import GateTest
\ No newline at end of file
+from test.data_structures.circuit.gate_test import GateTest
+from test.data_structures.diagram.diagram_test import DiagramTest
\ No newline at end of file
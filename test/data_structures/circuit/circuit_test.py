@@ -89,4 +89,40 @@ class CircuitTest(unittest.TestCase):
         comp = GateComponent(qreg[2], PauliXGateType(), {creg[1]})
         circuit.add_component(comp)
 
-        self.assertEqual(0, comp.step)
\ No newline at end of file
+        self.assertEqual(0, comp.step)
+
+    def test_components_by_step(self):
+        circuit = Circuit()
+        qreg = QuantumRegister(2)
+        circuit.add_register(qreg)
+        self.assertEqual(0, circuit.step_count())
+
+        operation1 = GateComponent(qreg[0], PauliXGateType())
+        operation2 = GateComponent(qreg[1], PauliXGateType())
+        operation3 = GateComponent(qreg[1], PauliXGateType(), {qreg[0]})
+        for operation in [operation1, operation2, operation3]:
+            circuit.add_component(operation)
+
+        self.assertEqual(2, circuit.step_count())
+        self.assertEqual([operation1, operation2], circuit.get_components_by_step(0))
+        self.assertEqual([operation3], circuit.get_components_by_step(1))
+        self.assertEqual(1, circuit.get_last_step(qreg[0]))
+
+    def test_remove_component(self):
+        circuit = Circuit()
+        qreg = QuantumRegister(2)
+        circuit.add_register(qreg)
+
+        operation1 = GateComponent(qreg[0], PauliXGateType())
+        operation2 = GateComponent(qreg[1], PauliXGateType(), {qreg[0]})
+        circuit.add_component(operation1)
+        circuit.add_component(operation2)
+        circuit.remove_component(operation2)
+
+        self.assertEqual(1, circuit.step_count())
+        self.assertEqual(-1, circuit.get_last_step(qreg[1]))
+        self.assertNotIn(operation2, circuit.get_components_affecting_bits({qreg[0], qreg[1]}))
+
+        operation3 = GateComponent(qreg[1], PauliXGateType())
+        circuit.add_component(operation3)
+        self.assertEqual(0, operation3.step)
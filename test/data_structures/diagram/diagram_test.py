@@ -0,0 +1,241 @@
+import os
+import tempfile
+import unittest
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram import INPUT, OUTPUT
+from zxopt.data_structures.diagram.diagram_snapshot import DiagramSnapshot
+from zxopt.data_structures.diagram.diagram_serialization import diagram_to_arrays, diagram_from_arrays, save_diagram, load_diagram
+
+
+class DiagramTest(unittest.TestCase):
+
+    def test_vertex_index(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT, identifier="b_in")
+        s1 = diagram.add_spider(color="green", identifier="s1")
+        s2 = diagram.add_spider(color="red", identifier="s2")
+        b_out = diagram.add_boundary(OUTPUT, identifier="b_out")
+
+        self.assertEqual([int(b_in)], [int(v) for v in diagram.get_inputs()])
+        self.assertEqual([int(b_out)], [int(v) for v in diagram.get_outputs()])
+        self.assertEqual([int(s1), int(s2)], [int(v) for v in diagram.get_spiders()])
+        self.assertEqual([int(s2)], [int(v) for v in diagram.get_spiders_by_color("red")])
+        self.assertEqual(int(s2), int(diagram.get_vertex_from_identifier("s2")))
+
+        diagram.set_spider_color(s2, "green")
+        self.assertEqual([], diagram.get_spiders_by_color("red"))
+
+    def test_vertex_index_after_removal(self):
+        diagram = Diagram()
+        diagram.add_boundary(INPUT, identifier="b_in")
+        s1 = diagram.add_spider(identifier="s1")
+        diagram.add_spider(identifier="s2")
+        diagram.add_boundary(OUTPUT, identifier="b_out")
+
+        diagram.remove_spider(s1)
+
+        self.assertIsNone(diagram.get_vertex_from_identifier("s1"))
+        s2 = diagram.get_vertex_from_identifier("s2")
+        b_out = diagram.get_vertex_from_identifier("b_out")
+        self.assertEqual("s2", diagram.vertex_identifier_prop[s2])
+        self.assertEqual("b_out", diagram.vertex_identifier_prop[b_out])
+        self.assertEqual([int(s2)], [int(v) for v in diagram.get_spiders()])
+        self.assertEqual([int(b_out)], [int(v) for v in diagram.get_outputs()])
+
+        clone = diagram.clone()
+        self.assertEqual(int(s2), int(clone.get_vertex_from_identifier("s2")))
+
+    def test_vectorized_queries(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT)
+        s1 = diagram.add_spider(color="green")
+        s2 = diagram.add_spider(color="red")
+        b_out = diagram.add_boundary(OUTPUT)
+        diagram.add_wire(b_in, s1)
+        diagram.add_wire(s1, s2, is_hadamard=True)
+        diagram.add_wire(s2, b_out)
+
+        self.assertEqual([False, True, True, False], list(diagram.get_spider_mask()))
+        self.assertEqual([False, False, True, False], list(diagram.get_spider_mask("red")))
+        self.assertEqual([True, False, False, True], list(diagram.get_boundary_mask()))
+        self.assertEqual([[int(s1), int(s2)]], diagram.get_wire_endpoints(is_hadamard=True).tolist())
+        self.assertEqual(2, len(diagram.get_wire_endpoints(is_hadamard=False)))
+
+        diagram.set_spider_color(s2, "green")
+        self.assertEqual([False, True, True, False], list(diagram.get_spider_mask("green")))
+
+    def test_deferred_removal(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT, identifier="b_in")
+        s1 = diagram.add_spider(identifier="s1")
+        s2 = diagram.add_spider(identifier="s2")
+        b_out = diagram.add_boundary(OUTPUT, identifier="b_out")
+        diagram.add_wire(b_in, s1)
+        diagram.add_wire(s1, s2)
+        diagram.add_wire(s2, b_out)
+
+        diagram.set_deferred_removal(True)
+        diagram.remove_spider(s1)
+
+        # descriptors stay valid, the spider is only hidden
+        self.assertEqual("s2", diagram.vertex_identifier_prop[s2])
+        self.assertEqual(3, diagram.g.num_vertices())
+        self.assertEqual(1, diagram.get_hidden_vertex_count())
+        self.assertEqual([int(s2)], [int(v) for v in diagram.get_spiders()])
+        self.assertEqual([False, False, True, False], list(diagram.get_spider_mask()))
+        self.assertEqual(1, len(list(s2.all_neighbors())))
+
+        remap = diagram.compact()
+        self.assertEqual([0, -1, 1, 2], remap.tolist())
+        self.assertEqual(0, diagram.get_hidden_vertex_count())
+        self.assertEqual(1, int(diagram.get_vertex_from_identifier("s2")))
+        self.assertEqual(2, int(diagram.get_vertex_from_identifier("b_out")))
+
+    def test_deferred_removal_index(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT, identifier="b_in")
+        s1 = diagram.add_spider(color="green", identifier="s1")
+        s2 = diagram.add_spider(color="red", identifier="s2")
+        diagram.add_wire(b_in, s1)
+        diagram.add_wire(s1, s2)
+        diagram.set_deferred_removal(True)
+
+        diagram.remove_spider(s1)
+        self.assertIsNone(diagram.get_vertex_from_identifier("s1"))
+        self.assertEqual(int(s2), int(diagram.get_vertex_from_identifier("s2")))
+        self.assertEqual([], diagram.get_spiders_by_color("green"))
+        self.assertEqual([int(s2)], diagram.get_spiders_by_degree(0))
+
+        diagram.restore_vertices([int(s1)])
+        self.assertEqual(int(s1), int(diagram.get_vertex_from_identifier("s1")))
+        self.assertEqual([int(s1)], [int(s) for s in diagram.get_spiders_by_color("green")])
+
+        s3 = diagram.add_spider(color="green", identifier="s3")
+        diagram.add_wire(s2, s3)
+        diagram.truncate_vertices(int(s3))
+        self.assertIsNone(diagram.get_vertex_from_identifier("s3"))
+        self.assertEqual(3, diagram.get_vertex_index_count())
+        self.assertEqual([1, 2, 1], list(diagram.get_degrees()))
+        self.assertTrue(diagram.deferred_removal)
+        self.assertEqual(3, diagram.g.num_vertices())
+
+    def test_is_spider_property(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT)
+        s1 = diagram.add_spider()
+        prop = diagram.generate_is_spider_property()
+        self.assertEqual([False, True], list(prop.a))
+
+        s2 = diagram.add_spider()
+        diagram.remove_boundary(b_in)
+        self.assertIs(prop, diagram.generate_is_spider_property())
+        self.assertEqual([True, True], list(prop.a))
+
+    def test_degree_index(self):
+        diagram = Diagram()
+        s1 = diagram.add_spider(color="green")
+        s2 = diagram.add_spider(color="green")
+        s3 = diagram.add_spider(color="red")
+        diagram.add_wire(s1, s2)
+        diagram.add_wire(s1, s2, is_hadamard=True) # parallel wires count as one neighbor
+        diagram.add_wire(s1, s3)
+        diagram.add_wire(s3, s3) # self loops are not counted
+
+        self.assertEqual([2, 1, 1], [diagram.get_degree(s) for s in [s1, s2, s3]])
+        self.assertEqual([int(s2), int(s3)], diagram.get_spiders_by_degree(1))
+        self.assertEqual([int(s2)], diagram.get_spiders_by_degree(1, "green"))
+
+        diagram.remove_wire(s1=s1, s2=s3)
+        self.assertEqual([1, 1, 0], list(diagram.get_degrees()))
+
+        diagram.set_spider_color(s3, "green")
+        self.assertEqual([int(s3)], diagram.get_spiders_by_degree(0, "green"))
+
+        diagram.remove_spider(s2)
+        self.assertEqual([0, 0], list(diagram.get_degrees()))
+        self.assertEqual([0, 1], diagram.get_spiders_by_degree(0, "green"))
+
+    def test_array_round_trip(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT, qubit_index=1, identifier="b_in")
+        s1 = diagram.add_spider(0.5, "red")
+        s2 = diagram.add_spider(0.25, "green", identifier="s2")
+        b_out = diagram.add_boundary(OUTPUT, qubit_index=1)
+        diagram.add_wire(b_in, s1)
+        diagram.add_wire(s1, s2, is_hadamard=True)
+        diagram.add_wire(s2, b_out)
+        diagram.set_deferred_removal(True)
+        diagram.remove_spider(s1)
+
+        copy = diagram_from_arrays(diagram_to_arrays(diagram))
+        self.assertEqual(diagram.get_vertex_index_count(), copy.get_vertex_index_count())
+        self.assertEqual(diagram.get_alive_mask().tolist(), copy.get_alive_mask().tolist())
+        self.assertEqual([int(s2)], [int(v) for v in copy.get_spiders()])
+        self.assertAlmostEqual(0.25, copy.get_spider_phase(copy.g.vertex(int(s2))))
+        self.assertEqual(int(s2), int(copy.get_vertex_from_identifier("s2")))
+        self.assertEqual([int(b_out)], [int(v) for v in copy.get_outputs()])
+        self.assertEqual(1, copy.get_boundary_index(copy.g.vertex(int(b_out))))
+        self.assertEqual(sorted(map(tuple, diagram.get_wire_endpoints().tolist())), sorted(map(tuple, copy.get_wire_endpoints().tolist())))
+
+    def test_save_and_load(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary(INPUT, identifier="b_in")
+        s = diagram.add_spider(0.75, "red")
+        diagram.add_wire(b_in, s, is_hadamard=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "diagram.zxd")
+            save_diagram(diagram, path)
+            for mmap in [True, False]:
+                loaded = load_diagram(path, mmap)
+                self.assertEqual([int(s)], [int(v) for v in loaded.get_spiders_by_color("red")])
+                self.assertAlmostEqual(0.75, loaded.get_spider_phase(loaded.g.vertex(int(s))))
+                self.assertEqual(int(b_in), int(loaded.get_vertex_from_identifier("b_in")))
+                self.assertEqual([True], [loaded.is_wire_hadamard(w) for w in loaded.g.edges()])
+
+            with open(path, "r+b") as f:
+                f.write(b"NOTADIAG")
+            self.assertRaises(ValueError, load_diagram, path)
+
+    def test_split_and_stitch_components(self):
+        diagram = Diagram()
+        for qubit in [0, 1]:
+            b_in = diagram.add_boundary(INPUT, qubit_index=qubit)
+            s = diagram.add_spider(0.5 * (qubit + 1), "green")
+            b_out = diagram.add_boundary(OUTPUT, qubit_index=qubit)
+            diagram.add_wire(b_in, s)
+            diagram.add_wire(s, b_out)
+
+        components = diagram.split_components()
+        self.assertEqual(2, len(components))
+        self.assertEqual([[0, 0], [1, 1]], [sorted(c.get_boundary_index(b) for b in c.get_boundaries()) for c in components])
+
+        stitched = Diagram()
+        for component in components:
+            stitched.add_diagram(component)
+        self.assertEqual(6, stitched.g.num_vertices())
+        self.assertEqual(4, stitched.g.num_edges())
+        self.assertEqual([0.5, 1.0], [stitched.get_spider_phase(s) for s in stitched.get_spiders()])
+        self.assertEqual([0, 1], [stitched.get_boundary_index(b) for b in stitched.get_inputs()])
+
+    def test_snapshot(self):
+        diagram = Diagram()
+        s1 = diagram.add_spider(color="red")
+        s2 = diagram.add_spider(color="green")
+        w = diagram.add_wire(s1, s2)
+
+        snapshot = DiagramSnapshot(diagram)
+        snapshot.set_spider_color(s1, "green")
+        snapshot.set_wire_hadamard(w, True)
+
+        self.assertEqual([int(s1), int(s2)], [int(s) for s in snapshot.get_spiders_by_color("green")])
+        self.assertEqual([], snapshot.get_spiders_by_color("red"))
+        self.assertEqual([int(s1)], [int(s) for s in diagram.get_spiders_by_color("red")])
+        self.assertTrue(snapshot.is_wire_hadamard(w))
+        self.assertEqual("red", diagram.get_spider_color(s1))
+        self.assertFalse(diagram.is_wire_hadamard(w))
+
+        diagram.add_spider()
+        self.assertRaises(AssertionError, snapshot.get_spiders)
+        self.assertRaises(AssertionError, snapshot.get_spiders_by_color, "green")
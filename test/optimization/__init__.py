@@ -0,0 +1,7 @@
+__all__ = [
+    "OptimizerTest",
+    "OptimizationStrategyTest"
+]
+
+from test.optimization.optimizer_test import OptimizerTest
+from test.optimization.optimization_strategy_test import OptimizationStrategyTest
@@ -0,0 +1,137 @@
+import unittest
+
+import numpy as np
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.optimization import RankedOptimizationStrategy, ParallelRankedOptimizationStrategy, BeamSearchOptimizationStrategy, CompoundSimplifier, \
+    SingleRuleSimplifier, spider_count_cost, wire_count_cost, t_count_cost, weighted_cost
+from zxopt.rewriting.match import Match
+from zxopt.rewriting.matcher import Matcher
+from zxopt.rewriting.zx_calculus import ZXRuleSpider1, ZXRuleSpider2
+from zxopt.rewriting.zx_calculus.zx_calculus_rules import ZXRulePiCommutation, ZXRuleColor
+from test.util import translate, fusion_strategy, TEST_CIRCUIT
+
+
+class OptimizationStrategyTest(unittest.TestCase):
+
+    def test_parallel_ranked_matches_ranked(self):
+        simplifier = CompoundSimplifier([SingleRuleSimplifier(ZXRulePiCommutation()), SingleRuleSimplifier(ZXRuleSpider1()), SingleRuleSimplifier(ZXRuleSpider2())])
+        ranked, parallel = RankedOptimizationStrategy(simplifier), ParallelRankedOptimizationStrategy(simplifier, workers=2)
+        ranked_diagram, parallel_diagram = translate(3, TEST_CIRCUIT), translate(3, TEST_CIRCUIT)
+
+        steps = 0
+        while True:
+            ranked_match = ranked.find_next_match(ranked_diagram)
+            parallel_match = parallel.find_next_match(parallel_diagram)
+            self.assertEqual(ranked_match is None, parallel_match is None)
+            if ranked_match is None:
+                break
+
+            self.assertIs(ranked_match.rule, parallel_match.rule)
+            self.assertEqual(embedding(ranked_match), embedding(parallel_match))
+            # the first worker's result is always consumed, it has received all rewrites
+            self.assertEqual(len(parallel.replayed_rewrites), parallel.shipped_rewrites[0])
+            Matcher(ranked_diagram).apply_match(ranked_match)
+            Matcher(parallel_diagram).apply_match(parallel_match)
+            steps += 1
+
+            if steps == 2:
+                # the workers are restarted on the current diagram after a shutdown
+                parallel.shutdown()
+                self.assertEqual([], parallel.executors)
+            if steps == 3:
+                # changes not made by applying the returned match restart the pool as well
+                parallel_diagram.set_deferred_removal(True)
+                parallel_diagram.compact()
+                ranked_diagram.set_deferred_removal(True)
+                ranked_diagram.compact()
+
+        self.assertGreater(steps, 3)
+        self.assertEqual(len(ranked_diagram.get_spiders()), len(parallel_diagram.get_spiders()))
+        parallel.shutdown()
+        self.assertEqual([], parallel.executors)
+
+    def test_beam_search_width_one_matches_ranked(self):
+        for deferred_removal in [False, True]:
+            ranked = fusion_strategy()
+            # every rewrite of the fusion rules removes one spider, ties are broken by rank like the ranked strategy does
+            beam = BeamSearchOptimizationStrategy(ranked.simplifier, spider_count_cost, beam_width=1, depth=1, branching=1)
+            ranked_diagram, beam_diagram = translate(3, TEST_CIRCUIT), translate(3, TEST_CIRCUIT)
+            ranked_diagram.set_deferred_removal(deferred_removal)
+            beam_diagram.set_deferred_removal(deferred_removal)
+
+            steps = 0
+            search_diagram = None
+            while True:
+                ranked_match = ranked.find_next_match(ranked_diagram)
+                beam_match = beam.find_next_match(beam_diagram)
+                self.assertEqual(ranked_match is None, beam_match is None)
+                if ranked_match is None:
+                    break
+
+                if search_diagram is not None:
+                    # the search diagram is kept in sync by applying the returned match instead of copying the diagram
+                    self.assertIs(search_diagram, beam.search_diagram)
+                search_diagram = beam.search_diagram
+
+                self.assertIs(ranked_match.rule, beam_match.rule)
+                self.assertEqual(embedding(ranked_match), embedding(beam_match))
+                Matcher(ranked_diagram).apply_match(ranked_match)
+                Matcher(beam_diagram).apply_match(beam_match)
+                steps += 1
+
+            self.assertGreater(steps, 1)
+            self.assertEqual(len(ranked_diagram.get_spiders()), len(beam_diagram.get_spiders()))
+            beam.shutdown()
+            self.assertIsNone(beam.search_diagram)
+
+    def test_beam_search_walks_plateaus(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary("in", 0)
+        s = diagram.add_spider(0.25 * np.pi, "green", 0)
+        b_out = diagram.add_boundary("out", 0)
+        diagram.add_wire(b_in, s)
+        diagram.add_wire(s, b_out)
+
+        # changing the color never lowers the spider count, the rewrites are applied until the plateau limit is reached
+        beam = BeamSearchOptimizationStrategy(SingleRuleSimplifier(ZXRuleColor()), spider_count_cost, max_plateau_steps=3)
+        colors = []
+        while True:
+            match = beam.find_next_match(diagram)
+            if match is None:
+                break
+            Matcher(diagram).apply_match(match)
+            colors.append(diagram.get_spider_color(diagram.get_spiders()[0]))
+
+        self.assertEqual(["red", "green", "red"], colors)
+        self.assertEqual(3, beam.plateau_steps)
+        beam.shutdown()
+
+    def test_cost_functions(self):
+        diagram = Diagram()
+        b_in = diagram.add_boundary("in", 0)
+        s1 = diagram.add_spider(0.25 * np.pi, "green", 0)
+        s2 = diagram.add_spider(0.5 * np.pi, "red", 0)
+        s3 = diagram.add_spider(0.0, "green", 0)
+        b_out = diagram.add_boundary("out", 0)
+        diagram.add_wire(b_in, s1)
+        diagram.add_wire(s1, s2)
+        diagram.add_wire(s2, s3)
+        diagram.add_wire(s2, s3)
+        diagram.add_wire(s3, b_out)
+
+        self.assertEqual(spider_count_cost(diagram), 3)
+        self.assertEqual(wire_count_cost(diagram), 5)
+        self.assertEqual(t_count_cost(diagram), 1)
+        self.assertEqual(weighted_cost(1, 10, 100)(diagram), 531)
+
+        # hidden spiders aren't counted
+        diagram.set_deferred_removal(True)
+        diagram.remove_spider(s1)
+        self.assertEqual(spider_count_cost(diagram), 2)
+        self.assertEqual(wire_count_cost(diagram), 3)
+        self.assertEqual(t_count_cost(diagram), 0)
+
+
+def embedding(match: Match):
+    return [int(match.rule_to_diagram_map[s]) for s in match.rule.source.g.vertices()]
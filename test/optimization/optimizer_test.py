@@ -0,0 +1,192 @@
+import os
+import pickle
+import tempfile
+import unittest
+from typing import List, Optional, Iterable
+
+import numpy as np
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.optimization import Optimizer, resume_optimizer, RankedOptimizationStrategy, CompoundSimplifier, SingleRuleSimplifier, NoValidationPolicy, \
+    EveryRewriteValidationPolicy, EveryNRewritesValidationPolicy, FinalValidationPolicy, RandomSampledValidationPolicy, FirstRuleUseValidationPolicy
+from zxopt.optimization.optimization_strategy import RandomizedCompoundSimplifier
+from zxopt.optimization.optimizer import CHECKPOINT_STATE_SUFFIX, REFERENCE_FILE, REFERENCE_RECOMPUTE
+from zxopt.rewriting import RewriteRule
+from zxopt.rewriting.match import Match
+from zxopt.rewriting.rewrite_phase_expression import ConstantExpression
+from zxopt.rewriting.rewrite_rule import SPIDER_COLOR_WHITE
+from zxopt.rewriting.zx_calculus import ZXRuleSpider1, ZXRuleSpider2
+from zxopt.validation import DiagramLinearExtractor, validate_operation_equality
+from test.util import translate, fusion_strategy, TEST_CIRCUIT
+
+
+class OptimizerTest(unittest.TestCase):
+
+    def test_incremental_matches_full_search(self):
+        full = translate(3, TEST_CIRCUIT)
+        Optimizer(full, fusion_strategy(), validation_policy=NoValidationPolicy()).optimize()
+
+        for deferred_removal in [False, True]:
+            incremental = translate(3, TEST_CIRCUIT)
+            Optimizer(incremental, fusion_strategy(), validation_policy=NoValidationPolicy(), incremental=True, deferred_removal=deferred_removal).optimize()
+
+            self.assertEqual(len(full.get_spiders()), len(incremental.get_spiders()))
+            self.assertEqual(full.g.num_edges(), incremental.g.num_edges())
+            self.assertIsNone(fusion_strategy().find_next_match(incremental)) # the worklist didn't miss a match
+
+    def test_validation_counts(self):
+        rewrite_count = sum(optimize(NoValidationPolicy()).rule_applications.values())
+        self.assertGreater(rewrite_count, 2)
+
+        self.assertEqual(0, optimize(NoValidationPolicy()).validations)
+        self.assertEqual(rewrite_count, optimize(EveryRewriteValidationPolicy()).validations)
+        self.assertEqual(rewrite_count // 2 + rewrite_count % 2, optimize(EveryNRewritesValidationPolicy(2)).validations) # the remainder is validated at the end
+        self.assertEqual(1, optimize(FinalValidationPolicy()).validations)
+        self.assertEqual(rewrite_count, optimize(RandomSampledValidationPolicy(1.0)).validations)
+        self.assertEqual(1, optimize(RandomSampledValidationPolicy(0.0)).validations)
+
+        optimizer = optimize(FirstRuleUseValidationPolicy())
+        used_rules = len(optimizer.rule_applications)
+        self.assertIn(optimizer.validations, [used_rules, used_rules + 1])
+
+        for optimizer in [optimize(EveryRewriteValidationPolicy()), optimize(FirstRuleUseValidationPolicy())]:
+            self.assertEqual(0, optimizer.invalid_validations)
+
+    def test_validation_reference_transform(self):
+        # each validation replaces the reference, the final one is the transformation of the optimized diagram
+        optimizer = optimize(EveryRewriteValidationPolicy())
+        self.assertTrue(validate_operation_equality(DiagramLinearExtractor(optimizer.diagram).extract_matrix(), optimizer.reference_transform))
+        self.assertTrue(validate_operation_equality(DiagramLinearExtractor(translate(3, TEST_CIRCUIT)).extract_matrix(), optimizer.reference_transform))
+
+    def test_invalid_rewrite_detected(self):
+        for policy in [EveryRewriteValidationPolicy(), FirstRuleUseValidationPolicy()]:
+            optimizer = optimize(policy, [ZXRuleDropPi(), ZXRuleSpider1(), ZXRuleSpider2()])
+            self.assertGreaterEqual(optimizer.rule_applications[ZXRuleDropPi().name], 1)
+            self.assertGreaterEqual(optimizer.invalid_validations, 1)
+
+    def test_partition_components(self):
+        full = two_component_diagram()
+        Optimizer(full, fusion_strategy(), validation_policy=NoValidationPolicy()).optimize()
+
+        for component_workers in [1, 2]:
+            diagram = two_component_diagram()
+            strategy = ShutdownCountingStrategy()
+            optimizer = Optimizer(diagram, strategy, validation_policy=NoValidationPolicy(), partition_components=True, component_workers=component_workers)
+            optimizer.optimize()
+
+            self.assertEqual(len(full.get_spiders()), len(diagram.get_spiders()))
+            self.assertEqual(full.g.num_edges(), diagram.g.num_edges())
+            self.assertGreater(sum(optimizer.rule_applications.values()), 0)
+            self.assertEqual(1 if component_workers == 1 else 2, strategy.shutdowns) # once before forking the workers, once when done
+
+            # the unchanged component comes first and keeps its vertices, the changed one is appended
+            self.assertEqual(["b_in", "s", "b_out"], [diagram.vertex_identifier_prop[diagram.g.vertex(v)] for v in range(3)])
+            self.assertAlmostEqual(0.25 * np.pi, diagram.get_spider_phase(diagram.g.vertex(1)))
+
+    def test_partition_components_validation(self):
+        single = Optimizer(translate(3, TEST_CIRCUIT), fusion_strategy(), validation_policy=FirstRuleUseValidationPolicy())
+        single.optimize()
+
+        for component_workers in [1, 2]:
+            diagram = translate(3, TEST_CIRCUIT)
+            diagram.add_diagram(translate(3, TEST_CIRCUIT))
+            validation_policy = FirstRuleUseValidationPolicy()
+            optimizer = Optimizer(diagram, fusion_strategy(), validation_policy=validation_policy, partition_components=True, component_workers=component_workers)
+            optimizer.optimize()
+
+            # each component validates the first use of each rule on its own
+            self.assertEqual(2 * single.validations, optimizer.validations)
+            self.assertEqual(0, optimizer.invalid_validations)
+            self.assertEqual(set(), validation_policy.used_rules)
+
+        with self.assertRaises(ValueError):
+            Optimizer(translate(3, TEST_CIRCUIT), fusion_strategy(), partition_components=True, checkpoint_path="checkpoint.zxd")
+
+    def test_checkpoint_round_trip(self):
+        initial_transform = DiagramLinearExtractor(translate(3, TEST_CIRCUIT)).extract_matrix()
+
+        # every rewrite validated: the reference is recomputed, otherwise it is read from a separate file
+        for validation_policy, reference in [(EveryRewriteValidationPolicy(), REFERENCE_RECOMPUTE), (EveryNRewritesValidationPolicy(1000), REFERENCE_FILE)]:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "checkpoint.zxd")
+                # the checkpoint is written after the second rewrite, the strategy stops there
+                optimizer = Optimizer(translate(3, TEST_CIRCUIT), LimitedStrategy(2, seed=1), validation_policy=validation_policy, checkpoint_path=path, checkpoint_interval=2)
+                optimizer.optimize()
+
+                with open(path + CHECKPOINT_STATE_SUFFIX, "rb") as f:
+                    self.assertEqual(reference, pickle.load(f)["reference_transform"])
+
+                resumed = resume_optimizer(path, LimitedStrategy(2, seed=2), validation_policy=validation_policy)
+                self.assertEqual(len(optimizer.diagram.get_spiders()), len(resumed.diagram.get_spiders()))
+                self.assertEqual(optimizer.diagram.g.num_edges(), resumed.diagram.g.num_edges())
+                self.assertEqual(2, resumed.iterations)
+                self.assertEqual(optimizer.rule_applications, resumed.rule_applications)
+                self.assertEqual(2 if reference == REFERENCE_RECOMPUTE else 0, resumed.validations)
+                self.assertEqual(0 if reference == REFERENCE_RECOMPUTE else 2, len(resumed.unvalidated_rules))
+                self.assertEqual(optimizer.strategy.simplifier.random.getstate(), resumed.strategy.simplifier.random.getstate())
+
+                reference_transform = initial_transform if reference == REFERENCE_FILE else DiagramLinearExtractor(resumed.diagram).extract_matrix()
+                self.assertTrue(validate_operation_equality(reference_transform, resumed.reference_transform))
+
+                resumed.optimize()
+                self.assertEqual(0, resumed.invalid_validations)
+
+
+"""
+Ranked strategy on randomly ordered fusion rules, finds no more matches after the given number of matches
+"""
+class LimitedStrategy(RankedOptimizationStrategy):
+    remaining_matches: int
+
+    def __init__(self, max_matches: int, seed: int):
+        super().__init__(RandomizedCompoundSimplifier([SingleRuleSimplifier(ZXRuleSpider1()), SingleRuleSimplifier(ZXRuleSpider2())], seed=seed))
+        self.remaining_matches = max_matches
+
+    def find_next_match(self, diagram: Diagram, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Match]:
+        if self.remaining_matches == 0:
+            return None
+        self.remaining_matches -= 1
+        return super().find_next_match(diagram, seed_vertices)
+
+
+class ShutdownCountingStrategy(RankedOptimizationStrategy):
+    shutdowns: int
+
+    def __init__(self):
+        super().__init__(fusion_strategy().simplifier)
+        self.shutdowns = 0
+
+    def shutdown(self):
+        self.shutdowns += 1
+
+
+"""
+Removes a pi phase spider with two wires, invalid (a Pauli gate isn't the identity), used to test validation
+"""
+class ZXRuleDropPi(RewriteRule):
+    def __init__(self):
+        super().__init__(name="drop pi")
+
+        s_source = self.source.add_spider(SPIDER_COLOR_WHITE, ConstantExpression(np.pi), 2, 0)
+        self.connecting_wires_spider_mapping[s_source] = None
+
+
+def optimize(validation_policy, rules: List[RewriteRule] = None) -> Optimizer:
+    strategy = RankedOptimizationStrategy(CompoundSimplifier([SingleRuleSimplifier(r) for r in rules])) if rules is not None else fusion_strategy()
+    optimizer = Optimizer(translate(3, TEST_CIRCUIT), strategy, validation_policy=validation_policy)
+    optimizer.optimize()
+    return optimizer
+
+"""
+A single qubit T gate no rule of the fusion strategy applies to, followed by the test circuit
+"""
+def two_component_diagram() -> Diagram:
+    diagram = Diagram()
+    b_in = diagram.add_boundary("in", 0, "b_in")
+    s = diagram.add_spider(0.25 * np.pi, "green", 0, "s")
+    b_out = diagram.add_boundary("out", 0, "b_out")
+    diagram.add_wire(b_in, s)
+    diagram.add_wire(s, b_out)
+
+    diagram.add_diagram(translate(3, TEST_CIRCUIT))
+    return diagram
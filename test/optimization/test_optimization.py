@@ -27,7 +27,7 @@ def render(object: Union[Circuit, Diagram]):
 
 
 # best, most reducing, hardest to get first, most destroying last
-DEFAULT_ZX_RANKED_OPTIMIZATION_STRATEGY = RankedOptimizationStrategy( # TODO: this trusts the rule resetting process, instead reinstantiate every time?
+DEFAULT_ZX_RANKED_OPTIMIZATION_STRATEGY = RankedOptimizationStrategy(
     CompoundSimplifier([
         RandomizedCompoundSimplifier([
             SingleRuleSimplifier(ZXRuleBialgebraLaw())
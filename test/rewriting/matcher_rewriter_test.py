@@ -1,12 +1,16 @@
 import unittest
 from math import pi
-from typing import Tuple
+from typing import Tuple, List
 
+import numpy as np
 from graph_tool import Vertex
 
 from zxopt.data_structures.diagram import Diagram
 from zxopt.rewriting import RewriteRule
+from zxopt.rewriting.match_labels import get_match_labels
 from zxopt.rewriting.matcher import Matcher
+from zxopt.rewriting.rewriter import Rewriter
+from zxopt.rewriting.rule_symmetry import get_rule_symmetry
 from zxopt.rewriting.zx_calculus import ZXRuleSpider1, ZXRuleSpider2
 from zxopt.rewriting.zx_calculus.zx_calculus_rules import ZXRuleBialgebraLaw, ZXRulePiCommutation, ZXRuleColor, \
     ZXRuleCopying, ZXRuleHopfLaw
@@ -49,6 +53,111 @@ class MatcherRewriterTest(unittest.TestCase):
 
         show(diagram)
 
+    def test_spider_rule_1_find_and_apply_match(self):
+        diagram = generate_three_spider_diagram((1.0 * pi, "green"), (0.5 * pi, "red"), (0.25 * pi, "red"))
+        rule = ZXRuleSpider1()
+        matcher = Matcher(diagram)
+
+        match = matcher.find_match(rule, generate_on_the_fly=GENERATE_ISOMORPHISMS_ON_THE_FLY)
+        self.assertIsNotNone(match)
+        self.assertAlmostEqual(0.75 * pi, sum(match.bindings.variable_values.values()))
+        self.assertEqual("red", match.bindings.spider_colors["white"])
+
+        matcher.find_match(rule) # the rule holds no state, the match carries its own
+        matcher.apply_match(match)
+
+        self.assertEqual(2, len(diagram.get_spiders()))
+        self.assertEqual(1, len(diagram.get_spiders_by_color("red")))
+        self.assertAlmostEqual(0.75 * pi, diagram.get_spider_phase(diagram.get_spiders_by_color("red")[0]))
+
+    def test_spider_rule_1_apply_all(self):
+        diagram = generate_spider_chain_diagram([(0.25 * pi, "red")] * 6)
+        matcher = Matcher(diagram)
+
+        matches = matcher.match_all(ZXRuleSpider1())
+        self.assertGreaterEqual(len(matches), 2) # at least two disjoint pairs in a chain of six
+
+        rewrite_count = matcher.apply_all(ZXRuleSpider1())
+        self.assertEqual(len(matches), rewrite_count)
+        self.assertEqual(6 - rewrite_count, len(diagram.get_spiders()))
+        self.assertAlmostEqual(1.5 * pi, sum(diagram.get_spider_phase(s) for s in diagram.get_spiders()) % (2 * pi))
+
+    def test_rewrite_rollback_redo(self):
+        diagram = generate_spider_chain_diagram([(0.25 * pi, "red")] * 4)
+        diagram.set_deferred_removal(True)
+        spiders = sorted(int(s) for s in diagram.get_spiders())
+        phases = diagram.get_phases().copy()
+        degrees = diagram.get_degrees().copy()
+        wire_count = diagram.g.num_edges()
+
+        matcher = Matcher(diagram)
+        rewriter = Rewriter(diagram, journaling=True)
+        rewriter.rewrite(matcher.find_match(ZXRuleSpider1()))
+        rewriter.rewrite(matcher.find_match(ZXRuleSpider1()))
+        self.assertEqual(2, len(diagram.get_spiders()))
+
+        self.assertEqual(2, rewriter.rollback(3))
+        self.assertEqual(spiders, sorted(int(s) for s in diagram.get_spiders()))
+        self.assertEqual(wire_count, diagram.g.num_edges())
+        self.assertTrue(np.allclose(phases[spiders], diagram.get_phases()[spiders]))
+        self.assertTrue((degrees[spiders] == diagram.get_degrees()[spiders]).all())
+
+        self.assertEqual(2, rewriter.redo(2)) # the second rewrite depends on the spider added by the first one
+        self.assertEqual(2, len(diagram.get_spiders()))
+        self.assertAlmostEqual(1.0 * pi, sum(diagram.get_spider_phase(s) for s in diagram.get_spiders()))
+
+        diagram.set_spider_phase(diagram.get_spiders()[0], 0.0)
+        self.assertRaises(RuntimeError, lambda: rewriter.rollback())
+
+    def test_compiled_matcher_agrees_with_generic(self):
+        cases = [
+            (generate_three_spider_diagram((1.0 * pi, "green"), (0.5 * pi, "red"), (0.25 * pi, "red")), ZXRuleSpider1()),
+            (generate_three_spider_diagram((1.0 * pi, "green"), (0.5 * pi, "red"), (0.25 * pi, "green")), ZXRuleSpider1()),
+            (generate_three_spider_diagram((1.0 * pi, "red"), (0.25 * pi, "green"), (0.5 * pi, "red"), hadamard=(False, True, False, False)), ZXRulePiCommutation()),
+            (generate_bialegbra_law_diagram((0.0, "green"), (0.0, "green"), (0.0, "red"), (0.0, "red")), ZXRuleBialgebraLaw()),
+            (generate_bialegbra_law_diagram((0.0, "green"), (0.0, "green"), (0.0, "red"), (0.0, "green")), ZXRuleBialgebraLaw()),
+            (generate_copying_diagram((0.0 * pi, "green"), (0.0 * pi, "red"), hadamard=(True, False, False)), ZXRuleCopying()),
+            (generate_hopf_law_diagram((0.0 * pi, "green"), (0.0 * pi, "red")), ZXRuleHopfLaw()),
+            (generate_hopf_law_diagram((0.0 * pi, "green"), (0.0 * pi, "red"), hadamard=(False, True, False, False)), ZXRuleHopfLaw()),
+        ]
+
+        for diagram, rule in cases:
+            self.assertEqual(rule_matches(diagram, rule, use_compiled_matchers=False), rule_matches(diagram, rule, use_compiled_matchers=True))
+
+    def test_match_labels(self):
+        labels = get_match_labels(ZXRuleBialgebraLaw().source)
+        self.assertFalse(labels.uses_colors) # white / black can't be compared for equality
+        self.assertTrue(labels.uses_phases)
+        self.assertTrue(labels.is_useful())
+
+        diagram = generate_bialegbra_law_diagram((0.0, "green"), (0.5 * pi, "green"), (0.0, "red"), (0.0, "red"))
+        s11, s12, s21, s22 = get_bialgebra_law_diagram_vertices(diagram)
+        candidates = labels.candidate_mask(diagram)
+        self.assertEqual([int(s11), int(s21), int(s22)], [int(v) for v in candidates.nonzero()[0]])
+
+        # seeded searches only label their region, the result has to agree with labelling the whole diagram
+        region = np.array([int(s12), int(s21)])
+        self.assertEqual(candidates[region].tolist(), labels.candidate_mask(diagram, region).tolist())
+        self.assertEqual(labels.diagram_labels(diagram)[region].tolist(), labels.diagram_labels(diagram, region).tolist())
+
+        diagram = generate_bialegbra_law_diagram((0.0, "green"), (0.0, "green"), (0.0, "red"), (0.0, "red"))
+        matcher = Matcher(diagram, use_compiled_matchers=False)
+        matches = matcher.find_matches(ZXRuleBialgebraLaw())
+        self.assertGreater(len(matches), 0)
+        self.assertEqual(len(matches), len(matcher.find_matches(ZXRuleBialgebraLaw(), seed_vertices=[int(get_bialgebra_law_diagram_vertices(diagram)[2])])))
+
+        self.assertFalse(get_match_labels(ZXRuleSpider1().source).is_useful())
+
+    def test_rule_symmetry(self):
+        self.assertEqual([[1, 0]], get_rule_symmetry(ZXRuleSpider1()).automorphisms) # alpha + beta = beta + alpha
+        self.assertEqual(3, len(get_rule_symmetry(ZXRuleBialgebraLaw()).automorphisms))
+        self.assertEqual([], get_rule_symmetry(ZXRulePiCommutation()).automorphisms)
+
+        diagram = generate_spider_chain_diagram([(0.25 * pi, "red")] * 4)
+        reduced = Matcher(diagram).match_all(ZXRuleSpider1())
+        full = Matcher(diagram, use_symmetry_reduction=False).match_all(ZXRuleSpider1())
+        self.assertEqual(len(full), len(reduced))
+
     def test_spider_rule_2_match(self):
         diagram = generate_three_spider_diagram((1.0*pi, "green"), (0.0*pi, "red"), (1.0*pi, "green"))
         self.assertTrue(rule_matches(diagram, ZXRuleSpider2()))
@@ -234,6 +343,16 @@ def generate_three_spider_diagram(p1: Tuple[float, str], p2: Tuple[float, str],
         w4 = diagram.add_wire(s2, b_out, hadamard[3])
     return diagram
 
+def generate_spider_chain_diagram(spiders: List[Tuple[float, str]]) -> Diagram:
+    diagram = Diagram()
+    previous = diagram.add_boundary("in", 0, "b_in")
+    for i, (phase, color) in enumerate(spiders):
+        s = diagram.add_spider(phase, color, 0, f"s{i + 1}")
+        diagram.add_wire(previous, s)
+        previous = s
+    diagram.add_wire(previous, diagram.add_boundary("out", 0, "b_out"))
+    return diagram
+
 def get_three_spider_diagram_vertices(diagram: Diagram) -> Tuple[Vertex, Vertex, Vertex, Vertex, Vertex]:
     return diagram.get_vertex_from_identifier("b_in"), diagram.get_vertex_from_identifier("b_out"), diagram.get_vertex_from_identifier("s1"), diagram.get_vertex_from_identifier("s2"), diagram.get_vertex_from_identifier("s3")
 
@@ -295,8 +414,8 @@ def generate_hopf_law_diagram(p1: Tuple[float, str], p2: Tuple[float, str], hada
 
     return diagram
 
-def rule_matches(diagram: Diagram, rule: RewriteRule, generate_on_the_fly: bool = GENERATE_ISOMORPHISMS_ON_THE_FLY) -> bool:
-    matcher = Matcher(diagram)
+def rule_matches(diagram: Diagram, rule: RewriteRule, generate_on_the_fly: bool = GENERATE_ISOMORPHISMS_ON_THE_FLY, use_compiled_matchers: bool = True) -> bool:
+    matcher = Matcher(diagram, use_compiled_matchers)
     match = matcher.match_rule(rule, apply=False, generate_on_the_fly=generate_on_the_fly)
     return match is not None
 
@@ -74,10 +74,13 @@ class ParallelSelfLoopTest(unittest.TestCase):
 
         show(diagram)
 
+        modification_count = diagram.modification_count
         remover = ParallelLoopEdgeRemover(diagram)
         remover.remove_self_loops()
 
         show(diagram)
+        self.assertEqual(2, diagram.g.num_edges())
+        self.assertGreater(diagram.modification_count, modification_count)
 
 
 def show(diagram: Diagram):
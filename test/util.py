@@ -0,0 +1,29 @@
+from typing import List, Tuple
+
+from zxopt.data_structures.circuit import Circuit, GateComponent, PauliXGateType, PauliZGateType, PhaseGateType, TGateType, GateType
+from zxopt.data_structures.circuit.register.quantum_register import QuantumRegister
+from zxopt.data_structures.diagram import Diagram
+from zxopt.optimization import RankedOptimizationStrategy, CompoundSimplifier, SingleRuleSimplifier
+from zxopt.rewriting.zx_calculus import ZXRuleSpider1, ZXRuleSpider2
+from zxopt.translation import CircuitTranslator
+
+# CNOTs and phase gates, fusing spiders and removing identities reduces it to the same diagram in any order
+TEST_CIRCUIT = [
+    (0, TGateType(), None), (1, PauliXGateType(), 0), (1, TGateType(), None), (2, PauliXGateType(), 1),
+    (0, PhaseGateType(), None), (2, PauliZGateType(), None), (1, PauliXGateType(), 0), (2, TGateType(), None)
+]
+
+"""
+Translate a circuit given as (target qubit, gate type, control qubit or None) to a diagram
+"""
+def translate(qubit_count: int, gates: List[Tuple[int, GateType, int]]) -> Diagram:
+    circuit = Circuit()
+    register = QuantumRegister(qubit_count)
+    circuit.add_register(register)
+    for target, gate_type, control in gates:
+        circuit.add_component(GateComponent(register[target], gate_type, {register[control]} if control is not None else frozenset()))
+
+    return CircuitTranslator(circuit).translate()
+
+def fusion_strategy() -> RankedOptimizationStrategy:
+    return RankedOptimizationStrategy(CompoundSimplifier([SingleRuleSimplifier(ZXRuleSpider1()), SingleRuleSimplifier(ZXRuleSpider2())]))
@@ -1,8 +1,14 @@
 
 __all__ = [
     "CircuitDiagramTranslationEqualityTest",
-    "CircuitUnitaryExtractorTest"
+    "CircuitUnitaryExtractorTest",
+    "ContractionPlannerTest",
+    "OperationEqualityTest",
+    "StabilizerExtractorTest"
 ]
 
 from test.validation.test_circuit_diagram_translation_equality import CircuitDiagramTranslationEqualityTest
 from test.validation.test_circuit_unitary_extractor import CircuitUnitaryExtractorTest
+from test.validation.test_contraction_planner import ContractionPlannerTest
+from test.validation.test_operation_equality import OperationEqualityTest
+from test.validation.test_stabilizer_extractor import StabilizerExtractorTest
@@ -7,6 +7,7 @@ from zxopt.data_structures.circuit import Circuit, GateComponent, HadamardGateTy
 from zxopt.data_structures.circuit.register.quantum_register import QuantumRegister
 from zxopt.util.toolbox import matrix_equality
 from zxopt.validation import CircuitUnitaryExtractor
+from zxopt.validation.circuit_unitary_extractor import EXTRACTION_MODE_STATEVECTOR, EXTRACTION_MODE_KRONECKER
 
 
 class CircuitUnitaryExtractorTest(unittest.TestCase):
@@ -57,4 +58,32 @@ class CircuitUnitaryExtractorTest(unittest.TestCase):
             [0,1,0,-1,0,0,0,0],
         ]) * (1/math.sqrt(2))
 
-        self.assertTrue(matrix_equality(unitary, target))
\ No newline at end of file
+        self.assertTrue(matrix_equality(unitary, target))
+
+    def test_statevector_matches_kronecker(self):
+        circuit = Circuit()
+        register = QuantumRegister(3)
+        circuit.add_register(register)
+        circuit.add_component(GateComponent(register[1], HadamardGateType()))
+        circuit.add_component(GateComponent(register[0], PauliXGateType(), set([register[2]])))
+        circuit.add_component(GateComponent(register[2], HadamardGateType()))
+        circuit.add_component(GateComponent(register[1], PauliXGateType(), set([register[0]])))
+
+        statevector = CircuitUnitaryExtractor(circuit, EXTRACTION_MODE_STATEVECTOR).extract_matrix()
+        kronecker = CircuitUnitaryExtractor(circuit, EXTRACTION_MODE_KRONECKER).extract_matrix()
+
+        self.assertTrue(matrix_equality(statevector, kronecker))
+
+    def test_apply_to_states(self):
+        circuit = Circuit()
+        register = QuantumRegister(2)
+        circuit.add_register(register)
+        circuit.add_component(GateComponent(register[0], HadamardGateType()))
+        circuit.add_component(GateComponent(register[1], PauliXGateType(), set([register[0]])))
+
+        extractor = CircuitUnitaryExtractor(circuit)
+        bell = extractor.apply_to_state(np.array([1, 0, 0, 0]))
+        self.assertTrue(np.allclose(bell, np.array([1, 0, 0, 1]) * (1/math.sqrt(2))))
+
+        states = np.random.rand(4, 5)
+        self.assertTrue(np.allclose(extractor.apply_to_states(states), extractor.extract_matrix() @ states))
@@ -0,0 +1,58 @@
+import unittest
+from typing import Tuple
+
+import numpy as np
+
+from zxopt.data_structures.circuit import HadamardGateType, PauliXGateType, TGateType, PhaseGateType, PauliZGateType
+from zxopt.validation import DiagramLinearExtractor, validate_operation_equality
+from zxopt.validation.contraction_planner import plan_contraction, CONTRACTION_STRATEGY_NONE, CONTRACTION_STRATEGY_GREEDY, \
+    CONTRACTION_STRATEGY_MIN_FILL
+from test.util import translate
+
+# a ring of four tensors with open legs, a double wire (5, 6) and a tensor without contracted wires
+RING_NETWORK = ((1, 2, -1), (1, 3, -2), (2, 4, 5, 6), (3, 4, 5, 6, -3), (-4,))
+
+CONTRACTION_STRATEGIES = [CONTRACTION_STRATEGY_NONE, CONTRACTION_STRATEGY_GREEDY, CONTRACTION_STRATEGY_MIN_FILL]
+
+
+class ContractionPlannerTest(unittest.TestCase):
+
+    def test_order_covers_all_labels(self):
+        for strategy in CONTRACTION_STRATEGIES:
+            order = plan_contraction(RING_NETWORK, strategy).order
+            self.assertEqual(sorted(order), positive_labels(RING_NETWORK))
+            self.assertEqual(len(set(order)), len(order))
+
+    def test_peak_size(self):
+        # contracting wire 1 yields a matrix, contracting wire 2 yields the result, both have two legs
+        self.assertEqual(4, plan_contraction(((1, 2), (1, -1), (2, -2)), CONTRACTION_STRATEGY_NONE).peak_size)
+        # the result is the outer product of all tensors
+        self.assertEqual(8, plan_contraction(((-1,), (-2,), (-3,)), CONTRACTION_STRATEGY_GREEDY).peak_size)
+        # greedy contracts wire 3 first, the largest input tensor and the result have three legs
+        self.assertEqual(8, plan_contraction(((1, 2, -1), (1, -2), (2, 3), (3, -3)), CONTRACTION_STRATEGY_GREEDY).peak_size)
+
+    def test_plan_cache(self):
+        plan = plan_contraction(RING_NETWORK, CONTRACTION_STRATEGY_MIN_FILL)
+        hits = plan_contraction.cache_info().hits
+        self.assertIs(plan, plan_contraction(RING_NETWORK, CONTRACTION_STRATEGY_MIN_FILL))
+        self.assertEqual(hits + 1, plan_contraction.cache_info().hits)
+
+        # diagrams with the same topology produce the same network and share the plan
+        DiagramLinearExtractor(translate(2, GATES)).extract_matrix()
+        hits = plan_contraction.cache_info().hits
+        DiagramLinearExtractor(translate(2, GATES)).extract_matrix()
+        self.assertEqual(hits + 1, plan_contraction.cache_info().hits)
+
+    def test_planned_extraction_matches_label_order(self):
+        diagram = translate(2, GATES)
+        reference = DiagramLinearExtractor(diagram, CONTRACTION_STRATEGY_NONE).extract_matrix()
+        for strategy in [CONTRACTION_STRATEGY_GREEDY, CONTRACTION_STRATEGY_MIN_FILL]:
+            matrix = DiagramLinearExtractor(diagram, strategy).extract_matrix()
+            self.assertTrue(np.allclose(reference, matrix))
+            self.assertTrue(validate_operation_equality(reference, matrix, exact=True))
+
+
+GATES = [(0, HadamardGateType(), None), (1, PauliXGateType(), 0), (1, TGateType(), None), (0, PhaseGateType(), None), (0, PauliZGateType(), 1)]
+
+def positive_labels(network: Tuple[Tuple[int, ...], ...]):
+    return sorted(set(l for labels in network for l in labels if l > 0))
@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+
+from zxopt.validation import validate_operation_equality
+
+
+class OperationEqualityTest(unittest.TestCase):
+
+    def test_global_scalar(self):
+        h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+        m1 = np.kron(h, np.identity(4))
+        m2 = m1 * 3.0 * np.exp(0.7j)
+
+        self.assertTrue(validate_operation_equality(m1, m2))
+        self.assertTrue(validate_operation_equality(m1, m2, exact=True))
+
+    def test_different_operators(self):
+        x = np.array([[0, 1], [1, 0]])
+        z = np.array([[1, 0], [0, -1]])
+
+        self.assertFalse(validate_operation_equality(x, z))
+        self.assertFalse(validate_operation_equality(x, z, exact=True))
+        self.assertFalse(validate_operation_equality(x, np.identity(4)))
+
+    def test_relative_phase(self):
+        # Z and the identity produce the same output probabilities for real inputs in the computational basis,
+        # but differ by a relative phase, which is only detected by the exact comparison
+        z = np.array([[1, 0], [0, -1]])
+        self.assertFalse(validate_operation_equality(np.identity(2), z, exact=True))
+
+    def test_zero_operator(self):
+        zero = np.zeros((4, 4))
+        self.assertTrue(validate_operation_equality(zero, zero, exact=True))
+        self.assertFalse(validate_operation_equality(zero, np.identity(4), exact=True))
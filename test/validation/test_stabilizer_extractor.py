@@ -0,0 +1,38 @@
+import unittest
+
+from zxopt.data_structures.circuit import HadamardGateType, PauliXGateType, PauliZGateType, PhaseGateType, TGateType
+from zxopt.validation import DiagramStabilizerExtractor, validate_stabilizer_equality
+from test.util import translate
+
+
+class StabilizerExtractorTest(unittest.TestCase):
+
+    def test_clifford_detection(self):
+        self.assertTrue(DiagramStabilizerExtractor(translate(2, [(0, HadamardGateType(), None), (1, PhaseGateType(), 0)])).is_clifford())
+        self.assertFalse(DiagramStabilizerExtractor(translate(1, [(0, TGateType(), None)])).is_clifford())
+
+    def test_single_qubit_equality(self):
+        hzh = translate(1, [(0, HadamardGateType(), None), (0, PauliZGateType(), None), (0, HadamardGateType(), None)])
+        x = translate(1, [(0, PauliXGateType(), None)])
+        z = translate(1, [(0, PauliZGateType(), None)])
+        ss = translate(1, [(0, PhaseGateType(), None), (0, PhaseGateType(), None)])
+
+        self.assertTrue(stabilizer_equal(hzh, x))
+        self.assertFalse(stabilizer_equal(x, z))
+        self.assertTrue(stabilizer_equal(ss, z))
+
+    def test_swap_equality(self):
+        # three CNOTs swap two qubits, swapping twice is the identity
+        swap = [(1, PauliXGateType(), 0), (0, PauliXGateType(), 1), (1, PauliXGateType(), 0)]
+        identity = translate(2, [(0, PauliZGateType(), None), (0, PauliZGateType(), None)])
+        self.assertTrue(stabilizer_equal(translate(2, swap + swap), identity))
+        self.assertFalse(stabilizer_equal(translate(2, swap), identity))
+
+    def test_bell_state_circuit(self):
+        cx_h = translate(2, [(0, HadamardGateType(), None), (1, PauliXGateType(), 0)])
+        cz_h = translate(2, [(0, HadamardGateType(), None), (1, HadamardGateType(), None), (1, PauliZGateType(), 0), (1, HadamardGateType(), None)])
+        self.assertTrue(stabilizer_equal(cx_h, cz_h))
+
+
+def stabilizer_equal(d1, d2) -> bool:
+    return validate_stabilizer_equality(DiagramStabilizerExtractor(d1).extract_tableau(), DiagramStabilizerExtractor(d2).extract_tableau())
@@ -1,4 +1,4 @@
-from typing import cast, Set, List
+from typing import cast, Set, List, Dict
 
 from zxopt.data_structures.circuit.circuit_component import CircuitComponent
 from zxopt.data_structures.circuit.register.classical_register import ClassicalRegister
@@ -10,26 +10,47 @@ from zxopt.util.toolbox import flat_map
 class Circuit:
     def __init__(self):
         self.components: Set[CircuitComponent] = set()
+        self.components_by_step: List[List[CircuitComponent]] = [] # step -> components in that step, in insertion order
+        self.components_by_bit: Dict[RegisterBit, List[CircuitComponent]] = {} # bit -> components affecting it, ordered by step
         self.quantum_registers: List[QuantumRegister] = []
         self.classical_registers: List[ClassicalRegister] = []
 
     def add_component(self, component: CircuitComponent):
         component.set_circuit(self)
 
-        last_affected_step = max([c.step for c in self.get_components_affecting_bits(component.affected_bits)], default=-1)
+        # only the last component on each affected bit (the frontier) determines the step
+        last_affected_step = max([self.get_last_step(bit) for bit in component.affected_bits], default=-1)
         component.step = last_affected_step + 1
 
         self.components.add(component)
+        if component.step == len(self.components_by_step):
+            self.components_by_step.append([])
+        self.components_by_step[component.step].append(component)
+        for bit in component.affected_bits:
+            self.components_by_bit.setdefault(bit, []).append(component)
 
     def remove_component(self, component: CircuitComponent):
         component.circuit = None
         self.components.remove(component)
 
+        self.components_by_step[component.step].remove(component)
+        while len(self.components_by_step) > 0 and len(self.components_by_step[-1]) == 0:
+            self.components_by_step.pop()
+        for bit in component.affected_bits:
+            self.components_by_bit[bit].remove(component)
+
     """
     Returns all components that affect any of the specified bits
     """
     def get_components_affecting_bits(self, bits: Set[RegisterBit]):
-        return set(filter(lambda c: any([bit in c.affected_bits for bit in bits]), self.components))
+        return set(c for bit in bits for c in self.components_by_bit.get(bit, []))
+
+    """
+    Returns the step of the last component affecting the given bit, -1 if there is none
+    """
+    def get_last_step(self, bit: RegisterBit) -> int:
+        components = self.components_by_bit.get(bit, [])
+        return components[-1].step if len(components) > 0 else -1
 
     def add_register(self, register: Register):
         if isinstance(register, QuantumRegister):
@@ -65,8 +86,8 @@ class Circuit:
         return list(filter(lambda reg: bit in reg, self.get_registers()))[0]
 
     def step_count(self) -> int:
-        return max([c.step for c in self.components]) + 1
+        return len(self.components_by_step)
 
     def get_components_by_step(self, step: int) -> List[CircuitComponent]:
-        return list(filter(lambda c: c.step == step, self.components))
+        return list(self.components_by_step[step])
 
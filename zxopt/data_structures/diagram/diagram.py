@@ -1,7 +1,9 @@
-from typing import Optional, List
+from bisect import bisect_left
+from typing import Optional, List, Dict, Set, Iterable, Tuple
 
 import numpy as np
-from graph_tool import Graph, VertexPropertyMap, Vertex, Edge, EdgePropertyMap
+from graph_tool import Graph, VertexPropertyMap, Vertex, Edge, EdgePropertyMap, GraphView
+from graph_tool.topology import label_components
 
 VERTEX_BOUNDARY = "BOUNDARY"
 VERTEX_SPIDER_GREEN = "SPIDER_GREEN"
@@ -9,6 +11,12 @@ VERTEX_SPIDER_RED = "SPIDER_RED"
 SPIDER_COLOR_TO_VERTEX_TYPE = {"green": VERTEX_SPIDER_GREEN, "red": VERTEX_SPIDER_RED}
 VERTEX_TYPE_TO_SPIDER_COLOR = {SPIDER_COLOR_TO_VERTEX_TYPE[c]: c for c in SPIDER_COLOR_TO_VERTEX_TYPE}
 
+# integer codes of the vertex types, allow querying the entire diagram using numpy arrays, 0 is an untyped vertex
+VERTEX_TYPE_CODE_NONE = 0
+VERTEX_TYPE_CODES = {VERTEX_BOUNDARY: 1, VERTEX_SPIDER_GREEN: 2, VERTEX_SPIDER_RED: 3}
+SPIDER_COLOR_TO_VERTEX_TYPE_CODE = {c: VERTEX_TYPE_CODES[SPIDER_COLOR_TO_VERTEX_TYPE[c]] for c in SPIDER_COLOR_TO_VERTEX_TYPE}
+VERTEX_TYPE_CODE_TO_SPIDER_COLOR = {SPIDER_COLOR_TO_VERTEX_TYPE_CODE[c]: c for c in SPIDER_COLOR_TO_VERTEX_TYPE_CODE}
+
 SPIDER_COLORS = {"green", "red"}
 OTHER_SPIDER_COLOR = {"red": "green", "green": "red"}
 
@@ -19,6 +27,7 @@ BOUNDARY_NAME_TO_TYPE = {"in": INPUT, "out": OUTPUT, "IN": INPUT, "OUT": OUTPUT}
 class Diagram:
     g: Graph
     vertex_type_prop: VertexPropertyMap
+    vertex_type_code_prop: VertexPropertyMap # same as vertex_type_prop, integer coded (see VERTEX_TYPE_CODES)
     vertex_identifier_prop: VertexPropertyMap  # removing vertices invalidates the identifiers from graph_tool -> assign ourselves
     phase_prop: VertexPropertyMap
     hadamard_prop: EdgePropertyMap
@@ -26,6 +35,21 @@ class Diagram:
     boundary_qubit_indices_prop: VertexPropertyMap
     spider_qubit_indices_prop: VertexPropertyMap
 
+    # deferred removal: removed vertices are only hidden using a vertex filter, vertex indices stay valid until compact()
+    deferred_removal: bool
+    alive_prop: VertexPropertyMap
+
+    modification_count: int # incremented by every modification, allows views on the diagram (see DiagramSnapshot) to detect changes
+
+    is_spider_prop: VertexPropertyMap # label used for matching, kept up to date by all modifications
+    degree_prop: VertexPropertyMap # number of distinct neighbors (parallel wires and self loops are not counted), kept up to date by all modifications
+
+    # indices by vertex index (graph_tool vertex objects are invalidated by removals), kept up to date by all modifications
+    vertices_by_identifier: Dict[str, int]
+    vertices_by_type: Dict[str, Set[int]]
+    boundaries_by_type: Dict[str, Set[int]]
+    vertices_by_degree: Dict[Tuple[int, int], Set[int]] # (type code, degree) -> vertex indices
+
     def __init__(self, g: Graph = None):
         g = (g if g is not None else Graph(directed=False)) # what the heck python, default constructor parameters are only evaluated once
         self.g = g
@@ -56,10 +80,37 @@ class Diagram:
             self.boundary_qubit_indices_prop = self.g.vertex_properties["boundary_qubit_indices_prop"]
             self.spider_qubit_indices_prop = self.g.vertex_properties["spider_qubit_indices_prop"]
 
+        if not "vertex_type_code_prop" in self.g.vertex_properties:
+            self.vertex_type_code_prop = g.new_vertex_property("int")
+            for v in g.vertices():
+                self.vertex_type_code_prop[v] = VERTEX_TYPE_CODES.get(self.vertex_type_prop[v], VERTEX_TYPE_CODE_NONE)
+            self.g.vertex_properties["vertex_type_code_prop"] = self.vertex_type_code_prop
+        else:
+            self.vertex_type_code_prop = self.g.vertex_properties["vertex_type_code_prop"]
+
+        self.modification_count = 0
+        self.deferred_removal = False
+        self.alive_prop = g.new_vertex_property("bool") # not an internal property, clones are always compacted
+
+        self.is_spider_prop = g.new_vertex_property("bool")
+        self.is_spider_prop.a[:] = self.get_vertex_type_codes() > VERTEX_TYPE_CODES[VERTEX_BOUNDARY]
+
+        self.degree_prop = g.new_vertex_property("int")
+        wires = self.get_wire_endpoints()
+        wires = wires[wires[:, 0] != wires[:, 1]]
+        if len(wires) > 0:
+            distinct_wires = np.unique(np.sort(wires, axis=1), axis=0)
+            self.degree_prop.a[:] = np.bincount(distinct_wires.ravel(), minlength=self.get_vertex_index_count())
+
+        self.__build_index()
 
     def add_spider(self, phase: float = 0.0, color: str = "green", origin_qubit_index: int = None, identifier: str = None) -> Vertex:
+        self.modification_count += 1
         v = self.g.add_vertex()
         self.vertex_type_prop[v] = SPIDER_COLOR_TO_VERTEX_TYPE[color]
+        self.vertex_type_code_prop[v] = SPIDER_COLOR_TO_VERTEX_TYPE_CODE[color]
+        self.alive_prop[v] = True
+        self.is_spider_prop[v] = True
         self.phase_prop[v] = np.mod(phase, np.pi * 2.0)
 
         if origin_qubit_index:
@@ -67,10 +118,24 @@ class Diagram:
         if identifier:
             self.vertex_identifier_prop[v] = identifier
 
+        self.__add_to_index(v)
         return v
 
     def remove_spiders(self, vertices: List[Vertex]):
+        self.modification_count += 1
+        removed = sorted(set(int(v) for v in vertices))
+
+        removed_set = set(removed)
+        for v in removed:
+            for n in set(int(n) for n in self.g.vertex(v).all_neighbors()) - removed_set:
+                self.__change_degree(n, -1)
+
+        if self.deferred_removal:
+            self.__hide(removed)
+            return
+
         self.g.remove_vertex(vertices)
+        self.__remove_from_index(removed)
 
     """
     Removes a single spider from the diagram, this will invalidate other spiders!
@@ -81,9 +146,14 @@ class Diagram:
     Alternatively (and preferably), a list (or iterable) may be passed directly as the vertex parameter, and the above is performed internally (in C++)."
     """
     def remove_spider(self, v: Vertex):
-        self.g.remove_vertex(v)
+        self.remove_spiders([v])
 
     def add_wire(self, s1: Vertex, s2: Vertex, is_hadamard: bool = False) -> Edge:
+        self.modification_count += 1
+        if s1 != s2 and self.g.edge(s1, s2) is None:
+            self.__change_degree(int(s1), 1)
+            self.__change_degree(int(s2), 1)
+
         e = self.g.add_edge(s1, s2)
         self.hadamard_prop[e] = is_hadamard
 
@@ -91,55 +161,180 @@ class Diagram:
 
 
     def remove_wire(self, w: Edge = None, s1: Vertex = None, s2: Vertex = None):
+        self.modification_count += 1
         if w:
+            s1, s2 = w.source(), w.target()
             self.g.remove_edge(w)
         elif s1 is not None and s2 is not None:
             edges = set(filter(lambda e: e.source() == s2 or e.target() == s2, s1.all_edges()))
+            if len(edges) == 0:
+                return
             for e in edges:
                 self.g.remove_edge(e)
         else:
             raise RuntimeError("Invalid parameters")
 
+        if s1 != s2 and self.g.edge(s1, s2) is None:
+            self.__change_degree(int(s1), -1)
+            self.__change_degree(int(s2), -1)
+
     def add_boundary(self, type: str, qubit_index: int = None, identifier: str = None) -> Vertex:
+        self.modification_count += 1
         assert type in BOUNDARY_NAME_TO_TYPE
         v = self.g.add_vertex()
         self.vertex_type_prop[v] = VERTEX_BOUNDARY
+        self.vertex_type_code_prop[v] = VERTEX_TYPE_CODES[VERTEX_BOUNDARY]
+        self.alive_prop[v] = True
         self.boundary_type_prop[v] = BOUNDARY_NAME_TO_TYPE[type]
         if qubit_index:
             self.boundary_qubit_indices_prop[v] = qubit_index
         if identifier:
             self.vertex_identifier_prop[v] = identifier
 
+        self.__add_to_index(v)
         return v
 
     def remove_boundary(self, b: Vertex):
-        self.g.remove_vertex(b)
+        self.remove_spiders([b])
+
+    """
+    Enable / disable deferred removal
+    While enabled, removed vertices (and their wires) are hidden by a vertex filter instead of being removed,
+    which keeps all vertex descriptors and indices valid, compact() removes them for good
+    Disabling compacts the diagram
+    """
+    def set_deferred_removal(self, enabled: bool):
+        if enabled == self.deferred_removal:
+            return
+
+        if enabled:
+            self.alive_prop.a[:] = True
+            self.g.set_vertex_filter(self.alive_prop)
+            self.deferred_removal = True
+        else:
+            self.compact()
+            self.g.set_vertex_filter(None)
+            self.deferred_removal = False
+
+    """
+    Bring back vertices hidden by deferred removal (together with their wires to visible vertices), used for undoing rewrites
+    """
+    def restore_vertices(self, vertices: Iterable[int]):
+        assert self.deferred_removal, "Only vertices hidden by deferred removal can be restored"
+        self.modification_count += 1
+
+        restored = sorted(set(int(v) for v in vertices))
+        assert not self.alive_prop.a[restored].any(), "Cannot restore a visible vertex"
+        self.alive_prop.a[restored] = True
+
+        restored_set = set(restored)
+        for v in restored:
+            neighbors = set(int(n) for n in self.g.vertex(v).all_neighbors()) - {v}
+            for n in neighbors - restored_set:
+                self.__change_degree(n, 1)
+            self.degree_prop.a[v] = len(neighbors)
+            self.__add_to_index(self.g.vertex(v))
+
+    """
+    Remove all vertices with an index of at least the given count for good (also with deferred removal enabled)
+    The indices of the other vertices are not affected, used for undoing the addition of vertices
+    """
+    def truncate_vertices(self, vertex_count: int):
+        self.modification_count += 1
+        removed = list(range(vertex_count, self.get_vertex_index_count()))
+        if len(removed) == 0:
+            return
+
+        removed_set = set(removed)
+        for v in removed:
+            if self.deferred_removal and not self.alive_prop.a[v]:
+                continue # already dropped from the index when hidden
+            for n in set(int(n) for n in self.g.vertex(v).all_neighbors()) - removed_set:
+                self.__change_degree(n, -1)
+            self.__discard_from_index(self.g.vertex(v)) # the last vertices, no indices have to be shifted
+
+        if self.deferred_removal:
+            self.g.set_vertex_filter(None)
+        self.g.remove_vertex([self.g.vertex(v) for v in reversed(removed)])
+        if self.deferred_removal:
+            self.g.set_vertex_filter(self.alive_prop)
+
+    """
+    Remove all vertices hidden by deferred removal, this reindexes the graph
+    :returns an array mapping old vertex indices to new ones, -1 for removed vertices
+    """
+    def compact(self) -> np.ndarray:
+        self.modification_count += 1
+        alive = self.get_alive_mask()
+        remap = np.cumsum(alive) - 1
+        remap[~alive] = -1
+
+        removed = np.flatnonzero(~alive).tolist()
+        if len(removed) > 0:
+            self.g.set_vertex_filter(None)
+            self.g.remove_vertex([self.g.vertex(v) for v in removed])
+            self.alive_prop.a[:] = True
+            self.g.set_vertex_filter(self.alive_prop)
+            self.__remove_from_index(removed)
+
+        return remap
+
+    """
+    Number of vertex indices currently in use, including removed vertices that haven't been compacted yet
+    Arrays indexed by vertex index (see get_vertex_type_codes) have this size
+    """
+    def get_vertex_index_count(self) -> int:
+        return self.g.num_vertices(ignore_filter=True)
+
+    def get_hidden_vertex_count(self) -> int:
+        return self.get_vertex_index_count() - self.g.num_vertices()
+
+    """
+    Is the vertex with the given index visible (not hidden by deferred removal)?
+    """
+    def is_alive(self, v: int) -> bool:
+        return bool(self.alive_prop.a[int(v)])
+
+    def get_alive_mask(self) -> np.ndarray:
+        if not self.deferred_removal:
+            return np.ones(self.get_vertex_index_count(), dtype=bool)
+        return self.alive_prop.a.astype(bool)
 
     def is_spider(self, v: Vertex) -> bool:
-        return self.vertex_type_prop[v] == VERTEX_SPIDER_GREEN or self.vertex_type_prop[v] == VERTEX_SPIDER_RED
+        return self.vertex_type_code_prop[v] > VERTEX_TYPE_CODES[VERTEX_BOUNDARY]
 
     def get_spiders(self) -> List[Vertex]:
-        return [v for v in self.g.vertices() if self.is_spider(v)]
+        return self.__vertices(self.vertices_by_type[VERTEX_SPIDER_GREEN] | self.vertices_by_type[VERTEX_SPIDER_RED])
 
     def get_spiders_by_color(self, color: str) -> List[Vertex]:
         assert color in SPIDER_COLORS
-        return [s for s in self.get_spiders() if self.get_spider_color(s) == color]
+        return self.__vertices(self.vertices_by_type[SPIDER_COLOR_TO_VERTEX_TYPE[color]])
 
-    def is_boundary(self, v: Vertex) -> List[Vertex]:
-        return self.vertex_type_prop[v] == VERTEX_BOUNDARY
+    """
+    Returns the indices of all spiders with at most the given number of distinct neighbors, optionally of the given color
+    """
+    def get_spiders_by_degree(self, max_degree: int, color: Optional[str] = None) -> List[int]:
+        codes = {SPIDER_COLOR_TO_VERTEX_TYPE_CODE[color]} if color is not None else set(SPIDER_COLOR_TO_VERTEX_TYPE_CODE.values())
+        return sorted(v for (code, degree), vertices in self.vertices_by_degree.items() if code in codes and degree <= max_degree for v in vertices)
+
+    def get_degree(self, v: Vertex) -> int:
+        return int(self.degree_prop.a[int(v)])
+
+    def is_boundary(self, v: Vertex) -> bool:
+        return self.vertex_type_code_prop[v] == VERTEX_TYPE_CODES[VERTEX_BOUNDARY]
     def is_input(self, v: Vertex):
         return self.is_boundary(v) and self.boundary_type_prop[v] == INPUT
     def is_output(self, v: Vertex):
         return self.is_boundary(v) and self.boundary_type_prop[v] == OUTPUT
 
     def get_boundaries(self):
-        return [v for v in self.g.vertices() if self.is_boundary(v)]
+        return self.__vertices(self.vertices_by_type[VERTEX_BOUNDARY])
 
     def get_inputs(self) -> List[Vertex]:
-        return [v for v in self.g.vertices() if self.is_input(v)]
+        return self.__vertices(self.boundaries_by_type[INPUT])
 
     def get_outputs(self) -> List[Vertex]:
-        return [v for v in self.g.vertices() if self.is_output(v)]
+        return self.__vertices(self.boundaries_by_type[OUTPUT])
 
     def get_boundary_index(self, b: Vertex) -> int:
         return self.boundary_qubit_indices_prop[b]
@@ -151,42 +346,184 @@ class Diagram:
         return self.hadamard_prop[e] == 1
 
     def set_wire_hadamard(self, e: Edge, is_h: bool):
+        self.modification_count += 1
         self.hadamard_prop[e] = is_h
 
     def get_spider_color(self, s: Vertex) -> str:
-        assert self.vertex_type_prop[s] in VERTEX_TYPE_TO_SPIDER_COLOR, "A non spider (boundary) vertex has no color"
-        return VERTEX_TYPE_TO_SPIDER_COLOR[self.vertex_type_prop[s]]
+        code = self.vertex_type_code_prop[s]
+        assert code in VERTEX_TYPE_CODE_TO_SPIDER_COLOR, "A non spider (boundary) vertex has no color"
+        return VERTEX_TYPE_CODE_TO_SPIDER_COLOR[code]
 
     def set_spider_color(self, s: Vertex, color: str):
+        self.modification_count += 1
         assert color in SPIDER_COLORS
+        self.__degree_bucket(int(s)).discard(int(s))
+        self.vertices_by_type[self.vertex_type_prop[s]].discard(int(s))
         self.vertex_type_prop[s] = SPIDER_COLOR_TO_VERTEX_TYPE[color]
+        self.vertex_type_code_prop[s] = SPIDER_COLOR_TO_VERTEX_TYPE_CODE[color]
+        self.vertices_by_type[self.vertex_type_prop[s]].add(int(s))
+        self.__degree_bucket(int(s)).add(int(s))
 
     def get_spider_phase(self, s: Vertex) -> float:
         return self.phase_prop[s]
     def set_spider_phase(self, s: Vertex, phase: float):
+        self.modification_count += 1
         self.phase_prop[s] = phase
 
     def get_non_boundary_wires(self):
         return [e for e in self.g.edges() if not self.is_boundary(e.source) and not self.is_boundary(e.target)]
 
     def get_vertex_from_identifier(self, identifier: str) -> Optional[Vertex]:
-        for s in self.g.vertices():
-            if self.vertex_identifier_prop[s] == identifier:
-                return s
-        return None
+        v = self.vertices_by_identifier.get(identifier)
+        return self.g.vertex(v) if v is not None else None
+
+
+    """
+    Array views of the property maps, indexed by vertex / edge index (including vertices hidden by deferred removal)
+    Writing to the arrays bypasses the indices of the diagram, they should be treated as read only
+    """
+    def get_vertex_type_codes(self) -> np.ndarray:
+        return self.vertex_type_code_prop.a
+
+    def get_phases(self) -> np.ndarray:
+        return self.phase_prop.a
+
+    def get_degrees(self) -> np.ndarray:
+        return self.degree_prop.a
 
+    def get_spider_mask(self, color: Optional[str] = None) -> np.ndarray:
+        codes = self.get_vertex_type_codes()
+        if color is None:
+            return (codes > VERTEX_TYPE_CODES[VERTEX_BOUNDARY]) & self.get_alive_mask()
+        assert color in SPIDER_COLORS
+        return (codes == SPIDER_COLOR_TO_VERTEX_TYPE_CODE[color]) & self.get_alive_mask()
+
+    def get_boundary_mask(self) -> np.ndarray:
+        return (self.get_vertex_type_codes() == VERTEX_TYPE_CODES[VERTEX_BOUNDARY]) & self.get_alive_mask()
+
+    """
+    Returns the endpoints of all wires as an array of shape (wires, 2), optionally only (non) hadamard wires
+    """
+    def get_wire_endpoints(self, is_hadamard: Optional[bool] = None) -> np.ndarray:
+        wires = self.g.get_edges([self.hadamard_prop])
+        if is_hadamard is not None:
+            wires = wires[(wires[:, 2] != 0) == is_hadamard]
+        return wires[:, :2]
 
     def clone(self) -> "Diagram":
-        return Diagram(self.g.copy())
+        return Diagram(Graph(self.g, prune=True)) # hidden vertices are not copied
+
+    """
+    Copy all (visible) vertices and wires of the other diagram into this one, keeping colors, phases, boundary types and indices
+    :returns an array mapping the other diagram's vertex indices to the indices in this diagram, -1 for hidden vertices
+    """
+    def add_diagram(self, other: "Diagram") -> np.ndarray:
+        remap = np.full(other.get_vertex_index_count(), -1, dtype=int)
+        for v in other.g.vertices():
+            if other.is_boundary(v):
+                new_v = self.add_boundary(other.boundary_type_prop[v], other.get_boundary_index(v), other.vertex_identifier_prop[v])
+            else:
+                new_v = self.add_spider(other.get_spider_phase(v), other.get_spider_color(v), other.get_spider_qubit_index(v), other.vertex_identifier_prop[v])
+            remap[int(v)] = int(new_v)
+
+        for wire in other.g.edges():
+            self.add_wire(self.g.vertex(remap[int(wire.source())]), self.g.vertex(remap[int(wire.target())]), other.is_wire_hadamard(wire))
+
+        return remap
+
+    """
+    The (visible) vertex indices of each connected component in ascending order, components ordered by their first vertex
+    """
+    def get_component_vertices(self) -> List[np.ndarray]:
+        labels, _ = label_components(self.g)
+        alive = self.get_alive_mask()
+        component_labels = labels.a[alive]
+
+        _, first_vertices = np.unique(component_labels, return_index=True)
+        return [np.flatnonzero((labels.a == component_labels[i]) & alive) for i in sorted(first_vertices)]
+
+    """
+    Split the diagram into its connected components, each returned as a new diagram (hidden vertices are not copied)
+    The vertices of a component keep the order of their indices, see get_component_vertices
+    """
+    def split_components(self) -> List["Diagram"]:
+        components = []
+        for vertices in self.get_component_vertices():
+            mask = np.zeros(self.get_vertex_index_count(), dtype=bool)
+            mask[vertices] = True
+            components.append(Diagram(Graph(GraphView(self.g, vfilt=mask), prune=True)))
+        return components
+
+
+    def __build_index(self):
+        self.vertices_by_identifier = {}
+        self.vertices_by_type = {VERTEX_BOUNDARY: set(), VERTEX_SPIDER_GREEN: set(), VERTEX_SPIDER_RED: set()}
+        self.boundaries_by_type = {INPUT: set(), OUTPUT: set()}
+        self.vertices_by_degree = {}
+        for v in self.g.vertices():
+            self.__add_to_index(v)
+
+    def __add_to_index(self, v: Vertex):
+        index = int(v)
+        self.vertices_by_type[self.vertex_type_prop[v]].add(index)
+        if self.is_boundary(v):
+            self.boundaries_by_type[self.boundary_type_prop[v]].add(index)
+        if self.vertex_identifier_prop[v] != "":
+            self.vertices_by_identifier.setdefault(self.vertex_identifier_prop[v], index) # the first vertex wins, like a linear search
+        self.__degree_bucket(index).add(index)
+
+    """
+    Undo __add_to_index for a single vertex, the indices of the other vertices are not changed
+    """
+    def __discard_from_index(self, v: Vertex):
+        index = int(v)
+        self.vertices_by_type[self.vertex_type_prop[v]].discard(index)
+        if self.is_boundary(v):
+            self.boundaries_by_type[self.boundary_type_prop[v]].discard(index)
+        identifier = self.vertex_identifier_prop[v]
+        if identifier != "" and self.vertices_by_identifier.get(identifier) == index:
+            del self.vertices_by_identifier[identifier]
+        self.__degree_bucket(index).discard(index)
+
+    def __degree_bucket(self, v: int) -> Set[int]:
+        return self.vertices_by_degree.setdefault((int(self.vertex_type_code_prop.a[v]), int(self.degree_prop.a[v])), set())
+
+    def __change_degree(self, v: int, delta: int):
+        self.__degree_bucket(v).discard(v)
+        self.degree_prop.a[v] += delta
+        self.__degree_bucket(v).add(v)
+
+    """
+    Hide the given vertices (deferred removal), their indices stay valid until the diagram is compacted
+    """
+    def __hide(self, removed: List[int]):
+        for v in removed:
+            self.__discard_from_index(self.g.vertex(v)) # still visible
+        self.alive_prop.a[removed] = False
+
+    """
+    Drop the removed vertices from the index and shift the indices of the following vertices like graph_tool does
+    :param removed: the removed vertex indices in ascending order
+    """
+    def __remove_from_index(self, removed: List[int]):
+        if len(removed) == 0:
+            return
+        removed_set = set(removed)
+        shift = lambda v: v - bisect_left(removed, v)
+
+        self.vertices_by_identifier = {i: shift(v) for i, v in self.vertices_by_identifier.items() if v not in removed_set}
+        for index in [self.vertices_by_type, self.boundaries_by_type, self.vertices_by_degree]:
+            for t in index:
+                index[t] = {shift(v) for v in index[t] if v not in removed_set}
 
+    def __vertices(self, indices: Iterable[int]) -> List[Vertex]:
+        return [self.g.vertex(v) for v in sorted(indices)]
 
     """
-    Generate a map indicating for each vertex of the diagram, if it is a spider
+    Returns a map indicating for each vertex of the diagram, if it is a spider
     Used for matching to exclude boundaries from subisomorphism
+    The map is maintained by the diagram and must not be modified, hidden vertices are excluded by the vertex filter
     """
     def generate_is_spider_property(self):
-        prop = self.g.new_vertex_property("bool")
-        for s in self.g.vertices():
-            prop[s] = self.is_spider(s)
-        return prop
+        return self.is_spider_prop
 
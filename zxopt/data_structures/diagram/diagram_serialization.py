@@ -0,0 +1,154 @@
+import json
+import struct
+from typing import Dict
+
+import numpy as np
+from graph_tool import Graph
+
+from zxopt.data_structures.diagram.diagram import Diagram, VERTEX_TYPE_CODES, VERTEX_TYPE_CODE_NONE, INPUT, OUTPUT
+
+BOUNDARY_TYPE_CODE_NONE = 0
+BOUNDARY_TYPE_CODES = {INPUT: 1, OUTPUT: 2}
+VERTEX_TYPE_CODE_TO_VERTEX_TYPE = {code: t for t, code in VERTEX_TYPE_CODES.items()}
+BOUNDARY_TYPE_CODE_TO_BOUNDARY_TYPE = {code: t for t, code in BOUNDARY_TYPE_CODES.items()}
+
+# on disk format: magic, version, header length, json header (array name -> dtype, shape, offset), aligned raw arrays
+DIAGRAM_FORMAT_MAGIC = b"ZXDIAGRM"
+DIAGRAM_FORMAT_VERSION = 1
+DIAGRAM_FORMAT_PREAMBLE = struct.Struct("<8sII") # magic, version, header length
+DIAGRAM_FORMAT_ALIGNMENT = 64
+
+"""
+Compact representation of a diagram as numpy arrays, indexed by vertex index (including hidden vertices) / wire
+Arrays can be pickled cheaply, which makes them suitable for shipping a diagram to other processes
+"""
+def diagram_to_arrays(diagram: Diagram) -> Dict[str, np.ndarray]:
+    g = diagram.g
+    wires = g.get_edges([diagram.hadamard_prop]) # hidden vertices and their wires are excluded by the vertex filter
+
+    boundary_types = np.zeros(diagram.get_vertex_index_count(), dtype=np.int8)
+    identifiers = np.full(diagram.get_vertex_index_count(), "", dtype=object)
+    for v in g.vertices():
+        boundary_types[int(v)] = BOUNDARY_TYPE_CODES.get(diagram.boundary_type_prop[v], BOUNDARY_TYPE_CODE_NONE)
+        identifiers[int(v)] = diagram.vertex_identifier_prop[v]
+
+    return {
+        "vertex_type_codes": np.array(diagram.get_vertex_type_codes(), dtype=np.int8),
+        "phases": np.array(diagram.get_phases(), dtype=np.float64),
+        "boundary_types": boundary_types,
+        "boundary_qubit_indices": np.array(diagram.boundary_qubit_indices_prop.a, dtype=np.int32),
+        "spider_qubit_indices": np.array(diagram.spider_qubit_indices_prop.a, dtype=np.int32),
+        "identifiers": identifiers.astype(str),
+        "alive": diagram.get_alive_mask().copy(),
+        "wires": np.array(wires[:, :2], dtype=np.int64),
+        "wire_hadamard": wires[:, 2] != 0
+    }
+
+"""
+Rebuild a diagram from its array representation, vertex indices are preserved
+Hidden vertices are restored as hidden (deferred removal is enabled on the result in that case)
+"""
+def diagram_from_arrays(arrays: Dict[str, np.ndarray]) -> Diagram:
+    vertex_count = len(arrays["vertex_type_codes"])
+
+    g = Graph(directed=False)
+    g.add_vertex(vertex_count)
+    g.add_edge_list(np.asarray(arrays["wires"], dtype=np.int64).reshape(-1, 2))
+
+    vertex_type_prop = g.new_vertex_property("string")
+    vertex_type_code_prop = g.new_vertex_property("int")
+    vertex_identifier_prop = g.new_vertex_property("string")
+    phase_prop = g.new_vertex_property("float")
+    hadamard_prop = g.new_edge_property("bool")
+    boundary_type_prop = g.new_vertex_property("string")
+    boundary_qubit_indices_prop = g.new_vertex_property("int")
+    spider_qubit_indices_prop = g.new_vertex_property("int")
+
+    vertex_type_code_prop.a[:] = arrays["vertex_type_codes"]
+    phase_prop.a[:] = arrays["phases"]
+    hadamard_prop.a[:] = arrays["wire_hadamard"]
+    boundary_qubit_indices_prop.a[:] = arrays["boundary_qubit_indices"]
+    spider_qubit_indices_prop.a[:] = arrays["spider_qubit_indices"]
+    for v in range(vertex_count):
+        code = int(arrays["vertex_type_codes"][v])
+        if code != VERTEX_TYPE_CODE_NONE:
+            vertex_type_prop[v] = VERTEX_TYPE_CODE_TO_VERTEX_TYPE[code]
+        boundary_type = int(arrays["boundary_types"][v])
+        if boundary_type != BOUNDARY_TYPE_CODE_NONE:
+            boundary_type_prop[v] = BOUNDARY_TYPE_CODE_TO_BOUNDARY_TYPE[boundary_type]
+        vertex_identifier_prop[v] = str(arrays["identifiers"][v])
+
+    g.vertex_properties["vertex_type_prop"] = vertex_type_prop
+    g.vertex_properties["vertex_type_code_prop"] = vertex_type_code_prop
+    g.vertex_properties["vertex_identifier_prop"] = vertex_identifier_prop
+    g.vertex_properties["phase_prop"] = phase_prop
+    g.edge_properties["hadamard_prop"] = hadamard_prop
+    g.vertex_properties["boundary_type_prop"] = boundary_type_prop
+    g.vertex_properties["boundary_qubit_indices_prop"] = boundary_qubit_indices_prop
+    g.vertex_properties["spider_qubit_indices_prop"] = spider_qubit_indices_prop
+
+    diagram = Diagram(g)
+    hidden = np.flatnonzero(~np.asarray(arrays["alive"], dtype=bool))
+    if len(hidden) > 0:
+        diagram.set_deferred_removal(True)
+        diagram.remove_spiders([g.vertex(v) for v in hidden])
+    return diagram
+
+
+"""
+Write the diagram to the given file in the binary diagram format, see load_diagram
+"""
+def save_diagram(diagram: Diagram, path: str):
+    arrays = diagram_to_arrays(diagram)
+
+    header = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        header[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(DIAGRAM_FORMAT_PREAMBLE.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(DIAGRAM_FORMAT_PREAMBLE.pack(DIAGRAM_FORMAT_MAGIC, DIAGRAM_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+
+"""
+Read the arrays of a diagram file, see diagram_to_arrays
+:param mmap: map the arrays into memory (read only) instead of reading them, the data is only loaded when accessed
+"""
+def load_diagram_arrays(path: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    with open(path, "rb") as f:
+        preamble = f.read(DIAGRAM_FORMAT_PREAMBLE.size)
+        if len(preamble) < DIAGRAM_FORMAT_PREAMBLE.size:
+            raise ValueError(f"{path} is not a diagram file")
+        magic, version, header_length = DIAGRAM_FORMAT_PREAMBLE.unpack(preamble)
+        if magic != DIAGRAM_FORMAT_MAGIC:
+            raise ValueError(f"{path} is not a diagram file")
+        if version != DIAGRAM_FORMAT_VERSION:
+            raise ValueError(f"Unsupported diagram format version {version}, expected {DIAGRAM_FORMAT_VERSION}")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+        data_start = _align(DIAGRAM_FORMAT_PREAMBLE.size + header_length)
+
+        arrays = {}
+        for name, entry in header.items():
+            dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+            if mmap and int(np.prod(shape)) > 0:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=data_start + entry["offset"], shape=shape)
+            else:
+                f.seek(data_start + entry["offset"])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        return arrays
+
+"""
+Load a diagram written by save_diagram, vertex indices are preserved
+"""
+def load_diagram(path: str, mmap: bool = True) -> Diagram:
+    return diagram_from_arrays(load_diagram_arrays(path, mmap))
+
+def _align(offset: int) -> int:
+    return (offset + DIAGRAM_FORMAT_ALIGNMENT - 1) // DIAGRAM_FORMAT_ALIGNMENT * DIAGRAM_FORMAT_ALIGNMENT
@@ -0,0 +1,86 @@
+from typing import Dict, List
+
+from graph_tool import Graph, Vertex, Edge
+
+from zxopt.data_structures.diagram.diagram import Diagram, SPIDER_COLORS, SPIDER_COLOR_TO_VERTEX_TYPE
+
+"""
+A copy-on-write view of a frozen diagram for read-mostly transformations
+Spider colors and wire hadamard states can be changed, the changes are recorded in the snapshot instead of the diagram,
+which makes taking a snapshot O(1) instead of copying the graph and all property maps like Diagram.clone().
+The base diagram must not be modified while the snapshot is in use, this is checked on access.
+Structural changes (adding / removing vertices or wires) are not supported, clone the diagram for those.
+"""
+class DiagramSnapshot:
+    base: Diagram
+    g: Graph # the graph of the base diagram, read only
+    base_modification_count: int
+    spider_colors: Dict[int, str] # changed colors by vertex index
+    wire_hadamard: Dict[int, bool] # changed hadamard states by edge index
+
+    def __init__(self, base: Diagram):
+        self.base = base
+        self.g = base.g
+        self.base_modification_count = base.modification_count
+        self.spider_colors = {}
+        self.wire_hadamard = {}
+
+    def is_spider(self, v: Vertex) -> bool:
+        return self.base.is_spider(v)
+
+    def is_boundary(self, v: Vertex) -> bool:
+        return self.base.is_boundary(v)
+
+    def get_spiders(self) -> List[Vertex]:
+        self.__check_base()
+        return self.base.get_spiders()
+
+    """
+    Answered from the type index of the base diagram, patched with the colors changed in the snapshot
+    """
+    def get_spiders_by_color(self, color: str) -> List[Vertex]:
+        assert color in SPIDER_COLORS
+        self.__check_base()
+        if len(self.spider_colors) == 0:
+            return self.base.get_spiders_by_color(color)
+
+        indices = set(self.base.vertices_by_type[SPIDER_COLOR_TO_VERTEX_TYPE[color]])
+        for v, changed_color in self.spider_colors.items():
+            if changed_color == color:
+                indices.add(v)
+            else:
+                indices.discard(v)
+        return [self.g.vertex(v) for v in sorted(indices)]
+
+    def get_inputs(self) -> List[Vertex]:
+        self.__check_base()
+        return self.base.get_inputs()
+
+    def get_outputs(self) -> List[Vertex]:
+        self.__check_base()
+        return self.base.get_outputs()
+
+    def get_boundary_index(self, b: Vertex) -> int:
+        return self.base.get_boundary_index(b)
+
+    def get_spider_phase(self, s: Vertex) -> float:
+        return self.base.get_spider_phase(s)
+
+    def get_spider_color(self, s: Vertex) -> str:
+        return self.spider_colors.get(int(s)) or self.base.get_spider_color(s)
+
+    def set_spider_color(self, s: Vertex, color: str):
+        assert color in SPIDER_COLORS
+        self.__check_base()
+        self.spider_colors[int(s)] = color
+
+    def is_wire_hadamard(self, e: Edge) -> bool:
+        is_hadamard = self.wire_hadamard.get(self.base.g.edge_index[e])
+        return is_hadamard if is_hadamard is not None else self.base.is_wire_hadamard(e)
+
+    def set_wire_hadamard(self, e: Edge, is_h: bool):
+        self.__check_base()
+        self.wire_hadamard[self.base.g.edge_index[e]] = is_h
+
+    def __check_base(self):
+        assert self.base.modification_count == self.base_modification_count, "The base diagram of a snapshot has been modified"
@@ -2,12 +2,31 @@
 
 __all__ = [
     "Optimizer",
+    "resume_optimizer",
     "OptimizationStrategy",
     "RankedOptimizationStrategy",
+    "ParallelRankedOptimizationStrategy",
+    "BeamSearchOptimizationStrategy",
+    "CostFunction",
+    "spider_count_cost",
+    "wire_count_cost",
+    "t_count_cost",
+    "weighted_cost",
     "Simplifier",
     "SingleRuleSimplifier",
-    "CompoundSimplifier"
+    "CompoundSimplifier",
+    "ValidationPolicy",
+    "NoValidationPolicy",
+    "EveryRewriteValidationPolicy",
+    "EveryNRewritesValidationPolicy",
+    "FinalValidationPolicy",
+    "RandomSampledValidationPolicy",
+    "FirstRuleUseValidationPolicy"
 ]
 
-from zxopt.optimization.optimization_strategy import OptimizationStrategy, Simplifier, SingleRuleSimplifier, CompoundSimplifier, RankedOptimizationStrategy
-from zxopt.optimization.optimizer import Optimizer
\ No newline at end of file
+from zxopt.optimization.optimization_strategy import OptimizationStrategy, Simplifier, SingleRuleSimplifier, CompoundSimplifier, RankedOptimizationStrategy, \
+    ParallelRankedOptimizationStrategy, BeamSearchOptimizationStrategy
+from zxopt.optimization.cost_function import CostFunction, spider_count_cost, wire_count_cost, t_count_cost, weighted_cost
+from zxopt.optimization.validation_policy import ValidationPolicy, NoValidationPolicy, EveryRewriteValidationPolicy, \
+    EveryNRewritesValidationPolicy, FinalValidationPolicy, RandomSampledValidationPolicy, FirstRuleUseValidationPolicy
+from zxopt.optimization.optimizer import Optimizer, resume_optimizer
\ No newline at end of file
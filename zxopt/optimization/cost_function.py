@@ -0,0 +1,30 @@
+from typing import Callable
+
+import numpy as np
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.validation.diagram_stabilizer_extractor import CLIFFORD_PHASE_EPSILON
+
+# a cost function rates a diagram, lower is better
+CostFunction = Callable[[Diagram], float]
+
+def spider_count_cost(diagram: Diagram) -> float:
+    return float(np.count_nonzero(diagram.get_spider_mask()))
+
+def wire_count_cost(diagram: Diagram) -> float:
+    return float(diagram.g.num_edges()) # hidden vertices and their wires are excluded by the vertex filter
+
+"""
+Number of spiders with a non Clifford phase (not a multiple of pi/2), each of these requires a T gate when extracting a circuit
+"""
+def t_count_cost(diagram: Diagram) -> float:
+    quarter_turns = diagram.get_phases()[diagram.get_spider_mask()] / (np.pi / 2.0)
+    return float(np.count_nonzero(np.abs(quarter_turns - np.round(quarter_turns)) > CLIFFORD_PHASE_EPSILON))
+
+"""
+Combine the T count, spider count and wire count using the given weights, e.g. prioritizing the T count and breaking ties using the other ones
+"""
+def weighted_cost(t_count_weight: float = 1.0, spider_count_weight: float = 0.0, wire_count_weight: float = 0.0) -> CostFunction:
+    def cost(diagram: Diagram) -> float:
+        return t_count_weight * t_count_cost(diagram) + spider_count_weight * spider_count_cost(diagram) + wire_count_weight * wire_count_cost(diagram)
+    return cost
@@ -1,10 +1,30 @@
 import abc
+import multiprocessing
 import random
-from typing import List, Optional
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing.sharedctypes import Synchronized
+from typing import List, Optional, Iterable, Tuple, Dict, Set
+
+import numpy as np
 
 from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram_serialization import diagram_to_arrays, diagram_from_arrays
+from zxopt.optimization.cost_function import CostFunction, spider_count_cost
 from zxopt.rewriting import RewriteRule
+from zxopt.rewriting.match import Match
 from zxopt.rewriting.matcher import Matcher
+from zxopt.rewriting.rewriter import Rewriter
+
+SYNC_INTERVAL = 256 # parallel ranked strategy: rewrites replayed by the workers before the pool is restarted on the current diagram
+
+BEAM_WIDTH = 4
+BEAM_DEPTH = 3
+BEAM_BRANCHING = 8 # matches per rule considered when expanding a state
+BEAM_MAX_CANDIDATES = 4096 # rewrite sequences held per search level
+BEAM_MAX_PLATEAU_STEPS = 64 # rewrites not lowering the cost in a row before the search ends
+BEAM_FINGERPRINT_PHASE_DECIMALS = 9
+SEARCH_COMPACTION_RATIO = 0.5 # compact the search diagram once the hidden vertices exceed this fraction of the visible ones
 
 
 class OptimizationStrategy:
@@ -12,10 +32,36 @@ class OptimizationStrategy:
     def __init__(self):
         pass
 
+    """
+    Find the next match to be applied to the diagram, it can be passed to the rewriter directly
+    If seed vertices are given, only rules matching in the neighborhood of those vertices are considered
+    """
     @abc.abstractmethod
-    def find_next_rule(self, diagram: Diagram) -> Optional[RewriteRule]:
+    def find_next_match(self, diagram: Diagram, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Match]:
         raise NotImplementedError()
 
+    """
+    Find the next rule to be applied to the diagram, see find_next_match
+    """
+    def find_next_rule(self, diagram: Diagram, seed_vertices: Optional[Iterable[int]] = None) -> Optional[RewriteRule]:
+        match = self.find_next_match(diagram, seed_vertices)
+        return match.rule if match is not None else None
+
+    """
+    Release all resources held by the strategy, called by the optimizer once the optimization finished
+    """
+    def shutdown(self):
+        pass
+
+    """
+    The picklable internal state of the strategy (e.g. random number generators), used for checkpointing
+    """
+    def get_state(self) -> object:
+        return None
+
+    def set_state(self, state: object):
+        pass
+
 """
 Executes rules by rank, when one rules matches, returns back to the top of the list and starts again
 """
@@ -26,18 +72,419 @@ class RankedOptimizationStrategy(OptimizationStrategy):
         super().__init__()
         self.simplifier = simplifier
 
-    def find_next_rule(self, diagram: Diagram) -> Optional[RewriteRule]:
+    def find_next_match(self, diagram: Diagram, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Match]:
         order_rules_considered = self.simplifier.rules()
 
         matcher = Matcher(diagram)
         for rule in order_rules_considered:
-            match = matcher.match_rule(rule, apply=False, generate_on_the_fly=True)
+            match = matcher.find_match(rule, generate_on_the_fly=True, seed_vertices=seed_vertices)
 
             if match is not None:
-                return rule
+                return match
+
+        return None
+
+    def get_state(self) -> object:
+        return self.simplifier.get_state()
+
+    def set_state(self, state: object):
+        self.simplifier.set_state(state)
+
+"""
+Like the RankedOptimizationStrategy, but the rules are searched concurrently by worker processes
+The ranked rules are split into consecutive blocks, one per worker, each worker searches its block in rank order and
+reports the first match. The results are consumed in rank order: once a worker reports a match, no later block can
+provide a higher ranked one, the remaining searches are aborted and the match is rebuilt on the diagram of this process.
+
+Workers are forked and inherit the rules (which therefore don't have to be picklable) and a copy of the diagram.
+The copies are kept in sync by replaying the rewrites (rule, embedding): each worker has its own single process pool,
+every search ships only the rewrites returned since that worker's last search. A replica of the workers' diagram is kept
+in this process to detect whether the diagram has only been changed by applying the returned match (same modification count),
+otherwise (e.g. the diagram has been compacted) or after SYNC_INTERVAL rewrites, the workers are restarted on the current diagram.
+"""
+class ParallelRankedOptimizationStrategy(RankedOptimizationStrategy):
+    workers: int
+    executors: List[ProcessPoolExecutor] # one single process pool per worker, empty if not started
+    pool_rules: List[RewriteRule] # the rules known to the workers, referenced by index
+    search_generation: Optional[Synchronized] # shared with the workers, incremented to abort the running searches
+
+    replica: Optional[Diagram] # the diagram as known to the workers, indices match the diagram
+    replayed_rewrites: List[Tuple[int, List[int]]] # (rule index, embedding) applied to the replica since the workers were started
+    shipped_rewrites: List[int] # number of replayed rewrites shipped to each worker
+    pending_rewrite: Optional[Tuple[int, List[int]]] # the last returned match, expected to be applied before the next search
+    expected_modification_count: int # modification count of the diagram if it is in sync with the replica
+
+    def __init__(self, simplifier: "Simplifier", workers: Optional[int] = None):
+        super().__init__(simplifier)
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.executors = []
+        self.pool_rules = []
+        self.search_generation = None
+
+        self.replica = None
+        self.replayed_rewrites = []
+        self.shipped_rewrites = []
+        self.pending_rewrite = None
+        self.expected_modification_count = -1
+
+    def find_next_match(self, diagram: Diagram, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Match]:
+        ranked_rules = self.simplifier.rules()
+        if self.workers <= 1 or len(ranked_rules) <= 1:
+            return super().find_next_match(diagram, seed_vertices)
+
+        rule_ids = self.__sync(diagram, ranked_rules)
+        seed_vertices = list(seed_vertices) if seed_vertices is not None else None
+
+        block_size = -(-len(ranked_rules) // self.workers)
+        generation = self.search_generation.value
+        submissions = []
+        for worker in range(self.workers):
+            ranks = range(worker * block_size, min((worker + 1) * block_size, len(ranked_rules)))
+            if len(ranks) == 0:
+                break
+            shipped = self.shipped_rewrites[worker]
+            future = self.executors[worker].submit(_find_first_match, [(rank, rule_ids[rank]) for rank in ranks],
+                                                   shipped, self.replayed_rewrites[shipped:], generation, seed_vertices)
+            submissions.append((worker, future))
+
+        result = None
+        for i, (worker, future) in enumerate(submissions):
+            result = future.result()
+            self.shipped_rewrites[worker] = len(self.replayed_rewrites)
+            if result is not None:
+                self.__abort(submissions[i + 1:])
+                break
+
+        if result is None:
+            return None
+
+        rank, embedding = result
+        match = Matcher(diagram).match_embedding(ranked_rules[rank], embedding)
+        assert match is not None, "Match found by a worker does not match the diagram"
+        self.pending_rewrite = (rule_ids[rank], embedding)
+        return match
+
+    def shutdown(self):
+        for executor in self.executors:
+            executor.shutdown()
+        self.executors = []
+        self.search_generation = None
+        self.replica = None
+        self.replayed_rewrites = []
+        self.shipped_rewrites = []
+        self.pending_rewrite = None
+
+    """
+    Abort the given searches (worker, future), their results are not needed anymore
+    Searches that have already been handed to the worker still apply the shipped rewrites
+    """
+    def __abort(self, submissions: List[Tuple[int, Future]]):
+        with self.search_generation.get_lock():
+            self.search_generation.value += 1
+        for worker, future in submissions:
+            if not future.cancel():
+                self.shipped_rewrites[worker] = len(self.replayed_rewrites)
+
+    """
+    Bring the workers' diagram up to date, replaying the last returned match if it has been applied, restarting the workers otherwise
+    :returns the indices of the given rules in the rule list of the workers
+    """
+    def __sync(self, diagram: Diagram, rules: List[RewriteRule]) -> List[int]:
+        if self.pending_rewrite is not None and self.replica is not None:
+            rule_id, embedding = self.pending_rewrite
+            modification_count_before = self.replica.modification_count
+            Rewriter(self.replica).rewrite(Matcher(self.replica).match_embedding(self.pool_rules[rule_id], embedding))
+            self.expected_modification_count += self.replica.modification_count - modification_count_before
+            self.replayed_rewrites.append(self.pending_rewrite)
+        self.pending_rewrite = None
+
+        ids_by_rule = {id(r): i for i, r in enumerate(self.pool_rules)}
+        in_sync = len(self.executors) > 0 and diagram.modification_count == self.expected_modification_count \
+            and diagram.get_vertex_index_count() == self.replica.get_vertex_index_count() and diagram.g.num_edges() == self.replica.g.num_edges()
+
+        if not in_sync or len(self.replayed_rewrites) >= SYNC_INTERVAL or any(id(r) not in ids_by_rule for r in rules):
+            self.shutdown()
+            self.pool_rules = list(rules)
+            ids_by_rule = {id(r): i for i, r in enumerate(self.pool_rules)}
+
+            diagram_arrays = diagram_to_arrays(diagram)
+            self.replica = _build_replica(diagram_arrays, diagram.deferred_removal)
+            self.expected_modification_count = diagram.modification_count
+
+            context = multiprocessing.get_context("fork")
+            self.search_generation = context.Value("i", 0)
+            self.executors = [ProcessPoolExecutor(1, mp_context=context, initializer=_init_worker,
+                                                  initargs=(self.pool_rules, diagram_arrays, diagram.deferred_removal, self.search_generation))
+                              for _ in range(self.workers)]
+            self.shipped_rewrites = [0] * self.workers
+
+        return [ids_by_rule[id(r)] for r in rules]
+
+"""
+Looks ahead instead of greedily applying the highest ranked rule: a beam search keeps the beam_width rewrite sequences
+of lowest cost and extends them level by level up to the given depth, the first rewrite of the best sequence is returned.
+Ties are broken by rule rank and sequence length. If no sequence within the depth lowers the cost, the best ranked rewrite
+of lowest cost is returned instead (e.g. a color change or an identity removal on a plateau of equal cost), unless it leads
+to a state already visited on this plateau or the plateau has been walked for max_plateau_steps rewrites.
+The search only ends (returns None) if there is no such rewrite.
+
+States are never copied: the search runs on a copy of the diagram using a journaling rewriter, switching to another
+sequence rolls back to the common prefix and reapplies the rest. The copy is made once and kept across searches,
+the returned match is applied to it at the start of the next search. If the diagram has been changed otherwise
+(detected using the modification count, e.g. the diagram has been compacted), a new copy is made.
+Memory is bounded by the number of sequences held per level (max_candidates), each consisting of at most depth matches.
+If the time limit (seconds per search) is exceeded, the search stops expanding and uses the sequences found so far.
+"""
+class BeamSearchOptimizationStrategy(OptimizationStrategy):
+    simplifier: "Simplifier"
+    cost_function: CostFunction
+    beam_width: int
+    depth: int
+    branching: int
+    max_candidates: int
+    time_limit: Optional[float]
+    max_plateau_steps: int
+
+    visited_states: Set[int] # fingerprints of the search diagram states visited since the cost last decreased
+    plateau_steps: int # rewrites returned since the cost last decreased
+
+    # the search diagram always uses deferred removal, its indices match the diagram's if the diagram does as well,
+    # otherwise the diagram's indices are the ranks of the visible search diagram vertices
+    search_diagram: Optional[Diagram]
+    rewriter: Optional[Rewriter] # journaling rewriter on the search diagram
+    pending_match: Optional[Match] # the first match of the last returned sequence, on the search diagram
+    expected_modification_count: int # modification count of the diagram if it is in sync with the search diagram
+
+    def __init__(self, simplifier: "Simplifier", cost_function: CostFunction = spider_count_cost, beam_width: int = BEAM_WIDTH, depth: int = BEAM_DEPTH,
+                 branching: int = BEAM_BRANCHING, max_candidates: int = BEAM_MAX_CANDIDATES, time_limit: Optional[float] = None,
+                 max_plateau_steps: int = BEAM_MAX_PLATEAU_STEPS):
+        super().__init__()
+        assert beam_width >= 1 and depth >= 1 and branching >= 1 and max_candidates >= 1 and max_plateau_steps >= 0
+        self.simplifier = simplifier
+        self.cost_function = cost_function
+        self.beam_width = beam_width
+        self.depth = depth
+        self.branching = branching
+        self.max_candidates = max_candidates
+        self.time_limit = time_limit
+        self.max_plateau_steps = max_plateau_steps
+
+        self.search_diagram = None
+        self.rewriter = None
+        self.pending_match = None
+        self.expected_modification_count = -1
+        self.visited_states = set()
+        self.plateau_steps = 0
+
+    def find_next_match(self, diagram: Diagram, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Match]:
+        deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+        rules = self.simplifier.rules()
+
+        self.__sync(diagram)
+        search_diagram, rewriter = self.search_diagram, self.rewriter
+        matcher = Matcher(search_diagram)
+        seed_vertices = self.__to_search_indices(diagram, seed_vertices) if seed_vertices is not None else None
+
+        current_sequence: Tuple[Match, ...] = ()
+        beam: List[Tuple[Match, ...]] = [()]
+        root_candidates: List[Tuple[float, Tuple[Match, ...]]] = []
+        root_cost = self.cost_function(search_diagram)
+        best_sequence, best_cost = None, root_cost
+
+        budget_exceeded = False
+        for level in range(self.depth):
+            candidates: List[Tuple[float, Tuple[Match, ...]]] = []
+            for sequence in beam:
+                current_sequence = self.__switch_sequence(rewriter, current_sequence, sequence)
+
+                for rule in rules:
+                    for match in matcher.find_matches(rule, self.branching, seed_vertices if level == 0 else None):
+                        rewriter.rewrite(match)
+                        candidates.append((self.cost_function(search_diagram), sequence + (match,)))
+                        rewriter.rollback()
+
+                        budget_exceeded = self.__budget_exceeded(candidates, deadline)
+                        if budget_exceeded:
+                            break
+                    if budget_exceeded:
+                        break
+                if budget_exceeded:
+                    break
+
+            if len(candidates) == 0:
+                break
+
+            candidates.sort(key=lambda c: c[0]) # stable, equal costs stay in rank order
+            if level == 0:
+                root_candidates = candidates
+            beam = [sequence for _, sequence in candidates[:self.beam_width]]
+            if candidates[0][0] < best_cost:
+                best_cost, best_sequence = candidates[0]
+
+            if budget_exceeded:
+                break # keep the best sequence found so far instead of expanding a truncated beam
+
+        rewriter.rollback(len(current_sequence)) # back to the state of the diagram
+
+        if best_sequence is not None:
+            self.visited_states.clear()
+            self.plateau_steps = 0
+            first_match = best_sequence[0]
+        else:
+            first_match = self.__plateau_match(root_candidates)
+            if first_match is None:
+                return None
+
+        embedding = self.__to_diagram_indices(diagram, [int(first_match.rule_to_diagram_map[s]) for s in first_match.rule.source.g.vertices()])
+        match = Matcher(diagram).match_embedding(first_match.rule, embedding)
+        assert match is not None, "Match found on the search diagram does not match the diagram"
+        self.pending_match = first_match
+        return match
+
+    def shutdown(self):
+        self.search_diagram = None
+        self.rewriter = None
+        self.pending_match = None
+
+    def get_state(self) -> object:
+        return self.simplifier.get_state()
+
+    def set_state(self, state: object):
+        self.simplifier.set_state(state)
+
+    def __budget_exceeded(self, candidates: List, deadline: Optional[float]) -> bool:
+        return len(candidates) >= self.max_candidates or (deadline is not None and time.monotonic() > deadline)
+
+    """
+    No sequence lowers the cost: move along the plateau using the best ranked rewrite of lowest cost not leading to a state visited before
+    :returns None if there is no such rewrite or the plateau has been walked for max_plateau_steps rewrites
+    """
+    def __plateau_match(self, root_candidates: List[Tuple[float, Tuple[Match, ...]]]) -> Optional[Match]:
+        if len(root_candidates) == 0 or self.plateau_steps >= self.max_plateau_steps:
+            return None
+
+        self.visited_states.add(_diagram_fingerprint(self.search_diagram))
+        for _, (match,) in root_candidates:
+            self.rewriter.rewrite(match)
+            fingerprint = _diagram_fingerprint(self.search_diagram)
+            self.rewriter.rollback()
+
+            if fingerprint not in self.visited_states:
+                self.visited_states.add(fingerprint)
+                self.plateau_steps += 1
+                return match
 
         return None
 
+    """
+    Apply the last returned match to the search diagram, copy the diagram if it has been changed otherwise
+    """
+    def __sync(self, diagram: Diagram):
+        if self.pending_match is not None and self.search_diagram is not None:
+            modification_count_before = self.search_diagram.modification_count
+            self.rewriter.rewrite(self.pending_match)
+            self.rewriter.clear_journal() # the rewrite is permanent
+            self.expected_modification_count += self.search_diagram.modification_count - modification_count_before
+        self.pending_match = None
+
+        in_sync = self.search_diagram is not None and diagram.modification_count == self.expected_modification_count \
+            and diagram.g.num_vertices() == self.search_diagram.g.num_vertices() and diagram.g.num_edges() == self.search_diagram.g.num_edges()
+        if not in_sync:
+            self.search_diagram = diagram_from_arrays(diagram_to_arrays(diagram))
+            self.search_diagram.set_deferred_removal(True)
+            self.rewriter = Rewriter(self.search_diagram, journaling=True)
+            self.expected_modification_count = diagram.modification_count
+        elif not diagram.deferred_removal and self.search_diagram.get_hidden_vertex_count() > SEARCH_COMPACTION_RATIO * self.search_diagram.g.num_vertices():
+            # doesn't change the ranks of the visible vertices
+            self.search_diagram.compact()
+            self.rewriter.clear_journal()
+
+    def __to_search_indices(self, diagram: Diagram, indices: Iterable[int]) -> List[int]:
+        if diagram.deferred_removal:
+            return list(indices)
+        visible = np.flatnonzero(self.search_diagram.get_alive_mask())
+        return visible[list(indices)].tolist()
+
+    def __to_diagram_indices(self, diagram: Diagram, indices: List[int]) -> List[int]:
+        if diagram.deferred_removal:
+            return indices
+        hidden = np.flatnonzero(~self.search_diagram.get_alive_mask())
+        return (np.array(indices) - np.searchsorted(hidden, indices)).tolist()
+
+    """
+    Roll back to the common prefix of the current and the given sequence and apply the rest of the given one
+    Reapplying a sequence reproduces the vertex indices (see Rewriter.rollback), the matches therefore stay valid
+    """
+    def __switch_sequence(self, rewriter: Rewriter, current_sequence: Tuple[Match, ...], sequence: Tuple[Match, ...]) -> Tuple[Match, ...]:
+        common = 0
+        while common < min(len(current_sequence), len(sequence)) and current_sequence[common] is sequence[common]:
+            common += 1
+
+        rewriter.rollback(len(current_sequence) - common)
+        for match in sequence[common:]:
+            rewriter.rewrite(match)
+        return sequence
+
+
+"""
+Hash of the visible vertices (indices, types, phases) and wires of the diagram, equal states of the same diagram have equal fingerprints
+"""
+def _diagram_fingerprint(diagram: Diagram) -> int:
+    alive = diagram.get_alive_mask()
+    wires = diagram.g.get_edges([diagram.hadamard_prop])
+    wires[:, :2].sort(axis=1)
+    wires = wires[np.lexsort(wires.T[::-1])]
+    phases = np.round(diagram.get_phases()[alive], BEAM_FINGERPRINT_PHASE_DECIMALS)
+    return hash((np.flatnonzero(alive).tobytes(), diagram.get_vertex_type_codes()[alive].tobytes(), phases.tobytes(), wires.tobytes()))
+
+
+_worker_rules: List[RewriteRule] = [] # the rules of a ParallelRankedOptimizationStrategy worker process
+_worker_diagram: Optional[Diagram] = None # the worker's copy of the diagram
+_worker_replayed_rewrites = 0 # number of rewrites applied to the worker's copy
+_worker_search_generation: Optional[Synchronized] = None # a search is aborted once this differs from the generation it has been started in
+
+def _init_worker(rules: List[RewriteRule], diagram_arrays: Dict[str, np.ndarray], deferred_removal: bool, search_generation: Synchronized):
+    global _worker_rules, _worker_diagram, _worker_replayed_rewrites, _worker_search_generation
+    _worker_rules = rules
+    _worker_diagram = _build_replica(diagram_arrays, deferred_removal)
+    _worker_replayed_rewrites = 0
+    _worker_search_generation = search_generation
+
+"""
+Copy of a diagram given in array form, rewrites reproduce the vertex indices of the original
+(for that, deferred removal has to be enabled like on the original)
+"""
+def _build_replica(diagram_arrays: Dict[str, np.ndarray], deferred_removal: bool) -> Diagram:
+    replica = diagram_from_arrays(diagram_arrays)
+    replica.set_deferred_removal(deferred_removal or replica.deferred_removal)
+    return replica
+
+"""
+Apply the given rewrites (continuing at index first_rewrite of the replayed rewrites) to the worker's diagram,
+then search the given rules (rank, rule index) in rank order until the search generation changes
+:returns the rank and embedding (diagram vertex indices by source spider index) of the first match, None if no rule matches
+"""
+def _find_first_match(ranked_rule_ids: List[Tuple[int, int]], first_rewrite: int, rewrites: List[Tuple[int, List[int]]], generation: int,
+                      seed_vertices: Optional[List[int]]) -> Optional[Tuple[int, List[int]]]:
+    global _worker_replayed_rewrites
+    assert first_rewrite == _worker_replayed_rewrites, "Rewrites have not been replayed in order"
+    matcher = Matcher(_worker_diagram)
+    for rule_id, embedding in rewrites:
+        matcher.apply_match(matcher.match_embedding(_worker_rules[rule_id], embedding))
+    _worker_replayed_rewrites += len(rewrites)
+
+    for rank, rule_id in ranked_rule_ids:
+        if _worker_search_generation.value != generation:
+            return None # aborted, a higher ranked match has been found
+
+        rule = _worker_rules[rule_id]
+        match = matcher.find_match(rule, generate_on_the_fly=True, seed_vertices=seed_vertices)
+        if match is not None:
+            return rank, [int(match.rule_to_diagram_map[s]) for s in rule.source.g.vertices()]
+
+    return None
+
+
 class Simplifier:
     """
     Returns an ordered list of rules to be applied
@@ -46,6 +493,15 @@ class Simplifier:
     def rules(self) -> List[RewriteRule]:
         raise NotImplementedError()
 
+    """
+    The picklable internal state of the simplifier, used for checkpointing
+    """
+    def get_state(self) -> object:
+        return None
+
+    def set_state(self, state: object):
+        pass
+
 class SingleRuleSimplifier(Simplifier):
     rule: RewriteRule
 
@@ -58,10 +514,12 @@ class SingleRuleSimplifier(Simplifier):
 class CompoundSimplifier(Simplifier):
     simplifiers: List[Simplifier]
     randomized: bool
+    random: random.Random
 
-    def __init__(self, simplifiers: List[Simplifier], randomized: bool = False):
+    def __init__(self, simplifiers: List[Simplifier], randomized: bool = False, seed: Optional[int] = None):
         self.simplifiers = simplifiers
         self.randomized = randomized
+        self.random = random.Random(seed)
 
     def rules(self) -> List[RewriteRule]:
         rules = []
@@ -70,10 +528,19 @@ class CompoundSimplifier(Simplifier):
                 rules.append(r)
 
         if self.randomized:
-            random.shuffle(rules)
+            self.random.shuffle(rules)
 
         return rules
 
+    def get_state(self) -> object:
+        return self.random.getstate(), [s.get_state() for s in self.simplifiers]
+
+    def set_state(self, state: object):
+        random_state, simplifier_states = state
+        self.random.setstate(random_state)
+        for simplifier, simplifier_state in zip(self.simplifiers, simplifier_states):
+            simplifier.set_state(simplifier_state)
+
 class RandomizedCompoundSimplifier(CompoundSimplifier):
-    def __init__(self, simplifiers: List[Simplifier]):
-        super(RandomizedCompoundSimplifier, self).__init__(simplifiers=simplifiers, randomized=True)
\ No newline at end of file
+    def __init__(self, simplifiers: List[Simplifier], seed: Optional[int] = None):
+        super(RandomizedCompoundSimplifier, self).__init__(simplifiers=simplifiers, randomized=True, seed=seed)
\ No newline at end of file
@@ -1,50 +1,402 @@
+import copy
+import multiprocessing
+import os
+import pickle
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Optional, List, Union, Dict, Tuple, Set
+
+import numpy as np
+
 from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram_serialization import diagram_to_arrays, diagram_from_arrays, save_diagram, load_diagram
 from zxopt.optimization import OptimizationStrategy
-from zxopt.rewriting.matcher import Matcher
+from zxopt.optimization.validation_policy import ValidationPolicy, EveryRewriteValidationPolicy
+from zxopt.rewriting.match import Match
+from zxopt.rewriting.rewriter import Rewriter
 from zxopt.util import Loggable
-from zxopt.validation import DiagramLinearExtractor, validate_operation_equality
+from zxopt.validation import DiagramLinearExtractor, validate_operation_equality, DiagramStabilizerExtractor, \
+    StabilizerTableau, validate_stabilizer_equality
 from zxopt.visualization import Window, DiagramRenderer
 
+WORKLIST_CHUNK_SIZE = 32 # number of dirty vertices whose neighborhood is searched at once in incremental mode
+
+COMPACTION_RATIO = 0.5 # deferred removal: compact the diagram once the hidden vertices exceed this fraction of the visible ones
+
+CHECKPOINT_INTERVAL = 1000 # number of rewrites between two checkpoints
+CHECKPOINT_STATE_SUFFIX = ".state" # the optimizer state is stored next to the diagram file
+CHECKPOINT_REFERENCE_SUFFIX = ".reference" # the reference transformation, if it can't be recomputed from the checkpointed diagram
+
+# how the reference transformation of a checkpoint is restored
+REFERENCE_NONE = "none" # validation disabled
+REFERENCE_RECOMPUTE = "recompute" # the checkpointed diagram has been validated, its transformation is the reference
+REFERENCE_FILE = "file" # there are unvalidated rewrites, the reference is read from the reference file
+
+VALIDATION_BACKEND_DENSE = "dense" # contract the diagram to a dense matrix, exponential in the number of qubits
+VALIDATION_BACKEND_STABILIZER = "stabilizer" # stabilizer tableau, polynomial but requires a Clifford diagram
+VALIDATION_BACKEND_AUTO = "auto" # stabilizer if the initial diagram is Clifford, dense otherwise
+
 
 class Optimizer(Loggable):
     diagram: Diagram
     strategy: OptimizationStrategy
     visualize: bool
+    incremental: bool
+    deferred_removal: bool
+    partition_components: bool # optimize the connected components of the diagram independently
+    component_workers: int # number of processes the components are optimized by, 1 optimizes them in this process
+    shutdown_strategy: bool # shut the strategy down once the optimization finished
+    validation_policy: ValidationPolicy
+    validation_backend: str
 
+    validator: DiagramLinearExtractor
+    stabilizer_validator: DiagramStabilizerExtractor
+    reference_transform: Optional[Union[np.ndarray, StabilizerTableau]] # transformation of the last validated diagram state
+    reference_version: int # incremented whenever the reference transformation changes
+    written_reference_version: int # the version last written to the checkpoint reference file, -1 if none
+    unvalidated_rules: List[str] # names of the rules applied since the last validation
+    validations: int
+    invalid_validations: int
 
-    def __init__(self, diagram: Diagram, strategy: OptimizationStrategy, visualize: bool = False):
+    dirty_vertices: Optional[Set[int]] # incremental mode: vertices whose neighborhood may contain a match that hasn't been searched for yet
+
+    checkpoint_path: Optional[str] # the diagram is written to this file, the optimizer state next to it
+    checkpoint_interval: int
+    iterations: int
+    rule_applications: Dict[str, int] # number of rewrites performed by rule name
+    resumed: bool # state restored from a checkpoint, optimize() continues instead of starting over
+
+
+    def __init__(self, diagram: Diagram, strategy: OptimizationStrategy, visualize: bool = False, incremental: bool = False, validation_policy: ValidationPolicy = None, validation_backend: str = VALIDATION_BACKEND_AUTO, deferred_removal: bool = False,
+                 partition_components: bool = False, component_workers: int = 1, shutdown_strategy: bool = True,
+                 checkpoint_path: Optional[str] = None, checkpoint_interval: int = CHECKPOINT_INTERVAL):
         super().__init__()
+        if partition_components and checkpoint_path is not None:
+            raise ValueError("Checkpointing is not supported when optimizing components independently")
         self.diagram = diagram
         self.strategy = strategy
         self.visualize = visualize
+        self.incremental = incremental
+        self.deferred_removal = deferred_removal
+        self.partition_components = partition_components
+        self.component_workers = component_workers
+        self.shutdown_strategy = shutdown_strategy
+        self.validation_policy = validation_policy if validation_policy is not None else EveryRewriteValidationPolicy()
+        self.validation_backend = validation_backend
 
+        self.validator = DiagramLinearExtractor(diagram)
+        self.stabilizer_validator = DiagramStabilizerExtractor(diagram)
+        self.reference_transform = None
+        self.reference_version = 0
+        self.written_reference_version = -1
+        self.unvalidated_rules = []
+        self.validations = 0
+        self.invalid_validations = 0
 
+        self.dirty_vertices = None
+
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.iterations = 0
+        self.rule_applications = {}
+        self.resumed = False
+
+    """
+    Apply rules chosen by the strategy until no rule matches anymore
+    In incremental mode, a worklist of dirty vertices is kept, only the neighborhood of those is searched for new matches
+    A vertex becomes clean when no rule matches around it and dirty again when a rewrite adds or reconnects it
+    Rewrites are validated as specified by the validation policy, always against the last validated state
+    With deferred removal, removed spiders are only hidden and the diagram is compacted from time to time
+    With component partitioning, each connected component is optimized on its own and the results are stitched back together
+    """
     def optimize(self):
-        validator = DiagramLinearExtractor(self.diagram)
+        if self.partition_components:
+            component_vertices = self.diagram.get_component_vertices()
+            if len(component_vertices) > 1:
+                self.__optimize_components(component_vertices)
+                return
+
+        if self.validation_policy.is_enabled() and not self.resumed:
+            if self.validation_backend == VALIDATION_BACKEND_AUTO:
+                self.validation_backend = VALIDATION_BACKEND_STABILIZER if self.stabilizer_validator.is_clifford() else VALIDATION_BACKEND_DENSE
+                self.log.info(f"Using {self.validation_backend} validation")
+            self.reference_transform = self.__extract_transform()
+            self.reference_version += 1
+
+        if self.deferred_removal:
+            self.diagram.set_deferred_removal(True)
+
+        if self.incremental and not self.resumed:
+            self.dirty_vertices = set(np.flatnonzero(self.diagram.get_alive_mask()).tolist())
 
-        iterations = 0
         while True:
-            iterations += 1
+            self.iterations += 1
             if self.visualize:
                 Window(DiagramRenderer(self.diagram)).main_loop()
 
-            next_rule = self.strategy.find_next_rule(self.diagram)
+            if self.incremental:
+                next_match = self.__find_next_match_incremental()
+            else:
+                next_match = self.strategy.find_next_match(self.diagram)
 
-            if next_rule is None:
-                self.log.info(f"Diagram optimization took {iterations} iterations")
+            if next_match is None:
+                self.log.info(f"Diagram optimization took {self.iterations} iterations")
+                if self.shutdown_strategy:
+                    self.strategy.shutdown()
+                if self.deferred_removal:
+                    self.diagram.set_deferred_removal(False)
+                if self.validation_policy.validate_final() and len(self.unvalidated_rules) > 0:
+                    self.__validate()
                 return
 
-            self.log.info(f"Iterations: {iterations}, applying {next_rule.name} to diagram")
+            self.log.info(f"Iterations: {self.iterations}, applying {next_match.rule.name} to diagram")
 
-            transform_before = validator.extract_matrix()
+            rewriter = Rewriter(self.diagram)
+            rewriter.rewrite(next_match)
 
-            matcher = Matcher(self.diagram)
-            matcher.match_rule(next_rule, apply=True, generate_on_the_fly=True)
+            if self.incremental:
+                self.__update_dirty_vertices(rewriter)
+            if self.deferred_removal and self.diagram.get_hidden_vertex_count() > COMPACTION_RATIO * self.diagram.g.num_vertices():
+                self.__compact()
 
-            transform_after = validator.extract_matrix()
-            rewrite_validity = validate_operation_equality(transform_before, transform_after)
+            self.rule_applications[next_match.rule.name] = self.rule_applications.get(next_match.rule.name, 0) + 1
+            self.unvalidated_rules.append(next_match.rule.name)
+            if self.validation_policy.should_validate(self.iterations, next_match.rule):
+                self.__validate()
 
-            if rewrite_validity:
-                self.log.info("Rewrite performed and validated")
-            else:
-                self.log.error("INVALID REWRITE DETECTED")
\ No newline at end of file
+            if self.checkpoint_path is not None and self.iterations % self.checkpoint_interval == 0:
+                self.save_checkpoint()
+
+    """
+    Write the diagram and the state of the optimizer, its strategy and validation policy to the checkpoint path
+    All files are replaced atomically, a crash while writing leaves the previous checkpoint intact
+    """
+    def save_checkpoint(self):
+        assert self.checkpoint_path is not None, "No checkpoint path set"
+
+        state = {
+            "iterations": self.iterations,
+            "rule_applications": self.rule_applications,
+            "validations": self.validations,
+            "invalid_validations": self.invalid_validations,
+            "unvalidated_rules": self.unvalidated_rules,
+            "reference_transform": self.__save_checkpoint_reference(),
+            "validation_backend": self.validation_backend,
+            "validation_policy": self.validation_policy,
+            "dirty_vertices": self.dirty_vertices,
+            "strategy_state": self.strategy.get_state()
+        }
+
+        save_diagram(self.diagram, self.checkpoint_path + ".tmp")
+        with open(self.checkpoint_path + CHECKPOINT_STATE_SUFFIX + ".tmp", "wb") as f:
+            pickle.dump(state, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+        os.replace(self.checkpoint_path + CHECKPOINT_STATE_SUFFIX + ".tmp", self.checkpoint_path + CHECKPOINT_STATE_SUFFIX)
+
+        self.log.info(f"Checkpoint written after {self.iterations} iterations")
+
+    """
+    The reference transformation can be huge (a dense matrix is exponential in the number of qubits), it therefore isn't
+    part of the state: if all rewrites have been validated, it is recomputed from the checkpointed diagram when resuming,
+    otherwise it is written to a separate file, only if it changed since it has been written last
+    :returns how the reference is restored, stored in the state
+    """
+    def __save_checkpoint_reference(self) -> str:
+        if self.reference_transform is None:
+            return REFERENCE_NONE
+        if len(self.unvalidated_rules) == 0:
+            return REFERENCE_RECOMPUTE
+
+        if self.written_reference_version != self.reference_version:
+            with open(self.checkpoint_path + CHECKPOINT_REFERENCE_SUFFIX + ".tmp", "wb") as f:
+                pickle.dump(self.reference_transform, f)
+            os.replace(self.checkpoint_path + CHECKPOINT_REFERENCE_SUFFIX + ".tmp", self.checkpoint_path + CHECKPOINT_REFERENCE_SUFFIX)
+            self.written_reference_version = self.reference_version
+        return REFERENCE_FILE
+
+    """
+    Restore the state written by save_checkpoint, the diagram is expected to be the checkpointed one (see resume_optimizer)
+    """
+    def load_checkpoint_state(self, path: str):
+        with open(path + CHECKPOINT_STATE_SUFFIX, "rb") as f:
+            state = pickle.load(f)
+
+        self.iterations = state["iterations"]
+        self.rule_applications = state["rule_applications"]
+        self.validations = state["validations"]
+        self.invalid_validations = state["invalid_validations"]
+        self.unvalidated_rules = state["unvalidated_rules"]
+        self.validation_backend = state["validation_backend"]
+        if state["reference_transform"] == REFERENCE_RECOMPUTE:
+            self.reference_transform = self.__extract_transform()
+        elif state["reference_transform"] == REFERENCE_FILE:
+            with open(path + CHECKPOINT_REFERENCE_SUFFIX, "rb") as f:
+                self.reference_transform = pickle.load(f)
+            self.written_reference_version = self.reference_version
+        self.validation_policy = state["validation_policy"]
+        self.dirty_vertices = state["dirty_vertices"]
+        self.strategy.set_state(state["strategy_state"])
+        self.resumed = True
+
+    """
+    Optimize each component using the settings of this optimizer and write the changed ones back to the diagram
+    Rules only ever match within a connected component, the result is therefore the same as optimizing the whole diagram
+    Components no rule applied to keep their vertices. The vertices of a changed component are removed and the optimized
+    component is appended (keeping vertex identifiers), like any removal this shifts the indices of all following vertices
+    """
+    def __optimize_components(self, component_vertices: List[np.ndarray]):
+        self.log.info(f"Optimizing {len(component_vertices)} components independently")
+        components = self.diagram.split_components()
+        settings = self.__component_settings()
+
+        if self.component_workers > 1:
+            self.strategy.shutdown() # the workers get a forked copy of the strategy, which must not share resources with this one
+            context = multiprocessing.get_context("fork") # the strategy and its rules are inherited, they don't have to be picklable
+            with ProcessPoolExecutor(min(self.component_workers, len(components)), mp_context=context, initializer=_init_component_worker, initargs=(self.strategy, settings)) as executor:
+                results = list(executor.map(_optimize_component, [diagram_to_arrays(c) for c in components]))
+            components = [diagram_from_arrays(arrays) for arrays, _ in results]
+            statistics = [s for _, s in results]
+        else:
+            statistics = []
+            for component in components:
+                optimizer = Optimizer(component, self.strategy, **copy.deepcopy(settings))
+                optimizer.optimize()
+                statistics.append(_optimizer_statistics(optimizer))
+
+        for rule_applications, validations, invalid_validations in statistics:
+            for rule_name, count in rule_applications.items():
+                self.rule_applications[rule_name] = self.rule_applications.get(rule_name, 0) + count
+            self.validations += validations
+            self.invalid_validations += invalid_validations
+        if self.shutdown_strategy:
+            self.strategy.shutdown()
+
+        changed = [i for i in range(len(components)) if len(statistics[i][0]) > 0]
+        self.log.info(f"{len(changed)} of {len(components)} components changed")
+        if len(changed) > 0:
+            self.diagram.remove_spiders([self.diagram.g.vertex(v) for i in changed for v in component_vertices[i]])
+            for i in changed:
+                self.diagram.add_diagram(components[i])
+
+    """
+    Settings of the component optimizers, each component gets its own copy (the validation policy is stateful)
+    """
+    def __component_settings(self) -> Dict:
+        return {
+            "incremental": self.incremental,
+            "validation_policy": self.validation_policy,
+            "validation_backend": self.validation_backend,
+            "deferred_removal": self.deferred_removal,
+            "shutdown_strategy": False # shared by all components, shut down once all of them are done
+        }
+
+    """
+    Validate the current diagram against the last validated state
+    The current transformation becomes the new reference, each validation therefore only requires a single contraction
+    """
+    def __validate(self):
+        self.validations += 1
+        transform = self.__extract_transform()
+        if transform is None:
+            rewrite_validity = False
+        elif self.validation_backend == VALIDATION_BACKEND_STABILIZER:
+            rewrite_validity = validate_stabilizer_equality(self.reference_transform, transform)
+        else:
+            rewrite_validity = validate_operation_equality(self.reference_transform, transform)
+
+        if rewrite_validity:
+            self.log.info(f"Rewrites performed and validated: {', '.join(self.unvalidated_rules)}")
+        else:
+            self.invalid_validations += 1
+            self.log.error(f"INVALID REWRITE DETECTED, in one of: {', '.join(self.unvalidated_rules)}")
+
+        if transform is not None:
+            self.reference_transform = transform
+            self.reference_version += 1
+        self.unvalidated_rules = []
+
+    """
+    Extract the transformation of the current diagram using the validation backend
+    :returns None if the diagram can't be represented using the backend (a rewrite introduced a non Clifford phase)
+    """
+    def __extract_transform(self) -> Optional[Union[np.ndarray, StabilizerTableau]]:
+        if self.validation_backend == VALIDATION_BACKEND_STABILIZER:
+            if not self.stabilizer_validator.is_clifford():
+                self.log.error("Diagram is no longer Clifford, cannot validate using stabilizers")
+                return None
+            return self.stabilizer_validator.extract_tableau()
+
+        return self.validator.extract_matrix()
+
+    """
+    Search the neighborhoods of the dirty vertices chunk by chunk, marking them clean if nothing matches
+    :returns the next match, None if the worklist is exhausted
+    """
+    def __find_next_match_incremental(self) -> Optional[Match]:
+        while True:
+            if len(self.dirty_vertices) == 0:
+                return None
+
+            chunk = sorted(islice(self.dirty_vertices, WORKLIST_CHUNK_SIZE))
+            next_match = self.strategy.find_next_match(self.diagram, seed_vertices=chunk)
+            if next_match is not None:
+                return next_match
+
+            self.dirty_vertices.difference_update(chunk)
+
+    """
+    Follow the reindexing of the diagram caused by the last rewrite and mark the changed vertices as dirty
+    With deferred removal, indices are stable and only the vertices of the rewrite are updated,
+    otherwise the dirty vertices following a removed one are shifted like graph_tool shifts the vertices
+    """
+    def __update_dirty_vertices(self, rewriter: Rewriter):
+        self.dirty_vertices.difference_update(rewriter.removed_vertices)
+        if not self.diagram.deferred_removal and len(rewriter.removed_vertices) > 0:
+            removed = rewriter.removed_vertices
+            self.dirty_vertices = {v - bisect_left(removed, v) for v in self.dirty_vertices}
+        self.dirty_vertices.update(rewriter.touched_vertices)
+
+    """
+    Remove the vertices hidden by deferred removal and follow the reindexing
+    """
+    def __compact(self):
+        remap = self.diagram.compact()
+        self.log.debug(f"Compacted diagram, {np.count_nonzero(remap < 0)} vertices removed")
+
+        if self.dirty_vertices is not None:
+            self.dirty_vertices = {int(remap[v]) for v in self.dirty_vertices if remap[v] >= 0}
+
+
+"""
+Continue an optimization from a checkpoint written by an optimizer with a checkpoint path set
+The strategy has to consist of the same rules as the checkpointed one, further checkpoints are written to the same path
+"""
+def resume_optimizer(checkpoint_path: str, strategy: OptimizationStrategy, **settings) -> Optimizer:
+    optimizer = Optimizer(load_diagram(checkpoint_path, mmap=False), strategy, checkpoint_path=checkpoint_path, **settings)
+    optimizer.load_checkpoint_state(checkpoint_path)
+    return optimizer
+
+
+_component_worker_strategy: Optional[OptimizationStrategy] = None # the strategy and optimizer settings of a component worker process
+_component_worker_settings: Dict = {}
+
+def _init_component_worker(strategy: OptimizationStrategy, settings: Dict):
+    global _component_worker_strategy, _component_worker_settings
+    _component_worker_strategy = strategy
+    _component_worker_settings = settings
+
+"""
+Optimize a component given in array form (see diagram_to_arrays)
+:returns the optimized component in array form and the optimizer statistics (see _optimizer_statistics)
+"""
+def _optimize_component(arrays: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], Tuple[Dict[str, int], int, int]]:
+    optimizer = Optimizer(diagram_from_arrays(arrays), _component_worker_strategy, **copy.deepcopy(_component_worker_settings))
+    optimizer.optimize()
+    return diagram_to_arrays(optimizer.diagram), _optimizer_statistics(optimizer)
+
+"""
+Rule applications, validations and failed validations of the given optimizer
+"""
+def _optimizer_statistics(optimizer: Optimizer) -> Tuple[Dict[str, int], int, int]:
+    return optimizer.rule_applications, optimizer.validations, optimizer.invalid_validations
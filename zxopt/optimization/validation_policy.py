@@ -0,0 +1,97 @@
+import abc
+import random
+from typing import Optional, Set
+
+from zxopt.rewriting import RewriteRule
+
+"""
+Decides after which rewrites the optimizer validates the diagram against the last validated state
+Every validation requires contracting the entire diagram, which is exponential in the number of qubits
+"""
+class ValidationPolicy:
+
+    def __init__(self):
+        pass
+
+    """
+    Should the diagram be validated after the given rewrite (1 based count of performed rewrites)?
+    """
+    @abc.abstractmethod
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        raise NotImplementedError()
+
+    """
+    Should rewrites that haven't been validated yet be validated when the optimization finishes?
+    """
+    def validate_final(self) -> bool:
+        return True
+
+    """
+    Does this policy ever validate? If not, the initial state doesn't have to be extracted
+    """
+    def is_enabled(self) -> bool:
+        return True
+
+class NoValidationPolicy(ValidationPolicy):
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        return False
+
+    def validate_final(self) -> bool:
+        return False
+
+    def is_enabled(self) -> bool:
+        return False
+
+class EveryRewriteValidationPolicy(ValidationPolicy):
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        return True
+
+class EveryNRewritesValidationPolicy(ValidationPolicy):
+    n: int
+
+    def __init__(self, n: int):
+        super().__init__()
+        assert n > 0, "Cannot validate every n rewrites for n < 1"
+        self.n = n
+
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        return rewrite_count % self.n == 0
+
+"""
+Only validates the final diagram against the initial one
+"""
+class FinalValidationPolicy(ValidationPolicy):
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        return False
+
+"""
+Validates each rewrite with the given probability
+"""
+class RandomSampledValidationPolicy(ValidationPolicy):
+    probability: float
+    random: random.Random
+
+    def __init__(self, probability: float, seed: Optional[int] = None):
+        super().__init__()
+        self.probability = probability
+        self.random = random.Random(seed)
+
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        return self.random.random() < self.probability
+
+"""
+Validates the first rewrite performed by each rule
+"""
+class FirstRuleUseValidationPolicy(ValidationPolicy):
+    used_rules: Set[str]
+
+    def __init__(self):
+        super().__init__()
+        self.used_rules = set()
+
+    def should_validate(self, rewrite_count: int, rule: RewriteRule) -> bool:
+        if rule.name in self.used_rules:
+            return False
+
+        self.used_rules.add(rule.name)
+        return True
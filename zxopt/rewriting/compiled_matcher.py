@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional, Tuple, Iterable, Generator
+from weakref import WeakKeyDictionary
+
+from graph_tool import Edge
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram import SPIDER_COLORS, SPIDER_COLOR_TO_VERTEX_TYPE_CODE, VERTEX_TYPE_CODE_TO_SPIDER_COLOR
+from zxopt.rewriting.match_labels import PHASE_EPSILON
+from zxopt.rewriting.rewrite_phase_expression import RewritePhaseExpression
+from zxopt.rewriting.rewrite_rule import RewriteStructure, OTHER_RULE_ONLY_SPIDER_COLOR, CONNECTING_WIRES_ANY
+
+COMPILED_MATCHER_MAX_SPIDERS = 4 # larger structures are matched using the generic subgraph isomorphism
+
+"""
+A matcher specialized on a single, small and connected rewrite structure
+The structure is compiled into a walk: starting at an anchor spider, every further rule spider is reached over a wire
+from an already placed one, therefore only neighbors of placed diagram spiders are ever considered as candidates.
+Wires, fixed colors, the relation between white and black spiders, constant phases and neighbor counts are checked while walking,
+variables and connecting wires are resolved / checked by the Matcher afterwards like for any other embedding.
+
+Like the generic subgraph isomorphism, embeddings are not induced: the diagram may contain additional wires between matched spiders,
+rule wires between two spiders have to be present in the diagram at least as often (with the same hadamard state)
+"""
+class CompiledMatcher:
+    structure: RewriteStructure
+    walk: List[Tuple[int, Optional[int]]] # (rule spider, already placed rule spider it is reached from), the anchor comes first
+    required_wires: Dict[Tuple[int, int], List[bool]] # (rule spider, rule spider) -> sorted hadamard states of the wires between them
+    fixed_colors: Dict[int, str] # rule spider -> diagram color, for green / red rule spiders
+    assignable_colors: Dict[int, str] # rule spider -> white / black
+    constant_phases: Dict[int, RewritePhaseExpression] # rule spider -> phase expression without variables
+    max_neighbors: Dict[int, int] # rule spider -> max number of distinct diagram neighbors, for bounded connecting wires
+
+    def __init__(self, structure: RewriteStructure):
+        self.structure = structure
+        g = structure.g
+
+        self.required_wires = {}
+        wire: Edge
+        for wire in g.edges():
+            s, t = int(wire.source()), int(wire.target())
+            for key in [(s, t), (t, s)]:
+                self.required_wires.setdefault(key, []).append(bool(structure.hadamard_prop[wire]))
+        for key in self.required_wires:
+            self.required_wires[key].sort()
+
+        self.fixed_colors = {}
+        self.assignable_colors = {}
+        self.constant_phases = {}
+        self.max_neighbors = {}
+        for s in g.vertices():
+            color = structure.spider_color_prop[s]
+            if color in SPIDER_COLORS:
+                self.fixed_colors[int(s)] = color
+            elif color in OTHER_RULE_ONLY_SPIDER_COLOR:
+                self.assignable_colors[int(s)] = color
+
+            phase = structure.spider_phase_prop[s]
+            if len(phase.variables()) == 0:
+                self.constant_phases[int(s)] = phase
+
+            if structure.connecting_wires_prop[s] != CONNECTING_WIRES_ANY:
+                # one distinct neighbor per connecting wire and per other rule spider at most
+                self.max_neighbors[int(s)] = structure.connecting_wires_prop[s] + g.num_vertices() - 1
+
+        # breadth first walk over the rule, starting at the most constrained spider, bounded ones can be seeded from the degree index
+        anchor = max(range(g.num_vertices()), key=lambda s: (s in self.max_neighbors, s in self.fixed_colors, s in self.constant_phases, -self.max_neighbors.get(s, 0), -s))
+        self.walk = [(anchor, None)]
+        placed = {anchor}
+        for rule_spider, _ in self.walk:
+            for n in sorted(int(n) for n in g.vertex(rule_spider).all_neighbors()):
+                if n not in placed:
+                    placed.add(n)
+                    self.walk.append((n, rule_spider))
+
+    def is_connected(self) -> bool:
+        return len(self.walk) == self.structure.g.num_vertices()
+
+    """
+    Generate all embeddings of the structure into the diagram as lists of diagram vertex indices (indexed by rule spider)
+    :param anchor_candidates: diagram vertices the anchor may be placed on, all spiders if not given
+    :param use_degree_index: take the anchor candidates from the diagram's degree buckets if the anchor's neighbor count is bounded, unseeded searches only
+    """
+    def embeddings(self, diagram: Diagram, anchor_candidates: Optional[Iterable[int]] = None, use_degree_index: bool = True) -> Generator[List[int], None, None]:
+        anchor = self.walk[0][0]
+        anchor_color = self.fixed_colors.get(anchor)
+        if anchor_candidates is not None:
+            # seeded search: only look at the candidates, the work stays proportional to the seed region
+            anchors = sorted(v for v in set(anchor_candidates) if self.__anchor_candidate(diagram, v, anchor_color, self.max_neighbors.get(anchor)))
+        elif use_degree_index and anchor in self.max_neighbors:
+            anchors = diagram.get_spiders_by_degree(self.max_neighbors[anchor], anchor_color)
+        else:
+            anchors = diagram.get_spider_mask(anchor_color).nonzero()[0].tolist()
+
+        embedding = [-1] * len(self.walk)
+        wires_cache: Dict[int, Dict[int, List[bool]]] = {}
+        for a in anchors:
+            if self.__fits(diagram, anchor, a, embedding, wires_cache):
+                embedding[anchor] = a
+                yield from self.__extend(diagram, 1, embedding, wires_cache)
+                embedding[anchor] = -1
+
+    """
+    Check type, color and (if bounded) neighbor count of a diagram vertex for the anchor without building whole diagram masks
+    """
+    def __anchor_candidate(self, diagram: Diagram, v: int, color: Optional[str], max_degree: Optional[int]) -> bool:
+        if not diagram.is_alive(v):
+            return False
+        code = diagram.get_vertex_type_codes()[v]
+        if color is not None and code != SPIDER_COLOR_TO_VERTEX_TYPE_CODE[color]:
+            return False
+        if color is None and code not in VERTEX_TYPE_CODE_TO_SPIDER_COLOR:
+            return False
+        return max_degree is None or diagram.get_degrees()[v] <= max_degree
+
+    def __extend(self, diagram: Diagram, step: int, embedding: List[int], wires_cache: Dict[int, Dict[int, List[bool]]]) -> Generator[List[int], None, None]:
+        if step == len(self.walk):
+            yield list(embedding)
+            return
+
+        rule_spider, parent = self.walk[step]
+        for candidate in self.__wires(diagram, embedding[parent], wires_cache):
+            if candidate in embedding or not diagram.is_spider(diagram.g.vertex(candidate)):
+                continue
+            if not self.__fits(diagram, rule_spider, candidate, embedding, wires_cache):
+                continue
+            if not self.__wires_present(diagram, rule_spider, candidate, embedding, wires_cache):
+                continue
+
+            embedding[rule_spider] = candidate
+            yield from self.__extend(diagram, step + 1, embedding, wires_cache)
+            embedding[rule_spider] = -1
+
+    """
+    Check color, constant phase and neighbor count of placing the given rule spider on the given diagram spider
+    """
+    def __fits(self, diagram: Diagram, rule_spider: int, diagram_spider: int, embedding: List[int], wires_cache: Dict[int, Dict[int, List[bool]]]) -> bool:
+        vertex = diagram.g.vertex(diagram_spider)
+        color = diagram.get_spider_color(vertex)
+
+        if rule_spider in self.fixed_colors and self.fixed_colors[rule_spider] != color:
+            return False
+        if rule_spider in self.assignable_colors:
+            # white spiders share one color, black spiders the other one
+            for other, other_color in self.assignable_colors.items():
+                if embedding[other] < 0 or other == rule_spider:
+                    continue
+                same_color = diagram.get_spider_color(diagram.g.vertex(embedding[other])) == color
+                if same_color != (other_color == self.assignable_colors[rule_spider]):
+                    return False
+        if rule_spider in self.constant_phases and abs(self.constant_phases[rule_spider].evaluate() - diagram.get_spider_phase(vertex)) >= PHASE_EPSILON:
+            return False
+        if rule_spider in self.max_neighbors and diagram.get_degree(diagram_spider) > self.max_neighbors[rule_spider]:
+            return False
+
+        return True
+
+    """
+    Check that all rule wires between the given rule spider and the already placed ones exist in the diagram
+    """
+    def __wires_present(self, diagram: Diagram, rule_spider: int, diagram_spider: int, embedding: List[int], wires_cache: Dict[int, Dict[int, List[bool]]]) -> bool:
+        wires = self.__wires(diagram, diagram_spider, wires_cache)
+        for other, diagram_other in enumerate(embedding):
+            if diagram_other < 0 or (rule_spider, other) not in self.required_wires:
+                continue
+
+            available = list(wires.get(diagram_other, []))
+            for is_hadamard in self.required_wires[(rule_spider, other)]:
+                if is_hadamard not in available:
+                    return False
+                available.remove(is_hadamard)
+        return True
+
+    """
+    The wires of a diagram vertex grouped by neighbor (hadamard states), cached for the duration of a search
+    """
+    def __wires(self, diagram: Diagram, v: int, wires_cache: Dict[int, Dict[int, List[bool]]]) -> Dict[int, List[bool]]:
+        if v not in wires_cache:
+            wires = {}
+            wire: Edge
+            for wire in diagram.g.vertex(v).all_edges():
+                n = int(wire.target()) if int(wire.source()) == v else int(wire.source())
+                wires.setdefault(n, []).append(diagram.is_wire_hadamard(wire))
+            wires_cache[v] = wires
+        return wires_cache[v]
+
+
+_compiled_matchers: "WeakKeyDictionary[RewriteStructure, Optional[CompiledMatcher]]" = WeakKeyDictionary()
+
+"""
+Compile the given structure, structures are only compiled once and must not be modified afterwards
+:returns None if the structure is too large or not connected, it has to be matched using the generic subgraph isomorphism
+"""
+def compile_structure(structure: RewriteStructure) -> Optional[CompiledMatcher]:
+    if structure not in _compiled_matchers:
+        compiled = None
+        if 0 < structure.g.num_vertices() <= COMPILED_MATCHER_MAX_SPIDERS:
+            compiled = CompiledMatcher(structure)
+            if not compiled.is_connected():
+                compiled = None
+        _compiled_matchers[structure] = compiled
+
+    return _compiled_matchers[structure]
@@ -0,0 +1,24 @@
+from typing import Dict, List
+
+from graph_tool import Vertex
+
+from zxopt.rewriting.connecting_neighbor import ConnectingNeighbor
+from zxopt.rewriting.match_bindings import MatchBindings
+from zxopt.rewriting.rewrite_rule import RewriteRule
+
+"""
+A match of a rewrite rule found in a diagram
+Contains everything required for performing the rewrite without searching the diagram again
+"""
+class Match:
+    rule: RewriteRule
+    rule_to_diagram_map: Dict[Vertex, Vertex]  # maps rule.source -> diagram
+    bindings: MatchBindings  # resolved source variables and rule only colors (white, black)
+    connecting_neighbors: Dict[Vertex, List[ConnectingNeighbor]]  # connecting wires to non rule vertices by rule spider
+
+    def __init__(self, rule: RewriteRule, rule_to_diagram_map: Dict[Vertex, Vertex], connecting_neighbors: Dict[Vertex, List[ConnectingNeighbor]], bindings: MatchBindings):
+        self.rule = rule
+        self.rule_to_diagram_map = rule_to_diagram_map
+        self.connecting_neighbors = connecting_neighbors
+        self.bindings = bindings
+
@@ -0,0 +1,45 @@
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Mapping, Optional
+
+from zxopt.data_structures.diagram.diagram import SPIDER_COLORS, OTHER_SPIDER_COLOR
+from zxopt.rewriting.rewrite_rule import SPIDER_COLOR_WHITE, SPIDER_COLOR_BLACK, OTHER_RULE_ONLY_SPIDER_COLOR
+
+if TYPE_CHECKING:
+    from zxopt.rewriting.rewrite_phase_expression import RewriteVariable
+
+"""
+The values variables and rule only colors (white, black) are bound to while matching a rule
+Bindings are immutable, binding a value returns new bindings, the rule itself therefore holds no matching state
+and can be matched by multiple threads / processes at the same time
+"""
+class MatchBindings:
+    variable_values: Mapping["RewriteVariable", float]
+    spider_colors: Mapping[str, Optional[str]] # rule color -> diagram color, green and red are always bound to themselves
+
+    def __init__(self, variable_values: Optional[Dict["RewriteVariable", float]] = None, spider_colors: Optional[Dict[str, Optional[str]]] = None):
+        self.variable_values = MappingProxyType(dict(variable_values) if variable_values is not None else {})
+
+        colors = {SPIDER_COLOR_WHITE: None, SPIDER_COLOR_BLACK: None}
+        colors.update({color: color for color in SPIDER_COLORS})
+        if spider_colors is not None:
+            colors.update(spider_colors)
+        self.spider_colors = MappingProxyType(colors)
+
+    def is_bound(self, variable: "RewriteVariable") -> bool:
+        return variable in self.variable_values
+
+    def with_variable(self, variable: "RewriteVariable", value: float) -> "MatchBindings":
+        return MatchBindings({**self.variable_values, variable: value}, dict(self.spider_colors))
+
+    def with_color(self, rule_color: str, color: str) -> "MatchBindings":
+        return MatchBindings(dict(self.variable_values), {**self.spider_colors, rule_color: color})
+
+    """
+    All rule colors, an unbound white / black color is resolved to the opposite of the other one if that is bound
+    """
+    def resolved_colors(self) -> Dict[str, Optional[str]]:
+        colors = dict(self.spider_colors)
+        for rule_color, other_rule_color in OTHER_RULE_ONLY_SPIDER_COLOR.items():
+            if colors[rule_color] is None and colors[other_rule_color] is not None:
+                colors[rule_color] = OTHER_SPIDER_COLOR[colors[other_rule_color]]
+        return colors
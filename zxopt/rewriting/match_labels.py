@@ -0,0 +1,111 @@
+from typing import List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram import SPIDER_COLORS, SPIDER_COLOR_TO_VERTEX_TYPE_CODE, VERTEX_TYPE_CODES, VERTEX_BOUNDARY
+from zxopt.rewriting.rewrite_rule import RewriteStructure, CONNECTING_WIRES_ANY
+
+PHASE_CLASS_ZERO = 1
+PHASE_CLASS_PI = 2
+PHASE_CLASS_OTHER = 3
+PHASE_EPSILON = 0.00001
+
+"""
+Classify phases as zero, pi or other (up to multiples of 2 pi)
+"""
+def phase_classes(phases: np.ndarray) -> np.ndarray:
+    phases = np.mod(phases, 2.0 * np.pi)
+    classes = np.full(len(phases), PHASE_CLASS_OTHER, dtype=int)
+    classes[(phases < PHASE_EPSILON) | (phases > 2.0 * np.pi - PHASE_EPSILON)] = PHASE_CLASS_ZERO
+    classes[np.abs(phases - np.pi) < PHASE_EPSILON] = PHASE_CLASS_PI
+    return classes
+
+"""
+Vertex labels and a candidate filter derived from the constraints of a rewrite structure, used to prune the subgraph isomorphism search
+Labels are compared for equality, they therefore only contain the colors / phase classes if all rule spiders have a fixed one,
+the candidate filter removes all diagram vertices that can't be matched by any rule spider (color, constant phase, neighbor count)
+"""
+class MatchLabels:
+    structure_labels: np.ndarray # label by rule spider
+    uses_colors: bool
+    uses_phases: bool
+    spider_constraints: List[Tuple[Optional[int], Optional[float], Optional[int]]] # (type code, constant phase, max number of distinct neighbors) by rule spider, None if unconstrained
+
+    def __init__(self, structure: RewriteStructure):
+        spider_count = structure.g.num_vertices()
+
+        self.spider_constraints = []
+        for s in structure.g.vertices():
+            color = structure.spider_color_prop[s]
+            phase = structure.spider_phase_prop[s]
+            connecting_wires = structure.connecting_wires_prop[s]
+
+            self.spider_constraints.append((
+                SPIDER_COLOR_TO_VERTEX_TYPE_CODE[color] if color in SPIDER_COLORS else None,
+                phase.evaluate() if len(phase.variables()) == 0 else None,
+                # a matched spider has at most one distinct neighbor per connecting wire and per other rule spider
+                connecting_wires + spider_count - 1 if connecting_wires != CONNECTING_WIRES_ANY else None
+            ))
+
+        self.uses_colors = all(c[0] is not None for c in self.spider_constraints)
+        self.uses_phases = all(c[1] is not None for c in self.spider_constraints)
+
+        codes = np.array([c[0] if self.uses_colors else 0 for c in self.spider_constraints], dtype=int)
+        classes = phase_classes(np.array([c[1] for c in self.spider_constraints], dtype=float)) if self.uses_phases else np.zeros(spider_count, dtype=int)
+        self.structure_labels = codes * 4 + classes
+
+    """
+    Is any constraint known before searching? Otherwise the plain spider labels are sufficient
+    """
+    def is_useful(self) -> bool:
+        return any(c != (None, None, None) for c in self.spider_constraints)
+
+    """
+    Labels by diagram vertex index, comparable to the structure labels
+    :param vertices: only label the given vertex indices (the result is aligned with them), all vertices if not given
+    """
+    def diagram_labels(self, diagram: Diagram, vertices: Optional[np.ndarray] = None) -> np.ndarray:
+        count = diagram.get_vertex_index_count() if vertices is None else len(vertices)
+        codes = _select(diagram.get_vertex_type_codes(), vertices) if self.uses_colors else np.zeros(count, dtype=int)
+        classes = phase_classes(_select(diagram.get_phases(), vertices)) if self.uses_phases else np.zeros(count, dtype=int)
+        return codes.astype(int) * 4 + classes
+
+    """
+    Mask of all diagram spiders that could be matched by at least one rule spider
+    :param vertices: only check the given vertex indices (the result is aligned with them), all vertices if not given
+    """
+    def candidate_mask(self, diagram: Diagram, vertices: Optional[np.ndarray] = None) -> np.ndarray:
+        codes = _select(diagram.get_vertex_type_codes(), vertices)
+        phases = np.mod(_select(diagram.get_phases(), vertices), 2.0 * np.pi)
+        neighbor_counts = _select(diagram.get_degrees(), vertices)
+
+        mask = np.zeros(len(codes), dtype=bool)
+        for code, phase, max_neighbors in self.spider_constraints:
+            spider_mask = np.ones(len(mask), dtype=bool)
+            if code is not None:
+                spider_mask &= codes == code
+            if phase is not None:
+                distance = np.abs(phases - np.mod(phase, 2.0 * np.pi))
+                spider_mask &= np.minimum(distance, 2.0 * np.pi - distance) < PHASE_EPSILON
+            if max_neighbors is not None:
+                spider_mask &= neighbor_counts <= max_neighbors
+            mask |= spider_mask
+
+        return mask & (codes > VERTEX_TYPE_CODES[VERTEX_BOUNDARY]) & _select(diagram.alive_prop.a, vertices).astype(bool)
+
+
+def _select(array: np.ndarray, vertices: Optional[np.ndarray]) -> np.ndarray:
+    return array if vertices is None else array[vertices]
+
+
+_match_labels: "WeakKeyDictionary[RewriteStructure, MatchLabels]" = WeakKeyDictionary()
+
+"""
+The match labels of the given structure, computed once, the structure must not be modified afterwards
+"""
+def get_match_labels(structure: RewriteStructure) -> MatchLabels:
+    if structure not in _match_labels:
+        _match_labels[structure] = MatchLabels(structure)
+    return _match_labels[structure]
@@ -1,91 +1,299 @@
-from typing import Generator, Optional, Dict, List, Tuple
+from itertools import islice
+from typing import Generator, Optional, Dict, List, Tuple, Iterable, Set
 
-from graph_tool import VertexPropertyMap, Vertex, Edge
+import numpy as np
+from graph_tool import VertexPropertyMap, Vertex, Edge, Graph, EdgePropertyMap, GraphView
 from graph_tool.topology import subgraph_isomorphism
 
 from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram import VERTEX_TYPE_CODES, VERTEX_BOUNDARY
 from zxopt.rewriting import RewriteRule, RewriteStructure
+from zxopt.rewriting.compiled_matcher import compile_structure
 from zxopt.rewriting.connecting_neighbor import ConnectingNeighbor
+from zxopt.rewriting.match import Match
+from zxopt.rewriting.match_bindings import MatchBindings
+from zxopt.rewriting.match_labels import get_match_labels
 from zxopt.rewriting.rewrite_rule import CONNECTING_WIRES_ANY
 from zxopt.rewriting.rewriter import Rewriter
+from zxopt.rewriting.rule_symmetry import get_rule_symmetry
 
 
 class Matcher:
     diagram: Diagram
     rewriter: Rewriter
+    use_compiled_matchers: bool # match small rules using a CompiledMatcher instead of the generic subgraph isomorphism
+    use_degree_seeding: bool # compiled matchers: only try anchors from the diagram's degree buckets compatible with the rule
+    use_symmetry_reduction: bool # only check one embedding out of all embeddings equivalent under the rule's symmetry
 
-    def __init__(self, diagram: Diagram):
+    def __init__(self, diagram: Diagram, use_compiled_matchers: bool = True, use_degree_seeding: bool = True, use_symmetry_reduction: bool = True):
         self.diagram = diagram
         self.rewriter = Rewriter(diagram)
+        self.use_compiled_matchers = use_compiled_matchers
+        self.use_degree_seeding = use_degree_seeding
+        self.use_symmetry_reduction = use_symmetry_reduction
 
     """
     Match (and applies if specified) the give rule in one direction if possible
-    The rule is reset before and contains the matched phases and colors after matching 
+    The matched phases and colors are held by the returned match's bindings, the rule itself is not modified
+    If seed vertices (vertex indices) are given, only the neighborhood of those vertices that could be part of a match is searched
     """
-    def match_rule(self, rule: RewriteRule, apply: bool = False, generate_on_the_fly: bool = True) -> Optional[Dict[Vertex, Vertex]]:
+    def match_rule(self, rule: RewriteRule, apply: bool = False, generate_on_the_fly: bool = True, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Dict[Vertex, Vertex]]:
+        match = self.find_match(rule, generate_on_the_fly, seed_vertices)
+        if match is None:
+            return None
+
+        if apply:
+            self.apply_match(match)
+
+        return match.rule_to_diagram_map
+
+    """
+    Apply a match previously found by this or another matcher operating on the same diagram
+    """
+    def apply_match(self, match: Match):
+        self.rewriter.rewrite(match)
+
+    """
+    Find the first match of the given rule, see match_rule
+    """
+    def find_match(self, rule: RewriteRule, generate_on_the_fly: bool = True, seed_vertices: Optional[Iterable[int]] = None) -> Optional[Match]:
+        return next(self.__find_matches(rule, generate_on_the_fly, seed_vertices), None)
+
+    """
+    Find up to max_matches matches of the given rule (all if None), in the order they are generated
+    """
+    def find_matches(self, rule: RewriteRule, max_matches: Optional[int] = None, seed_vertices: Optional[Iterable[int]] = None) -> List[Match]:
+        return list(islice(self.__find_matches(rule, True, seed_vertices), max_matches))
+
+    """
+    Build the match for an embedding (diagram vertex indices by source spider index), e.g. one found by another process
+    searching an identical copy of the diagram, the embedding's inner wires are expected to be present
+    :returns None if the embedding doesn't match (colors, phases, connecting wires)
+    """
+    def match_embedding(self, rule: RewriteRule, embedding: List[int]) -> Optional[Match]:
+        return self.__check_embedding(rule, {s: self.diagram.g.vertex(embedding[int(s)]) for s in rule.source.g.vertices()})
+
+    """
+    Find a maximal set of matches of the given rule that can be applied one after another
+    Matches are selected greedily, a match is skipped if it contains a spider of or next to an already selected match
+    or if it is connected to a spider of an already selected match
+    """
+    def match_all(self, rule: RewriteRule, seed_vertices: Optional[Iterable[int]] = None) -> List[Match]:
+        selected_matches = []
+        blocked_vertices: Set[int] = set() # spiders of selected matches and their neighbors
+        selected_vertices: Set[int] = set() # spiders of selected matches
+
+        for match in self.__find_matches(rule, True, seed_vertices):
+            inner_vertices = {int(v) for v in match.rule_to_diagram_map.values()}
+            outer_vertices = {int(n.outer_neighbor) for neighbors in match.connecting_neighbors.values() for n in neighbors}
+            if not inner_vertices.isdisjoint(blocked_vertices) or not outer_vertices.isdisjoint(selected_vertices):
+                continue
+
+            selected_matches.append(match)
+            selected_vertices.update(inner_vertices)
+            blocked_vertices.update(inner_vertices)
+            blocked_vertices.update(outer_vertices)
+
+        return selected_matches
+
+    """
+    Apply all matches selected by match_all in a single batch
+    Removals are deferred until all matches have been applied, so the descriptors held by the matches stay valid
+    :returns the number of rewrites performed
+    """
+    def apply_all(self, rule: RewriteRule, seed_vertices: Optional[Iterable[int]] = None) -> int:
+        matches = self.match_all(rule, seed_vertices)
+
+        was_deferred = self.diagram.deferred_removal
+        self.diagram.set_deferred_removal(True)
+        for match in matches:
+            self.apply_match(match)
+        self.diagram.set_deferred_removal(was_deferred)
+
+        return len(matches)
+
+    """
+    Generate all matches of the given rule, each match carries its own bindings
+    """
+    def __find_matches(self, rule: RewriteRule, generate_on_the_fly: bool = True, seed_vertices: Optional[Iterable[int]] = None) -> Generator[Match, None, None]:
         source = rule.source
+        symmetry = get_rule_symmetry(rule) if self.use_symmetry_reduction else None
+        if symmetry is not None and len(symmetry.automorphisms) == 0:
+            symmetry = None
+
+        # check the candidate embeddings for additional properties
+        checked_cases = 0
+        for rule_to_diagram_map in self.__generate_embeddings(source, generate_on_the_fly, seed_vertices):
+            # embeddings equivalent to another one under the rule's symmetry yield the same rewrite
+            if symmetry is not None and not symmetry.is_canonical([int(rule_to_diagram_map[s]) for s in source.g.vertices()]):
+                continue
+
+            checked_cases += 1  # count for performance analysis
+
+            match = self.__check_embedding(rule, rule_to_diagram_map)
+            if match is not None:
+                yield match
+
+    """
+    Check the colors, phases and connecting wires of an embedding of the rule's source graph
+    :returns the resulting match, None if the embedding doesn't match
+    """
+    def __check_embedding(self, rule: RewriteRule, rule_to_diagram_map: Dict[Vertex, Vertex]) -> Optional[Match]:
+        source = rule.source
+
+        # check and resolve spider colors
+        bindings = self.__match_colors(source, rule_to_diagram_map, MatchBindings())
+        if bindings is None:
+            return None
+
+        # check and resolve spider phases
+        bindings = self.__match_phases(source, rule_to_diagram_map, bindings)
+        if bindings is None:
+            return None
+
+        # check and collect connecting wires to neighbors outside of rule
+        connecting_wires_match, source_spider_to_connected_diagram_neighbors_map = self.__match_connecting_wires(source, rule_to_diagram_map)
+        if not connecting_wires_match:
+            return None
+
+        return Match(rule, rule_to_diagram_map, source_spider_to_connected_diagram_neighbors_map, bindings)
+
+    """
+    Generate all embeddings of the structure's graph into the diagram (only checking labels: spiders, hadamard wires)
+    Uses the structure's compiled matcher if available, the generic subgraph isomorphism otherwise
+    """
+    def __generate_embeddings(self, source: RewriteStructure, generate_on_the_fly: bool, seed_vertices: Optional[Iterable[int]]) -> Generator[Dict[Vertex, Vertex], None, None]:
+        compiled = compile_structure(source) if self.use_compiled_matchers else None
+        if compiled is not None:
+            # any match containing a seed vertex has its anchor within the rule's spider count of the seed
+            anchor_candidates = self.__neighborhood(seed_vertices, source.g.num_vertices() - 1) if seed_vertices is not None else None
+            for embedding in compiled.embeddings(self.diagram, anchor_candidates, self.use_degree_seeding):
+                yield {s: self.diagram.g.vertex(embedding[int(s)]) for s in source.g.vertices()}
+            return
+
+        # labels exclude boundaries and, if the rule allows it, spiders of the wrong color / phase
+        labels = get_match_labels(source)
+        if labels.is_useful():
+            source_label_prop = source.g.new_vertex_property("int")
+            source_label_prop.a[:] = labels.structure_labels
+            label_type = "int"
+        else:
+            source_label_prop = source.generate_is_spider_property()
+            label_type = "bool"
+
+        if seed_vertices is None:
+            if not labels.is_useful():
+                target_graph = self.diagram.g
+                target_label_prop = self.diagram.generate_is_spider_property()
+            else:
+                target_graph = GraphView(self.diagram.g, vfilt=labels.candidate_mask(self.diagram))
+                target_label_prop = target_graph.new_vertex_property(label_type)
+                target_label_prop.a[:] = labels.diagram_labels(self.diagram)
+            target_hadamard_prop = self.diagram.hadamard_prop
+            target_to_diagram_index = None
+        else:
+            # a (connected) match containing a seed vertex can't reach further than the rule's spider count
+            # labels are only computed for the region, the search stays local
+            region = np.array(sorted(self.__neighborhood(seed_vertices, source.g.num_vertices() - 1)), dtype=int)
+            if not labels.is_useful():
+                region = region[(self.diagram.get_vertex_type_codes()[region] > VERTEX_TYPE_CODES[VERTEX_BOUNDARY]) & self.diagram.alive_prop.a[region].astype(bool)]
+                region_labels = np.ones(len(region), dtype=bool)
+            else:
+                region = region[labels.candidate_mask(self.diagram, region)]
+                region_labels = labels.diagram_labels(self.diagram, region)
+            target_graph, target_label_prop, target_hadamard_prop, target_to_diagram_index = self.__generate_region_graph(region.tolist(), region_labels, label_type)
 
         # search graph for subisomorphisms (generate on the fly, don't calculate all at once)
         isomorphism_generator: Generator[VertexPropertyMap] = subgraph_isomorphism(
             source.g,
-            self.diagram.g,
+            target_graph,
             max_n=0,
-            vertex_label=(rule.source.generate_is_spider_property(), self.diagram.generate_is_spider_property()), # True if spider -> exclude boundaries
-            edge_label=(rule.source.hadamard_prop, self.diagram.hadamard_prop),  # check hadamard prop
+            vertex_label=(source_label_prop, target_label_prop),
+            edge_label=(source.hadamard_prop, target_hadamard_prop),  # check hadamard prop
             generator=generate_on_the_fly
         )
 
-        # check those for additional properties
-        checked_cases = 0
         rule_to_diagram_index_map: VertexPropertyMap  # maps rule.source -> diagram
         for rule_to_diagram_index_map in isomorphism_generator:
             rule_to_diagram_map: Dict[Vertex, Vertex] = {}
             for s in source.g.vertices():
-                rule_to_diagram_map[s] = self.diagram.g.vertex(rule_to_diagram_index_map[s])
+                diagram_index = rule_to_diagram_index_map[s] if target_to_diagram_index is None else target_to_diagram_index[rule_to_diagram_index_map[s]]
+                rule_to_diagram_map[s] = self.diagram.g.vertex(diagram_index)
+            yield rule_to_diagram_map
 
-            checked_cases += 1  # count for performance analysis
-
-            # reset rule
-            rule.reset()
+    """
+    Collect all vertices reachable from the given vertices within the given distance
+    """
+    def __neighborhood(self, vertices: Iterable[int], distance: int) -> Set[int]:
+        region = set(int(v) for v in vertices)
+        frontier = region
+        for _ in range(distance):
+            next_frontier = set()
+            for v in frontier:
+                for n in self.diagram.g.vertex(v).all_neighbors():
+                    if int(n) not in region:
+                        next_frontier.add(int(n))
+            region.update(next_frontier)
+            frontier = next_frontier
+        return region
 
-            # check and resolve spider colors
-            if not self.__match_colors(source, rule_to_diagram_map):
-                continue
+    """
+    Build a standalone graph containing only the given region of the diagram (and the wires between region vertices)
+    Searching this graph instead of the entire diagram makes the cost of matching proportional to the size of the region
+    :param region: the diagram indices of the region, in ascending order
+    :param labels: vertex labels aligned with the region
+    :returns the region graph, its vertex and hadamard labels and a list mapping region graph indices to diagram indices
+    """
+    def __generate_region_graph(self, region: List[int], labels: np.ndarray, label_type: str) -> Tuple[Graph, VertexPropertyMap, EdgePropertyMap, List[int]]:
+        target_to_diagram_index = region
+        diagram_to_target_index = {v: i for i, v in enumerate(target_to_diagram_index)}
 
-            # check and resolve spider phases
-            if not self.__match_phases(source, rule_to_diagram_map):
-                continue
+        g = Graph(directed=False)
+        g.add_vertex(len(target_to_diagram_index))
+        label_prop = g.new_vertex_property(label_type)
+        label_prop.a[:] = labels
+        hadamard_prop = g.new_edge_property("bool")
 
-            # check and collect connecting wires to neighbors outside of rule
-            connecting_wires_match, source_spider_to_connected_diagram_neighbors_map = self.__match_connecting_wires(source, rule_to_diagram_map)
-            if not connecting_wires_match:
-                continue
+        added_wires = set()
+        for diagram_index, target_index in diagram_to_target_index.items():
+            diagram_vertex = self.diagram.g.vertex(diagram_index)
 
-            # Rewrite
-            if apply:
-                self.rewriter.rewrite(rule, rule_to_diagram_map, source_spider_to_connected_diagram_neighbors_map)
+            wire: Edge
+            for wire in diagram_vertex.all_edges():
+                wire_index = self.diagram.g.edge_index[wire]
+                if wire_index in added_wires:
+                    continue
+                wire_source, wire_target = int(wire.source()), int(wire.target())
+                if wire_source not in diagram_to_target_index or wire_target not in diagram_to_target_index:
+                    continue
 
-            return rule_to_diagram_map
+                added_wires.add(wire_index)
+                e = g.add_edge(diagram_to_target_index[wire_source], diagram_to_target_index[wire_target])
+                hadamard_prop[e] = self.diagram.is_wire_hadamard(wire)
 
-        return None
+        return g, label_prop, hadamard_prop, target_to_diagram_index
 
     """
     Checks and resolves all spider colors
+    :returns the extended bindings, None if a color doesn't match
     """
-    def __match_colors(self, source: RewriteStructure, rule_to_diagram_map: Dict[Vertex, Vertex]) -> bool:
+    def __match_colors(self, source: RewriteStructure, rule_to_diagram_map: Dict[Vertex, Vertex], bindings: MatchBindings) -> Optional[MatchBindings]:
         for spider in source.g.vertices():
-            if not source.spider_matches_color(spider, self.diagram.get_spider_color(rule_to_diagram_map[spider])):
-                return False
-        return True
+            bindings = source.spider_matches_color(spider, self.diagram.get_spider_color(rule_to_diagram_map[spider]), bindings)
+            if bindings is None:
+                return None
+        return bindings
 
     """
     Checks and resolves all spider phases
+    :returns the extended bindings, None if a phase doesn't match
     """
-    def __match_phases(self, source: RewriteStructure, rule_to_diagram_map: Dict[Vertex, Vertex]) -> bool:
+    def __match_phases(self, source: RewriteStructure, rule_to_diagram_map: Dict[Vertex, Vertex], bindings: MatchBindings) -> Optional[MatchBindings]:
         for spider in source.g.vertices():
-            if not source.spider_matches_phase(spider, self.diagram.get_spider_phase(rule_to_diagram_map[spider])):
-                return False
-        return True
+            bindings = source.spider_matches_phase(spider, self.diagram.get_spider_phase(rule_to_diagram_map[spider]), bindings)
+            if bindings is None:
+                return None
+        return bindings
 
 
     """
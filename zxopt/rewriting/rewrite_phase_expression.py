@@ -1,10 +1,12 @@
-
-
 """
 An expression in the phase of a spider of a rewrite structure
+Expressions are stateless, variable values are passed in when evaluating and returned as new bindings when matching
 """
 import abc
-from typing import Callable, Set
+from typing import TYPE_CHECKING, Callable, Set, Mapping, Optional
+
+if TYPE_CHECKING:
+    from zxopt.rewriting.match_bindings import MatchBindings
 
 
 class RewritePhaseExpression:
@@ -12,29 +14,26 @@ class RewritePhaseExpression:
         pass
 
     """
-    Evaluate this expression
-    will fail if some variables haven't resolved yet or the expression contains arbitrary statements
+    Evaluate this expression using the given variable values
+    will fail if some variables don't have a value or the expression contains arbitrary statements
     """
     @abc.abstractmethod
-    def evaluate(self) -> float:
+    def evaluate(self, values: Optional[Mapping["RewriteVariable", float]] = None) -> float:
         raise NotImplementedError()
 
     """
-    Check if the given value matches this expression
+    Check if the given value matches this expression, binding unbound variables if possible
+    :returns the (extended) bindings or None if the value doesn't match
     """
     @abc.abstractmethod
-    def matches(self, value: float, epsilon: float = 0.00001) -> bool:
-        raise NotImplementedError()
-
-    @abc.abstractmethod
-    def is_resolved(self) -> bool:
+    def match(self, value: float, bindings: "MatchBindings", epsilon: float = 0.00001) -> Optional["MatchBindings"]:
         raise NotImplementedError()
 
     """
-    Reset the expression before reuse, clearing out any set variables
+    Can this expression be evaluated using the given variable values?
     """
-    def reset(self):
-        pass
+    def is_resolved(self, values: Optional[Mapping["RewriteVariable", float]] = None) -> bool:
+        return all(v in values for v in self.variables()) if values is not None else len(self.variables()) == 0
 
     """
     Return all variables in this expression
@@ -46,40 +45,23 @@ class RewritePhaseExpression:
 
 """
 Represents a variable in a rewrite structure for capturing a value and applying it to the target rewrite structure
+The variable only serves as a key, its value is held by the bindings of a match
 """
 class RewriteVariable(RewritePhaseExpression):
-    resolved: bool # has this variable been resolved in the found subgraph / copied over from the source structure yet?
-    value: float
-
     def __init__(self):
         super().__init__()
 
-        self.resolved = False
-        self.value = 0.0
-
-    def evaluate(self) -> float:
-        if not self.resolved:
+    def evaluate(self, values: Optional[Mapping["RewriteVariable", float]] = None) -> float:
+        if values is None or self not in values:
             raise ValueError("This variable has not yet resolved")
         else:
-            return self.value
+            return values[self]
 
-    def matches(self, value: float, epsilon: float = 0.00001) -> bool:
-        if self.resolved:
-            return abs(value - self.value) < epsilon
+    def match(self, value: float, bindings: "MatchBindings", epsilon: float = 0.00001) -> Optional["MatchBindings"]:
+        if bindings.is_bound(self):
+            return bindings if abs(value - bindings.variable_values[self]) < epsilon else None
         else:
-            self.resolve(value)
-            return True
-
-    def is_resolved(self) -> bool:
-        return self.resolved
-
-    def resolve(self, value: float):
-        self.resolved = True
-        self.value = value
-
-    def reset(self):
-        self.resolved = False
-        self.value = 0.0
+            return bindings.with_variable(self, value)
 
     def variables(self) -> Set["RewriteVariable"]:
         return {self}
@@ -92,14 +74,11 @@ class ConstantExpression(RewritePhaseExpression):
         super().__init__()
         self.constant_value = value
 
-    def evaluate(self) -> float:
+    def evaluate(self, values: Optional[Mapping[RewriteVariable, float]] = None) -> float:
         return self.constant_value
 
-    def matches(self, value: float, epsilon: float = 0.00001) -> bool:
-        return abs(self.constant_value - value) < epsilon
-
-    def is_resolved(self) -> bool:
-        return True
+    def match(self, value: float, bindings: "MatchBindings", epsilon: float = 0.00001) -> Optional["MatchBindings"]:
+        return bindings if abs(self.constant_value - value) < epsilon else None
 
     def variables(self) -> Set[RewriteVariable]:
         return set()
@@ -115,18 +94,11 @@ class BinaryOperationExpression(RewritePhaseExpression):
         self.right_expr = right_expr
         self.operation = operation
 
-    def evaluate(self) -> float:
-        return self.operation(self.left_expr.evaluate(), self.right_expr.evaluate())
-
-    def matches(self, value: float, epsilon: float = 0.00001) -> bool:
-        return abs(self.evaluate() - value) < epsilon # TODO: this would be non deterministic and in its current form will prevent a such a rule from being applied in the inverse, non deterministic direction
-
-    def is_resolved(self) -> bool:
-        return self.left_expr.is_resolved() and self.right_expr.is_resolved()
+    def evaluate(self, values: Optional[Mapping[RewriteVariable, float]] = None) -> float:
+        return self.operation(self.left_expr.evaluate(values), self.right_expr.evaluate(values))
 
-    def reset(self):
-        self.left_expr.reset()
-        self.right_expr.reset()
+    def match(self, value: float, bindings: "MatchBindings", epsilon: float = 0.00001) -> Optional["MatchBindings"]:
+        return bindings if abs(self.evaluate(bindings.variable_values) - value) < epsilon else None # TODO: this would be non deterministic and in its current form will prevent a such a rule from being applied in the inverse, non deterministic direction
 
     def variables(self) -> Set[RewriteVariable]:
-        return self.left_expr.variables().union(self.right_expr.variables())
\ No newline at end of file
+        return self.left_expr.variables().union(self.right_expr.variables())
@@ -1,10 +1,13 @@
-from typing import Optional, Dict, Set, List, Union
+from typing import TYPE_CHECKING, Optional, Dict, Set, List, Union
 
 from graph_tool import Graph, VertexPropertyMap, EdgePropertyMap, Vertex, Edge
 
 from zxopt.data_structures.diagram.diagram import SPIDER_COLORS
 from zxopt.rewriting.rewrite_phase_expression import RewriteVariable, RewritePhaseExpression
 
+if TYPE_CHECKING:
+    from zxopt.rewriting.match_bindings import MatchBindings
+
 SPIDER_COLOR_WHITE = "white"
 SPIDER_COLOR_BLACK = "black"
 RULE_ONLY_SPIDER_COLORS = {SPIDER_COLOR_BLACK, SPIDER_COLOR_WHITE, "grey"} # black / white assignable, grey arbitrary
@@ -16,6 +19,7 @@ CONNECTING_WIRES_ANY = -1
 
 """
 Represents a rewrite rule specifying the source and target graphs as well as their properties and variable mappings
+Rules hold no matching state (see MatchBindings), a rule may therefore be matched concurrently
 """
 class RewriteRule:
     source: "RewriteStructure"
@@ -45,14 +49,7 @@ class RewriteRule:
             self.name = str(type(self))
 
     """
-    Reset all phase expression variables
-    """
-    def reset(self):
-        self.source.reset()
-        self.target.reset()
-
-    """
-    Return this rule's inverse, THEY SHARE REWRITE VARIABLES AND COLORS IN COMMON!
+    Return this rule's inverse, they share their structures and rewrite variables (which hold no state)
     """
     def inverse(self):
         if self.inverse_rule is None:
@@ -94,10 +91,9 @@ class RewriteStructure:
     spider_color_prop: VertexPropertyMap  # green, red, white, black
     spider_phase_prop: VertexPropertyMap  # phase expressions
     hadamard_prop: EdgePropertyMap
+    is_spider_prop: Optional[VertexPropertyMap] # cached, see generate_is_spider_property
     variables: Set[RewriteVariable]
 
-    assigned_spider_colors: Dict[str, Optional[str]]
-
     def __init__(self):
         self.g = Graph(directed=False)
 
@@ -106,14 +102,15 @@ class RewriteStructure:
         self.spider_color_prop = self.g.new_vertex_property("string")
         self.spider_phase_prop = self.g.new_vertex_property("object")
         self.hadamard_prop = self.g.new_edge_property("bool")
+        self.is_spider_prop = None
 
         self.variables = set()
-        self.reset()  # init self.assigned_spider_colors
 
     def add_spider(self, color: str, phase: RewritePhaseExpression, connecting_wires_count: int, conencting_wires_hadamard_count: int) -> Vertex:
         assert color in RULE_SPIDER_COLORS, "Invalid spider color"
 
         s = self.g.add_vertex()
+        self.is_spider_prop = None
         self.spider_color_prop[s] = color
         self.spider_phase_prop[s] = phase
         self.connecting_wires_prop[s] = connecting_wires_count
@@ -126,6 +123,7 @@ class RewriteStructure:
 
     def remove_spider(self, s: Vertex):
         self.g.remove_vertex(s)
+        self.is_spider_prop = None
         # variables NOT removed as they may be part of other spiders
 
     def add_wire(self, s1: Vertex, s2: Vertex, is_hadamard: bool) -> Edge:
@@ -138,49 +136,40 @@ class RewriteStructure:
 
     """
     Checks and resolves if the inputted color is assignable to the spider part of this rule
+    :returns the bindings with the spider's color resolved, None if the color doesn't match
     """
-    def spider_matches_color(self, spider: Vertex, color: str):
+    def spider_matches_color(self, spider: Vertex, color: str, bindings: "MatchBindings") -> Optional["MatchBindings"]:
         rule_spider_color: str = self.spider_color_prop[spider]
         if rule_spider_color in SPIDER_COLORS: # green, red
-            return rule_spider_color == color
+            return bindings if rule_spider_color == color else None
         elif rule_spider_color == "grey":
-            return True
+            return bindings
         elif rule_spider_color in RULE_ONLY_SPIDER_COLORS:
-            if OTHER_RULE_ONLY_SPIDER_COLOR[rule_spider_color] is not None and self.assigned_spider_colors[OTHER_RULE_ONLY_SPIDER_COLOR[rule_spider_color]] == color: # grey and white need to be different color
-                return False
+            if OTHER_RULE_ONLY_SPIDER_COLOR[rule_spider_color] is not None and bindings.spider_colors[OTHER_RULE_ONLY_SPIDER_COLOR[rule_spider_color]] == color: # grey and white need to be different color
+                return None
 
-            if self.assigned_spider_colors[rule_spider_color] is None:
-                self.assigned_spider_colors[rule_spider_color] = color
-                return True
+            if bindings.spider_colors[rule_spider_color] is None:
+                return bindings.with_color(rule_spider_color, color)
             else:
-                return self.assigned_spider_colors[rule_spider_color] == color
+                return bindings if bindings.spider_colors[rule_spider_color] == color else None
         else:
             raise AssertionError(f"Invalid spider color {color}")
 
     """
     Checks and resolves if the inputted phase is assignable to the spider part of this rule
-    Sets variable values of the rule accordingly
+    :returns the bindings with the spider's variables resolved accordingly, None if the phase doesn't match
     """
-    def spider_matches_phase(self, spider: Vertex, phase: float):
+    def spider_matches_phase(self, spider: Vertex, phase: float, bindings: "MatchBindings") -> Optional["MatchBindings"]:
         rule_spider_phase_expr: RewritePhaseExpression = self.spider_phase_prop[spider]
 
-        return rule_spider_phase_expr.matches(phase)
-
-    """
-    Reset assigned spider colors and phase expression variables
-    """
-    def reset(self):
-        self.assigned_spider_colors = {"white": None, "black": None, "green": "green", "red": "red"}
-
-        for v in self.variables:
-            v.reset()
-
+        return rule_spider_phase_expr.match(phase, bindings)
 
     """
-    Generate a map indicating for each vertex of the diagram, if it is a spider (True for all) 
+    Generate a map indicating for each vertex of the diagram, if it is a spider (True for all)
+    The map is cached until the structure's spiders change
     """
     def generate_is_spider_property(self):
-        prop = self.g.new_vertex_property("bool")
-        for s in self.g.vertices():
-            prop[s] = True
-        return prop
\ No newline at end of file
+        if self.is_spider_prop is None:
+            self.is_spider_prop = self.g.new_vertex_property("bool")
+            self.is_spider_prop.a[:] = True
+        return self.is_spider_prop
\ No newline at end of file
@@ -1,38 +1,79 @@
+from bisect import bisect_left
 from typing import Dict, List
 
 from graph_tool import Vertex, Edge
 
 from zxopt.data_structures.diagram import Diagram
-from zxopt.data_structures.diagram.diagram import OTHER_SPIDER_COLOR
 from zxopt.rewriting import RewriteRule, RewritePhaseExpression
-from zxopt.rewriting.matcher import ConnectingNeighbor
-from zxopt.rewriting.rewrite_rule import SPIDER_COLOR_WHITE, SPIDER_COLOR_BLACK
+from zxopt.rewriting.match import Match
+
+
+"""
+The inverse of a performed rewrite: the spiders and wires it added and the spiders it removed (hidden by deferred removal)
+"""
+class RewriteJournalEntry:
+    match: Match # the applied match, used for redoing the rewrite
+    added_vertices: List[int]
+    added_wires: List[Edge]
+    removed_vertices: List[int]
+
+    def __init__(self, match: Match, added_vertices: List[int], added_wires: List[Edge], removed_vertices: List[int]):
+        self.match = match
+        self.added_vertices = added_vertices
+        self.added_wires = added_wires
+        self.removed_vertices = removed_vertices
 
 
 class Rewriter:
     diagram: Diagram
+    removed_vertices: List[int]  # indices of the vertices removed by the last rewrite (before removal)
+    touched_vertices: List[int]  # indices of the vertices added or reconnected by the last rewrite (after removal)
+
+    # journaling: every rewrite records its inverse, allowing to roll rewrites back (and redo them) without cloning the diagram
+    journaling: bool
+    journal: List[RewriteJournalEntry] # performed rewrites, the latest last
+    redo_journal: List[RewriteJournalEntry] # rolled back rewrites, the latest rolled back last
+    journal_modification_count: int # the diagram's modification count after the last journaled operation
+    added_wires: List[Edge] # wires added by the current rewrite
 
-    def __init__(self, diagram: Diagram):
+    def __init__(self, diagram: Diagram, journaling: bool = False):
         self.diagram = diagram
+        self.removed_vertices = []
+        self.touched_vertices = []
+
+        self.journaling = journaling
+        self.journal = []
+        self.redo_journal = []
+        self.journal_modification_count = diagram.modification_count
+        self.added_wires = []
 
         self.test_qubit_index = 0
 
-    def rewrite(self, rule: RewriteRule, source_to_diagram_map: Dict[Vertex, Vertex], source_spider_to_connected_diagram_neighbors_map: Dict[Vertex, List[ConnectingNeighbor]]):
+    """
+    Perform the rewrite described by the given match
+    When journaling, the diagram has to use deferred removal, removed spiders then stay available for rolling back
+    """
+    def rewrite(self, match: Match):
+        if self.journaling:
+            assert self.diagram.deferred_removal, "Journaling requires deferred removal"
+            self.__check_journal()
+            self.redo_journal = []
+        self.added_wires = []
+        vertex_count_before = self.diagram.get_vertex_index_count()
+
+        rule = match.rule
+        source_to_diagram_map = match.rule_to_diagram_map
+        source_spider_to_connected_diagram_neighbors_map = match.connecting_neighbors
         source = rule.source
         target = rule.target
 
         diagram_source_rule_spiders = [source_to_diagram_map[s] for s in source.g.vertices()]
 
         # resolve variables from source to target
-        for source_variable in rule.variable_mapping:
-            target_variable = rule.variable_mapping[source_variable]
-            target_variable.resolve(source_variable.evaluate())
+        target_variable_values = {rule.variable_mapping[v]: value for v, value in match.bindings.variable_values.items() if v in rule.variable_mapping}
 
         # resolve unknown colors
-        if rule.source.assigned_spider_colors[SPIDER_COLOR_WHITE] is None and rule.source.assigned_spider_colors[SPIDER_COLOR_BLACK] is not None:
-            rule.source.assigned_spider_colors[SPIDER_COLOR_WHITE] = OTHER_SPIDER_COLOR[rule.source.assigned_spider_colors[SPIDER_COLOR_BLACK]]
-        if rule.source.assigned_spider_colors[SPIDER_COLOR_BLACK] is None and rule.source.assigned_spider_colors[SPIDER_COLOR_WHITE] is not None:
-            rule.source.assigned_spider_colors[SPIDER_COLOR_BLACK] = OTHER_SPIDER_COLOR[rule.source.assigned_spider_colors[SPIDER_COLOR_WHITE]]
+        spider_colors = match.bindings.resolved_colors()
 
 
         # spiders are removed later as this would invalidate the vertex descriptors used for identifying connecting neighbors
@@ -45,13 +86,13 @@ class Rewriter:
             qubit_index = self.get_qubit_index_for_rewritten_spider(target_spiders, rule, source_to_diagram_map)
 
             # determine color
-            new_color = source.assigned_spider_colors[target.spider_color_prop[target_spiders]]
+            new_color = spider_colors[target.spider_color_prop[target_spiders]]
             if not new_color:
                 raise ValueError(f"Color {target.spider_color_prop[target_spiders]} has not been resolved yet, cannot assign")
 
             # determine phase
             new_phase_expression: RewritePhaseExpression = target.spider_phase_prop[target_spiders]
-            new_phase = new_phase_expression.evaluate()
+            new_phase = new_phase_expression.evaluate(target_variable_values)
 
             # create target spider
             new_diagram_spider = self.diagram.add_spider(phase=new_phase, color=new_color, origin_qubit_index=qubit_index)
@@ -64,7 +105,7 @@ class Rewriter:
             new_wire_target = target_to_diagram_map[target_wire.target()]
             new_wire_is_hadamard = target.hadamard_prop[target_wire]
 
-            new_diagram_wire = self.diagram.add_wire(new_wire_source, new_wire_target, new_wire_is_hadamard)
+            new_diagram_wire = self.__add_wire(new_wire_source, new_wire_target, new_wire_is_hadamard)
 
         # Connect outer wires
         for source_spider in source_spider_to_connected_diagram_neighbors_map:
@@ -86,12 +127,12 @@ class Rewriter:
                             neighbors_to_be_processed.remove(connected_diagram_neighbor)  # only first occurence
 
                             new_wire_is_hadamard = connected_diagram_neighbor.is_hadamard ^ connected_diagram_neighbor.should_be_flipped
-                            self.diagram.add_wire(new_diagram_spider, connected_diagram_neighbor.outer_neighbor, is_hadamard=new_wire_is_hadamard)
+                            self.__add_wire(new_diagram_spider, connected_diagram_neighbor.outer_neighbor, is_hadamard=new_wire_is_hadamard)
                 else:
                     new_diagram_spider = target_to_diagram_map[target_spiders]
                     for connected_diagram_neighbor in connected_diagram_neighbors:
                         new_wire_is_hadamard = connected_diagram_neighbor.is_hadamard ^ connected_diagram_neighbor.should_be_flipped
-                        self.diagram.add_wire(new_diagram_spider, connected_diagram_neighbor.outer_neighbor, is_hadamard=new_wire_is_hadamard)
+                        self.__add_wire(new_diagram_spider, connected_diagram_neighbor.outer_neighbor, is_hadamard=new_wire_is_hadamard)
             else:
                 # Connect outer wires if there are no spiders left in the target (e.g. ZX S2 rule)
                 # ONLY DO THIS ONCE PER PAIR, otherwise will yield duplicate wires
@@ -102,10 +143,89 @@ class Rewriter:
                         n2 = connected_diagram_neighbors[i2]
                         new_wire_is_hadamard = n1.is_hadamard ^ n1.should_be_flipped ^ n2.is_hadamard ^ n2.should_be_flipped
                         if n1 != n2:
-                            self.diagram.add_wire(n1.outer_neighbor, n2.outer_neighbor, is_hadamard=new_wire_is_hadamard)
+                            self.__add_wire(n1.outer_neighbor, n2.outer_neighbor, is_hadamard=new_wire_is_hadamard)
+
+        # remember which part of the diagram has been changed, used for incremental matching
+        touched_vertices = {int(v) for v in target_to_diagram_map.values()}
+        for connected_diagram_neighbors in source_spider_to_connected_diagram_neighbors_map.values():
+            touched_vertices.update(int(n.outer_neighbor) for n in connected_diagram_neighbors)
+
+        self.removed_vertices = sorted(int(v) for v in diagram_source_rule_spiders)
+        touched_vertices.difference_update(self.removed_vertices)
 
         self.diagram.remove_spiders(diagram_source_rule_spiders) # also removes inner as well as connecting, outer wires
 
+        if self.diagram.deferred_removal:
+            self.touched_vertices = sorted(touched_vertices) # removed spiders are only hidden, indices remain valid
+        else:
+            # removal shifts all vertex indices behind a removed vertex
+            self.touched_vertices = sorted(v - bisect_left(self.removed_vertices, v) for v in touched_vertices)
+
+        if self.journaling:
+            added_vertices = list(range(vertex_count_before, self.diagram.get_vertex_index_count()))
+            self.journal.append(RewriteJournalEntry(match, added_vertices, self.added_wires, self.removed_vertices))
+            self.journal_modification_count = self.diagram.modification_count
+
+    """
+    Undo the last n journaled rewrites (latest first), the diagram must not have been modified otherwise in between
+    :returns the number of rewrites rolled back, less than n if the journal is exhausted
+    """
+    def rollback(self, n: int = 1) -> int:
+        self.__check_journal()
+
+        rolled_back = 0
+        while rolled_back < n and len(self.journal) > 0:
+            entry = self.journal.pop()
+
+            # wires between surviving vertices have to be removed explicitly, the others disappear with the added spiders
+            # the added spiders are the last ones, dropping them for good lets redoing the rewrites reproduce the same indices
+            added_vertices = set(entry.added_vertices)
+            for wire in reversed(entry.added_wires):
+                if int(wire.source()) not in added_vertices and int(wire.target()) not in added_vertices:
+                    self.diagram.remove_wire(wire)
+            if len(entry.added_vertices) > 0:
+                self.diagram.truncate_vertices(entry.added_vertices[0])
+            self.diagram.restore_vertices(entry.removed_vertices)
+
+            self.redo_journal.append(entry)
+            rolled_back += 1
+
+        self.journal_modification_count = self.diagram.modification_count
+        return rolled_back
+
+    """
+    Perform the last n rolled back rewrites again
+    :returns the number of rewrites redone
+    """
+    def redo(self, n: int = 1) -> int:
+        self.__check_journal()
+
+        redone = 0
+        while redone < n and len(self.redo_journal) > 0:
+            redo_journal = self.redo_journal
+            entry = redo_journal.pop()
+            self.rewrite(entry.match) # clears the redo journal
+            self.redo_journal = redo_journal
+            redone += 1
+        return redone
+
+    """
+    Forget all journaled rewrites, e.g. before compacting the diagram (which invalidates the journal)
+    """
+    def clear_journal(self):
+        self.journal = []
+        self.redo_journal = []
+        self.journal_modification_count = self.diagram.modification_count
+
+    def __check_journal(self):
+        if self.diagram.modification_count != self.journal_modification_count:
+            raise RuntimeError("The diagram has been modified outside of the rewriter, the journal is no longer valid")
+
+    def __add_wire(self, s1: Vertex, s2: Vertex, is_hadamard: bool) -> Edge:
+        wire = self.diagram.add_wire(s1, s2, is_hadamard)
+        self.added_wires.append(wire)
+        return wire
+
 
     def get_qubit_index_for_rewritten_spider(self, target_spider: Vertex, rule: RewriteRule, source_to_diagram_map: Dict[Vertex, Vertex]) -> int:
         source_spiders = [s for s in rule.connecting_wires_spider_mapping if rule.connecting_wires_spider_mapping[s] == target_spider or (type(rule.connecting_wires_spider_mapping[s]) == list and target_spider in rule.connecting_wires_spider_mapping[s])]
@@ -0,0 +1,158 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from graph_tool import Edge, VertexPropertyMap
+from graph_tool.topology import subgraph_isomorphism
+
+from zxopt.rewriting.rewrite_phase_expression import RewriteVariable, RewritePhaseExpression
+from zxopt.rewriting.rewrite_rule import RewriteRule
+
+SYMMETRY_PHASE_EPSILON = 0.00001
+SYMMETRY_TEST_SEED = 0 # phases the target is evaluated with when checking a variable permutation
+
+"""
+The automorphisms of a rule's source structure that don't change the result of a rewrite
+An embedding composed with such an automorphism matches the same spiders and yields the same rewrite,
+therefore only one embedding per orbit (the canonical one, see is_canonical) has to be checked.
+
+A permutation of the source spiders qualifies if it preserves the inner wires (with their hadamard states), the colors,
+the connecting wire counts and targets and the phases: constants have to be equal, variables are permuted
+if all target phases evaluate the same after permuting the variable values (e.g. alpha + beta when fusing spiders)
+"""
+class RuleSymmetry:
+    rule: RewriteRule
+    automorphisms: List[List[int]] # permutations of the source spiders by spider index, the identity excluded
+
+    def __init__(self, rule: RewriteRule):
+        self.rule = rule
+        self.automorphisms = []
+
+        for permutation in self.__graph_automorphisms():
+            if permutation == list(range(len(permutation))):
+                continue
+            variable_permutation = self.__variable_permutation(permutation)
+            if variable_permutation is not None and self.__preserves_target_phases(variable_permutation):
+                self.automorphisms.append(permutation)
+
+    """
+    Is the given embedding (diagram vertex indices by source spider index) the lexicographically smallest one of its orbit?
+    """
+    def is_canonical(self, embedding: List[int]) -> bool:
+        for permutation in self.automorphisms:
+            permuted = [embedding[permutation[s]] for s in range(len(embedding))]
+            if permuted < embedding:
+                return False
+        return True
+
+    """
+    Automorphisms of the source graph preserving everything about a spider except for its phase
+    """
+    def __graph_automorphisms(self) -> List[List[int]]:
+        source = self.rule.source
+        g = source.g
+        if g.num_vertices() == 0:
+            return []
+
+        signatures: Dict[Tuple, int] = {}
+        label_prop = g.new_vertex_property("int")
+        for s in g.vertices():
+            signature = (
+                source.spider_color_prop[s],
+                source.connecting_wires_prop[s],
+                source.connecting_wires_hadamard_prop[s],
+                self.__connecting_wires_target(s)
+            )
+            label_prop[s] = signatures.setdefault(signature, len(signatures))
+
+        wires = self.__wire_multiset(list(range(g.num_vertices())))
+        automorphisms = []
+        mapping: VertexPropertyMap
+        for mapping in subgraph_isomorphism(g, g, max_n=0, vertex_label=(label_prop, label_prop), edge_label=(source.hadamard_prop, source.hadamard_prop)):
+            permutation = [int(mapping[s]) for s in g.vertices()]
+            # the isomorphism is not induced, parallel wires have to be checked explicitly
+            if self.__wire_multiset(permutation) == wires:
+                automorphisms.append(permutation)
+        return automorphisms
+
+    def __wire_multiset(self, permutation: List[int]) -> Counter:
+        source = self.rule.source
+        wires = Counter()
+        wire: Edge
+        for wire in source.g.edges():
+            s, t = permutation[int(wire.source())], permutation[int(wire.target())]
+            wires[(min(s, t), max(s, t), bool(source.hadamard_prop[wire]))] += 1
+        return wires
+
+    def __connecting_wires_target(self, s) -> Optional[Tuple[int, ...]]:
+        target = self.rule.connecting_wires_spider_mapping.get(s)
+        if target is None:
+            return None
+        if type(target) == list:
+            return tuple(int(t) for t in target)
+        return (int(target),)
+
+    """
+    The permutation of the source variables induced by the spider permutation
+    :returns None if the phases aren't compatible
+    """
+    def __variable_permutation(self, permutation: List[int]) -> Optional[Dict[RewriteVariable, RewriteVariable]]:
+        source = self.rule.source
+        variable_permutation: Dict[RewriteVariable, RewriteVariable] = {}
+
+        for s in range(len(permutation)):
+            phase: RewritePhaseExpression = source.spider_phase_prop[source.g.vertex(s)]
+            other_phase: RewritePhaseExpression = source.spider_phase_prop[source.g.vertex(permutation[s])]
+
+            if len(phase.variables()) == 0 and len(other_phase.variables()) == 0:
+                if abs(other_phase.evaluate() - phase.evaluate()) >= SYMMETRY_PHASE_EPSILON:
+                    return None
+            elif isinstance(phase, RewriteVariable) and isinstance(other_phase, RewriteVariable):
+                # the spider placed on the diagram spider of permutation[s] captures the value of its variable
+                if variable_permutation.setdefault(phase, other_phase) is not other_phase:
+                    return None
+            elif phase is not other_phase:
+                return None
+
+        if len(set(variable_permutation.values())) != len(variable_permutation):
+            return None
+        return variable_permutation
+
+    """
+    Check that the target phases don't change if each source variable captures the value of its image instead
+    """
+    def __preserves_target_phases(self, variable_permutation: Dict[RewriteVariable, RewriteVariable]) -> bool:
+        if len(variable_permutation) == 0:
+            return True
+
+        variables = sorted(self.rule.source.variables, key=id)
+        values = np.random.default_rng(SYMMETRY_TEST_SEED).uniform(0.0, 2.0 * np.pi, len(variables))
+        assignment = {v: values[i] for i, v in enumerate(variables)}
+        permuted_assignment = {v: assignment[variable_permutation.get(v, v)] for v in variables}
+
+        try:
+            phases = self.__target_phases(assignment)
+            permuted_phases = self.__target_phases(permuted_assignment)
+        except ValueError: # the target depends on something not captured from the source
+            return False
+
+        distance = np.abs(np.mod(phases - permuted_phases, 2.0 * np.pi))
+        return bool((np.minimum(distance, 2.0 * np.pi - distance) < SYMMETRY_PHASE_EPSILON).all())
+
+    def __target_phases(self, assignment: Dict[RewriteVariable, float]) -> np.ndarray:
+        target_values = {self.rule.variable_mapping[v]: value for v, value in assignment.items() if v in self.rule.variable_mapping}
+
+        target = self.rule.target
+        return np.array([target.spider_phase_prop[s].evaluate(target_values) for s in target.g.vertices()], dtype=float)
+
+
+_rule_symmetries: "WeakKeyDictionary[RewriteRule, RuleSymmetry]" = WeakKeyDictionary()
+
+"""
+The symmetry of the given rule, computed once, the rule must not be modified afterwards
+"""
+def get_rule_symmetry(rule: RewriteRule) -> RuleSymmetry:
+    if rule not in _rule_symmetries:
+        _rule_symmetries[rule] = RuleSymmetry(rule)
+    return _rule_symmetries[rule]
@@ -1,4 +1,7 @@
+from typing import Union
+
 from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram_snapshot import DiagramSnapshot
 
 
 class GraphLikeTransformer:
@@ -19,8 +22,9 @@ class GraphLikeTransformer:
     """
     Replace all red (X) spiders by green (Z) spiders
     Duplicate hadamards are automatically resolved via the toggeling mechanism of the edges' hadamard status
+    Works on snapshots as well, the diagram's structure isn't changed
     """
-    def eliminate_red_spiders(self, diagram: Diagram) -> int:
+    def eliminate_red_spiders(self, diagram: Union[Diagram, DiagramSnapshot]) -> int:
         spiders_removed = 0
         for x_spider in diagram.get_spiders_by_color("red"):
             diagram.set_spider_color(x_spider, "green")
@@ -19,14 +19,13 @@ class ParallelLoopEdgeRemover:
     """
     def remove_parallel_edges(self):
         matcher = Matcher(self.diagram)
+        # created once, the compiled matchers and symmetries are cached per rule instance
+        rules = [ParallelNormalEdgeRule(), ParallelSingleHadEdgeRule(), ParallelDoubleHadEdgeRule(), ZXRuleHopfLaw()]
 
         while True:
-            normal_matched = matcher.match_rule(ParallelNormalEdgeRule(), apply=True)
-            single_matched = matcher.match_rule(ParallelSingleHadEdgeRule(), apply=True)
-            double_matched = matcher.match_rule(ParallelDoubleHadEdgeRule(), apply=True)
-            hopf_law_matched = matcher.match_rule(ZXRuleHopfLaw(), apply=True)
+            matched = [matcher.match_rule(rule, apply=True) for rule in rules]
 
-            if normal_matched is None and single_matched is None and double_matched is None and hopf_law_matched is None:
+            if all(m is None for m in matched):
                 break
 
     """
@@ -50,7 +49,7 @@ class ParallelLoopEdgeRemover:
             w = self_edges[0]
             if self.diagram.is_wire_hadamard(w):
                 self.diagram.set_spider_phase(w.source(), np.pi)
-            self.diagram.g.remove_edge(w)
+            self.diagram.remove_wire(w)
 
 
 
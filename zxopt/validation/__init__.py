@@ -3,9 +3,14 @@
 __all__ = [
     "CircuitUnitaryExtractor",
     "DiagramLinearExtractor",
-    "validate_operation_equality"
+    "DiagramStabilizerExtractor",
+    "StabilizerTableau",
+    "validate_operation_equality",
+    "validate_stabilizer_equality"
 ]
 
 from zxopt.validation.circuit_unitary_extractor import CircuitUnitaryExtractor
 from zxopt.validation.diagram_linear_extractor import DiagramLinearExtractor
+from zxopt.validation.diagram_stabilizer_extractor import DiagramStabilizerExtractor, validate_stabilizer_equality
+from zxopt.validation.stabilizer_tableau import StabilizerTableau
 from zxopt.validation.operation_equality import validate_operation_equality
@@ -9,19 +9,77 @@ from zxopt.util import Loggable
 PROJECTOR_ZERO = np.array([1,0]).reshape(2,1) @ np.array([1,0]).reshape(1,2)  # |0><0| = [[1,0],[0,0]]
 PROJECTOR_ONE = np.array([0,1]).reshape(2,1) @ np.array([0,1]).reshape(1,2)  # |1><1| = [[0,0],[0,1]]
 
+EXTRACTION_MODE_KRONECKER = "kronecker" # build the full matrix of every step using kronecker products, O(8^n) per step
+EXTRACTION_MODE_STATEVECTOR = "statevector" # apply every gate to the columns of the unitary along its qubit's axis, O(4^n) per gate
+
 
 class CircuitUnitaryExtractor(Loggable):
     circuit: Circuit
     qubit_count: int
+    mode: str
 
-    def __init__(self, circuit: Circuit):
+    def __init__(self, circuit: Circuit, mode: str = EXTRACTION_MODE_STATEVECTOR):
         super(CircuitUnitaryExtractor, self).__init__()
         self.circuit = circuit
         self.qubit_count = len(circuit.get_quantum_bits())
         self.qubits = circuit.get_quantum_bits()
         self.qubit_indicies = { self.qubits[i]: i for i in range(len(self.qubits))}
+        self.mode = mode
 
     def extract_matrix(self):
+        if self.mode == EXTRACTION_MODE_STATEVECTOR:
+            return self.apply_to_states(np.identity(2 ** self.qubit_count, dtype=complex))
+        elif self.mode == EXTRACTION_MODE_KRONECKER:
+            return self.extract_matrix_kronecker()
+        else:
+            raise ValueError(f"Unknown extraction mode {self.mode}")
+
+    """
+    Apply the circuit to a single state vector of size 2^n
+    """
+    def apply_to_state(self, state: np.ndarray) -> np.ndarray:
+        return self.apply_to_states(state.reshape(-1, 1)).reshape(-1)
+
+    """
+    Apply the circuit to a batch of state vectors, given as the columns of a 2^n x batch matrix
+    The states are never multiplied with a full matrix, every gate only acts on the axis of its qubit
+    """
+    def apply_to_states(self, states: np.ndarray) -> np.ndarray:
+        batch_size = states.shape[1]
+        states = states.astype(complex).reshape((2,) * self.qubit_count + (batch_size,))  # qubit i -> axis i, like kron
+
+        for step in range(self.circuit.step_count()):
+            for gate in self.circuit.get_components_by_step(step):
+                if isinstance(gate, GateComponent):
+                    states = self.apply_gate(states, gate)
+
+        return states.reshape(2 ** self.qubit_count, batch_size)
+
+    """
+    Apply a single gate to states given as a tensor with one axis per qubit (and a trailing batch axis)
+    """
+    def apply_gate(self, states: np.ndarray, gate: GateComponent) -> np.ndarray:
+        target_axis = self.qubit_indicies[gate.target_qubit]
+
+        if len(gate.control_bits) == 0:
+            return self.apply_on_axis(states, gate.gate_type.matrix, target_axis)
+
+        assert len(gate.control_bits) == 1, "Cannot deal with gates using more than one control (yet)"
+        control_axis = self.qubit_indicies[next(iter(gate.control_bits))]
+
+        # only the part of the states where the control is 1 is affected
+        triggered = [slice(None)] * states.ndim
+        triggered[control_axis] = 1
+        triggered = tuple(triggered)
+
+        states = states.copy()
+        states[triggered] = self.apply_on_axis(states[triggered], gate.gate_type.matrix, target_axis if target_axis < control_axis else target_axis - 1)
+        return states
+
+    def apply_on_axis(self, states: np.ndarray, matrix: np.ndarray, axis: int) -> np.ndarray:
+        return np.moveaxis(np.tensordot(matrix, states, axes=([1], [axis])), 0, axis)
+
+    def extract_matrix_kronecker(self):
         circuit = self.circuit
 
         transformation = np.identity(2 ** self.qubit_count)
@@ -0,0 +1,123 @@
+import functools
+from typing import Tuple, List, Dict, Set
+
+CONTRACTION_STRATEGY_NONE = "none" # contract wires by label, the order they have been assigned in
+CONTRACTION_STRATEGY_GREEDY = "greedy" # always contract the wire yielding the smallest tensor
+CONTRACTION_STRATEGY_MIN_FILL = "min_fill" # min fill-in elimination ordering on the wire interaction graph (treewidth heuristic)
+
+CONTRACTION_PLAN_CACHE_SIZE = 128
+
+"""
+The order in which the wires of a tensor network are contracted as well as the resulting cost
+"""
+class ContractionPlan:
+    order: List[int] # all positive wire labels, in the order they are contracted, as expected by ncon
+    peak_size: int # number of entries of the largest tensor occurring during the contraction
+
+    def __init__(self, order: List[int], peak_size: int):
+        self.order = order
+        self.peak_size = peak_size
+
+
+"""
+Plan the contraction of a tensor network given in ncon notation (a tuple of wire labels per tensor, positive labels are contracted)
+Plans are cached by network structure, diagrams with the same topology therefore only get planned once
+"""
+@functools.lru_cache(maxsize=CONTRACTION_PLAN_CACHE_SIZE)
+def plan_contraction(network_structure: Tuple[Tuple[int, ...], ...], strategy: str = CONTRACTION_STRATEGY_GREEDY) -> ContractionPlan:
+    network = _TensorNetworkSimulation(network_structure)
+
+    if strategy == CONTRACTION_STRATEGY_NONE:
+        for label in sorted(network.remaining_labels()):
+            if label in network.remaining_labels(): # may have been contracted alongside an earlier wire
+                network.contract(label)
+    elif strategy == CONTRACTION_STRATEGY_GREEDY:
+        while len(network.remaining_labels()) > 0:
+            network.contract(min(network.remaining_labels(), key=lambda l: (network.result_legs(l), l)))
+    elif strategy == CONTRACTION_STRATEGY_MIN_FILL:
+        while len(network.remaining_labels()) > 0:
+            network.contract(min(network.remaining_labels(), key=lambda l: (network.fill_in(l), network.result_legs(l), l)))
+    else:
+        raise ValueError(f"Unknown contraction strategy {strategy}")
+
+    network.finish()
+    return ContractionPlan(network.order, 2 ** network.peak_legs)
+
+
+"""
+Tracks the legs of all tensors while contracting, contracting a wire contracts all wires shared by the two tensors (like ncon)
+"""
+class _TensorNetworkSimulation:
+    tensors: Dict[int, List[int]] # tensor id -> wire labels
+    tensors_by_label: Dict[int, Set[int]] # positive wire label -> tensor ids
+    order: List[int]
+    peak_legs: int
+    next_tensor_id: int
+
+    def __init__(self, network_structure: Tuple[Tuple[int, ...], ...]):
+        self.tensors = {i: list(labels) for i, labels in enumerate(network_structure)}
+        self.tensors_by_label = {}
+        for i, labels in self.tensors.items():
+            for label in labels:
+                if label > 0:
+                    self.tensors_by_label.setdefault(label, set()).add(i)
+
+        self.order = []
+        self.peak_legs = max([len(labels) for labels in network_structure], default=0)
+        self.next_tensor_id = len(network_structure)
+
+    def remaining_labels(self) -> Set[int]:
+        return self.tensors_by_label.keys()
+
+    def result_legs(self, label: int) -> int:
+        return len(self.__result(label))
+
+    """
+    Number of wire pairs that will share a tensor after contracting the given wire but don't yet
+    """
+    def fill_in(self, label: int) -> int:
+        ids = self.tensors_by_label[label]
+        if len(ids) == 1:
+            return 0
+        a, b = [set(l for l in self.tensors[i] if l > 0) for i in ids]
+        common = a & b
+        fill = 0
+        for l1 in a - common:
+            neighbors = set()
+            for i in self.tensors_by_label[l1]:
+                neighbors.update(self.tensors[i])
+            fill += len((b - common) - neighbors)
+        return fill
+
+    def contract(self, label: int):
+        ids = self.tensors_by_label[label]
+        result = self.__result(label)
+
+        contracted = set()
+        for i in ids:
+            contracted.update(l for l in self.tensors[i] if l > 0 and l not in result)
+            del self.tensors[i]
+        for l in contracted:
+            del self.tensors_by_label[l]
+
+        new_id = self.next_tensor_id
+        self.next_tensor_id += 1
+        self.tensors[new_id] = result
+        for l in result:
+            if l > 0:
+                self.tensors_by_label[l] = (self.tensors_by_label[l] - ids) | {new_id}
+
+        self.order.append(label)
+        self.order.extend(sorted(contracted - {label}))
+        self.peak_legs = max(self.peak_legs, len(result))
+
+    """
+    The remaining tensors are combined using outer products
+    """
+    def finish(self):
+        self.peak_legs = max(self.peak_legs, sum(len(labels) for labels in self.tensors.values()))
+
+    def __result(self, label: int) -> List[int]:
+        ids = self.tensors_by_label[label]
+        legs = [l for i in ids for l in self.tensors[i]]
+        return [l for l in legs if l < 0 or legs.count(l) == 1]
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Dict, Tuple
 
 import numpy as np
 import tensornetwork
@@ -6,93 +6,106 @@ from graph_tool import Edge, Vertex
 
 from zxopt.data_structures.circuit import HadamardGateType
 from zxopt.data_structures.diagram import Diagram
+from zxopt.data_structures.diagram.diagram_snapshot import DiagramSnapshot
 from zxopt.simplification.graph_like import GraphLikeTransformer
 from zxopt.util import Loggable
+from zxopt.validation.contraction_planner import plan_contraction, CONTRACTION_STRATEGY_GREEDY
 
 HADAMARD_TENSOR = HadamardGateType().matrix
 
 class DiagramLinearExtractor(Loggable):
     diagram: Diagram
     qubit_count: int
+    contraction_strategy: str
+    max_intermediate_size: Optional[int]  # refuse to contract if the planned peak tensor size exceeds this
 
-    def __init__(self, diagram: Diagram):
+    def __init__(self, diagram: Diagram, contraction_strategy: str = CONTRACTION_STRATEGY_GREEDY, max_intermediate_size: Optional[int] = None):
         super(DiagramLinearExtractor, self).__init__()
         self.diagram = diagram
         self.qubit_count = len(diagram.get_inputs())
-
+        self.contraction_strategy = contraction_strategy
+        self.max_intermediate_size = max_intermediate_size
+
+    """
+    Contract the diagram to the matrix of its linear map (outputs x inputs)
+    The diagram is not modified or copied: red spiders are recolored in a snapshot,
+    hadamard wires and direct input to output wires become tensors of the network only
+    """
     def extract_matrix(self):
-        # replace X by Z nodes (easier to calculate tensors for)
-        diagram = self.diagram.clone()
+        # replace X by Z nodes (easier to calculate tensors for), only recorded in the snapshot
+        diagram = DiagramSnapshot(self.diagram)
         GraphLikeTransformer().eliminate_red_spiders(diagram)
-
-        # replace hadamard wires by nodes
         graph = diagram.g
-        hadamard_wires: List[Edge] = [w for w in graph.edges() if diagram.is_wire_hadamard(w)]
-        hadamard_nodes = []
-        for wire in hadamard_wires:
-            node = graph.add_vertex(1)
-            hadamard_nodes.append(node)
-            graph.add_edge(wire.source(), node)
-            graph.add_edge(node, wire.target())
-
-            graph.remove_edge(wire)
-
-        # in case there is a direct wire from in to output, no node will be on the wire and therefore no contraction will be performed
-        # -> add identity tensor manually
-        for input in self.diagram.get_inputs():
-            for wire in input.all_edges():
-                if wire.source() in self.diagram.get_outputs() or wire.target() in self.diagram.get_outputs():
-                    new_identity_node = diagram.add_spider(0.0, "green")
-                    diagram.add_wire(wire.source(), new_identity_node)
-                    diagram.add_wire(wire.target(), new_identity_node)
-                    diagram.remove_wire(wire)
 
-        # Calculate node tensors
-        tensor_property = graph.new_vertex_property("object")
-
-        node: Vertex
-        for node in graph.vertices():
-            if node in hadamard_nodes:
-                tensor_property[node] = HADAMARD_TENSOR
-                continue
-            if diagram.is_spider(node): # exclude inputs/outputs
-                assert diagram.get_spider_color(node) == "green"
-                # assumes no duplicate wires
-                legs = len(list(node.all_neighbors()))
-                tensor_property[node] = self.generate_z_tensor(legs, diagram.get_spider_phase(node))
+        inputs = diagram.get_inputs()
+        outputs = diagram.get_outputs()
+        inputs.sort(key=lambda b: diagram.get_boundary_index(b))
+        outputs.sort(key=lambda b: diagram.get_boundary_index(b))
 
+        # Boundary wire indices, outputs first
+        boundary_labels: Dict[int, int] = {int(b): -(i + 1) for i, b in enumerate(outputs + inputs)}
 
-        # Determine wire indices
-        wire_index_property = graph.new_edge_property("int")
+        # Determine wire indices, a hadamard wire is a hadamard tensor with a different index at each end
+        tensors = []
+        wires_by_tensor: List[Tuple[int, ...]] = []
+        end_labels: Dict[Tuple[int, int], int] = {} # (wire index, 0 for source / 1 for target) -> wire index of the network
         indexed_wires = 0
 
         wire: Edge
         for wire in graph.edges():
-            if not diagram.is_boundary(wire.source()) and not diagram.is_boundary(wire.target()):
-                wire_index_property[wire] = indexed_wires + 1
+            ends = [wire.source(), wire.target()]
+            labels = [boundary_labels.get(int(v)) for v in ends]
+
+            if diagram.is_wire_hadamard(wire):
+                for end in range(2):
+                    if labels[end] is None:
+                        indexed_wires += 1
+                        labels[end] = indexed_wires
+                tensors.append(HADAMARD_TENSOR)
+                wires_by_tensor.append(tuple(labels))
+            elif labels[0] is not None and labels[1] is not None:
+                # in case there is a direct wire from in to output, no node will be on the wire -> identity tensor
+                tensors.append(np.identity(2))
+                wires_by_tensor.append(tuple(labels))
+            elif labels[0] is not None or labels[1] is not None:
+                labels = [labels[0] if labels[0] is not None else labels[1]] * 2
+            else:
                 indexed_wires += 1
+                labels = [indexed_wires] * 2
 
-        inputs = diagram.get_inputs()
-        outputs = diagram.get_outputs()
-        inputs.sort(key=lambda b: diagram.get_boundary_index(b))
-        outputs.sort(key=lambda b: diagram.get_boundary_index(b))
-
-        # Boundary wire indices
-        current_boundary_index = -1
-        for i in range(len(outputs)):
-            wire_index_property[next(outputs[i].all_edges())] = current_boundary_index
-            current_boundary_index -= 1
-        for i in range(len(inputs)):
-            wire_index_property[next(inputs[i].all_edges())] = current_boundary_index
-            current_boundary_index -= 1
+            wire_index = graph.edge_index[wire]
+            end_labels[(wire_index, 0)] = labels[0]
+            end_labels[(wire_index, 1)] = labels[1]
 
-        # prepare ncon call
-        tensor_nodes = [n for n in graph.vertices() if not diagram.is_boundary(n)]
-        tensors = [tensor_property[n] for n in tensor_nodes]
-        wires_by_tensor = [tuple([wire_index_property[wire] for wire in n.all_edges()]) for n in tensor_nodes]
+        # Calculate node tensors
+        node: Vertex
+        for node in graph.vertices():
+            if not diagram.is_spider(node): # exclude inputs/outputs
+                continue
+            assert diagram.get_spider_color(node) == "green"
+
+            legs = []
+            visited_self_loops = set()
+            for wire in node.all_edges():
+                wire_index = graph.edge_index[wire]
+                if wire.source() == wire.target(): # self loops are listed once per end
+                    end = 1 if wire_index in visited_self_loops else 0
+                    visited_self_loops.add(wire_index)
+                else:
+                    end = 0 if wire.source() == node else 1
+                legs.append(end_labels[(wire_index, end)])
+
+            tensors.append(self.generate_z_tensor(len(legs), diagram.get_spider_phase(node)))
+            wires_by_tensor.append(tuple(legs))
+
+        # plan contraction order (cached by topology)
+        plan = plan_contraction(tuple(wires_by_tensor), self.contraction_strategy)
+        self.log.debug(f"Contracting {len(tensors)} tensors, predicted peak intermediate size: {plan.peak_size}")
+        if self.max_intermediate_size is not None and plan.peak_size > self.max_intermediate_size:
+            raise ValueError(f"Contraction would require an intermediate tensor of size {plan.peak_size}, the limit is {self.max_intermediate_size}")
 
         # contract tensor network
-        contraction = tensornetwork.ncon(tensors, wires_by_tensor)
+        contraction = tensornetwork.ncon(tensors, wires_by_tensor, con_order=plan.order)
         result = contraction.reshape((2**len(outputs), 2**len(inputs)))
 
         return result
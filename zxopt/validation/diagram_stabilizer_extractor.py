@@ -0,0 +1,117 @@
+from collections import deque
+from typing import Dict, List, Tuple
+
+import numpy as np
+from graph_tool import Vertex
+
+from zxopt.data_structures.diagram import Diagram
+from zxopt.util import Loggable
+from zxopt.validation.stabilizer_tableau import StabilizerTableau, spider_tableau
+
+CLIFFORD_PHASE_EPSILON = 0.00001
+
+"""
+Extracts the stabilizer tableau of a Clifford diagram (all phases are multiples of pi/2)
+The diagram is interpreted as a state on its outputs followed by its inputs (the Choi state of the linear map)
+Contraction is performed wire by wire on the tableau, which is polynomial in the size of the diagram
+"""
+class DiagramStabilizerExtractor(Loggable):
+    diagram: Diagram
+
+    def __init__(self, diagram: Diagram):
+        super(DiagramStabilizerExtractor, self).__init__()
+        self.diagram = diagram
+
+    def is_clifford(self) -> bool:
+        quarter_turns = self.diagram.get_phases()[self.diagram.get_spider_mask()] / (np.pi / 2.0)
+        return bool((np.abs(quarter_turns - np.round(quarter_turns)) <= CLIFFORD_PHASE_EPSILON).all())
+
+    """
+    Returns the canonical tableau of the diagram, two diagrams represent the same linear map (up to a scalar)
+    if and only if their tableaus are equal, see validate_stabilizer_equality
+    """
+    def extract_tableau(self) -> StabilizerTableau:
+        assert self.is_clifford(), "Only Clifford diagrams can be represented by a stabilizer tableau"
+
+        diagram = self.diagram
+        g = diagram.g
+
+        # the legs (wire ends) by vertex, a leg is identified by the wire index and the end of the wire
+        legs_by_vertex: Dict[int, List[Tuple[int, int]]] = {int(v): [] for v in g.vertices()}
+        wire_is_hadamard: Dict[int, bool] = {}
+        for wire in g.edges():
+            wire_index = g.edge_index[wire]
+            legs_by_vertex[int(wire.source())].append((wire_index, 0))
+            legs_by_vertex[int(wire.target())].append((wire_index, 1))
+            wire_is_hadamard[wire_index] = diagram.is_wire_hadamard(wire)
+
+        tableau = StabilizerTableau(0)
+        qubit_labels: List[object] = [] # what each qubit of the tableau represents, a leg or a boundary
+
+        # visiting vertices along the wires keeps the number of open legs (and therefore the tableau) small
+        for v in self.__traversal_order():
+            vertex = g.vertex(v)
+            legs = legs_by_vertex[v]
+
+            if diagram.is_boundary(vertex):
+                # a boundary is an identity with one open and one connected leg
+                spider_tableau(tableau, len(legs) + 1, 0, False)
+                qubit_labels.append(("boundary", v))
+            else:
+                quarter_turns = int(round(diagram.get_spider_phase(vertex) / (np.pi / 2.0)))
+                spider_tableau(tableau, len(legs), quarter_turns, diagram.get_spider_color(vertex) == "red")
+            qubit_labels.extend(legs)
+
+            # contract all wires whose other end already exists
+            for wire_index, end in legs:
+                other_leg = (wire_index, 1 - end)
+                if (wire_index, end) not in qubit_labels or other_leg not in qubit_labels:
+                    continue  # already contracted (self loop) or other end not yet visited
+
+                q1 = qubit_labels.index((wire_index, end))
+                q2 = qubit_labels.index(other_leg)
+                if wire_is_hadamard[wire_index]:
+                    tableau.hadamard(q1)
+                tableau.contract(q1, q2)
+
+                for q in sorted([q1, q2], reverse=True):
+                    del qubit_labels[q]
+
+        # order the remaining qubits like the rows and columns of the linear map: outputs, then inputs by qubit index
+        outputs = sorted(diagram.get_outputs(), key=lambda b: diagram.get_boundary_index(b))
+        inputs = sorted(diagram.get_inputs(), key=lambda b: diagram.get_boundary_index(b))
+        order = np.array([qubit_labels.index(("boundary", int(b))) for b in outputs + inputs], dtype=int)
+
+        return tableau.permuted(order).canonical()
+
+    """
+    Breadth first traversal starting at the inputs, covering all connected components
+    """
+    def __traversal_order(self) -> List[int]:
+        g = self.diagram.g
+        start_vertices = [int(v) for v in self.diagram.get_inputs()] + [int(v) for v in g.vertices()]
+
+        visited = set()
+        order = []
+        for start in start_vertices:
+            if start in visited:
+                continue
+            visited.add(start)
+            queue = deque([start])
+            while len(queue) > 0:
+                v = queue.popleft()
+                order.append(v)
+                n: Vertex
+                for n in g.vertex(v).all_neighbors():
+                    if int(n) not in visited:
+                        visited.add(int(n))
+                        queue.append(int(n))
+
+        return order
+
+
+"""
+Check if two tableaus extracted from diagrams represent the same linear map up to a scalar
+"""
+def validate_stabilizer_equality(t1: StabilizerTableau, t2: StabilizerTableau) -> bool:
+    return t1.equals(t2)
@@ -1,37 +1,50 @@
 import numpy as np
 
+RANDOM_INPUT_SAMPLES = 100
 
-def validate_operation_equality(m1: np.ndarray, m2: np.ndarray, epsilon: float = 0.00001) -> bool:
+
+"""
+Check if two operators are equal (up to normalization and global phase)
+By default, random inputs are run through both operators and the resulting output probabilities are compared
+If exact is set, the matrices themselves are compared up to a global scalar, which also detects relative phases
+"""
+def validate_operation_equality(m1: np.ndarray, m2: np.ndarray, epsilon: float = 0.00001, exact: bool = False, samples: int = RANDOM_INPUT_SAMPLES) -> bool:
     if m1.shape != m2.shape:
         return False
 
-    shape = m1.shape
-
-    # run random inputs through it and check
-    for i in range(100):
-        input = np.random.rand(shape[0]) + np.random.rand(shape[0]) * 1j   # not normalized, nor are the matricies
-        out1 = m1 @ input # TODO: normalize (the circuit one should already be normalized)
-        out2 = m2 @ input
+    if exact:
+        return validate_operation_equality_exact(m1, m2, epsilon)
 
-        # normalize using np.linalg.norm
+    # all random inputs at once, one column per input
+    inputs = np.random.rand(m1.shape[1], samples) + np.random.rand(m1.shape[1], samples) * 1j # not normalized, nor are the matricies
+    probs1 = _output_probabilities(m1 @ inputs)
+    probs2 = _output_probabilities(m2 @ inputs)
 
-        probs1 = np.conj(out1) * out1
-        probs2 = np.conj(out2) * out2
+    return bool(np.max(np.abs(probs1 - probs2), initial=0.0) <= epsilon)
 
-        # can I just normalize the ouput as their square has to sum up to 1?
-        probs1 /= np.sum(probs1)
-        probs2 /= np.sum(probs2)
+"""
+Check if m2 = c * m1 for some complex scalar c
+"""
+def validate_operation_equality_exact(m1: np.ndarray, m2: np.ndarray, epsilon: float = 0.00001) -> bool:
+    if m1.shape != m2.shape:
+        return False
 
-        # TODO: doesn't normalize out global phase
+    # the largest entry determines the scalar most accurately
+    pivot = np.unravel_index(np.argmax(np.abs(m1)), m1.shape)
+    scale = np.abs(m1[pivot])
+    if scale < epsilon:
+        return bool((np.abs(m2) < epsilon).all())
 
-        for i in range(probs1.shape[0]):
-            if np.abs(probs1[i] - probs2[i]) > epsilon:
-                return False
+    m1 = m1 / m1[pivot]
+    m2 = m2 / m2[pivot] if np.abs(m2[pivot]) >= epsilon * scale else m2 / scale
 
-        # TODO
-        # generate random measurement operator
-        # measure once
-        # ensure equality
+    return bool((np.abs(m1 - m2) < epsilon).all())
 
-    return True
+"""
+Normalize each output column to a probability distribution, zero outputs stay zero
+"""
+def _output_probabilities(outputs: np.ndarray) -> np.ndarray:
+    probs = np.abs(outputs) ** 2
+    sums = np.sum(probs, axis=0)
+    return probs / np.where(sums > 0, sums, 1.0)
 
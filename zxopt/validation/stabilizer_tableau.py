@@ -0,0 +1,230 @@
+from typing import Optional
+
+import numpy as np
+
+"""
+Stabilizer tableau of a (not normalized) pure stabilizer state as described in
+"Improved Simulation of Stabilizer Circuits" by Aaronson and Gottesman
+Stabilizer and destabilizer rows are stored separately, row i represents (-1)^r * P_1 ... P_n with P_j = X^x_j Z^z_j (both set is Y)
+Destabilizer phases are not tracked as they are not required for postselection
+
+In addition to the unitary Clifford gates, qubits can be postselected on |0> and removed, this allows contracting ZX diagrams
+If a postselection has probability zero, the state (and therefore the diagram) is zero
+"""
+class StabilizerTableau:
+    stabilizer_x: np.ndarray
+    stabilizer_z: np.ndarray
+    stabilizer_r: np.ndarray
+    destabilizer_x: np.ndarray
+    destabilizer_z: np.ndarray
+    is_zero: bool
+
+    def __init__(self, qubit_count: int = 0):
+        self.stabilizer_x = np.zeros((qubit_count, qubit_count), dtype=bool)
+        self.stabilizer_z = np.identity(qubit_count, dtype=bool)
+        self.stabilizer_r = np.zeros(qubit_count, dtype=bool)
+        self.destabilizer_x = np.identity(qubit_count, dtype=bool)
+        self.destabilizer_z = np.zeros((qubit_count, qubit_count), dtype=bool)
+        self.is_zero = False
+
+    def qubit_count(self) -> int:
+        return self.stabilizer_x.shape[1]
+
+    """
+    Append qubits in the |0> state, returns the index of the first new qubit
+    """
+    def add_qubits(self, count: int) -> int:
+        first = self.qubit_count()
+        n = first + count
+
+        def extend(old: np.ndarray, new_block: np.ndarray) -> np.ndarray:
+            extended = np.zeros((n, n), dtype=bool)
+            extended[:first, :first] = old
+            extended[first:, first:] = new_block
+            return extended
+
+        self.stabilizer_x = extend(self.stabilizer_x, np.zeros((count, count), dtype=bool))
+        self.stabilizer_z = extend(self.stabilizer_z, np.identity(count, dtype=bool))
+        self.stabilizer_r = np.concatenate([self.stabilizer_r, np.zeros(count, dtype=bool)])
+        self.destabilizer_x = extend(self.destabilizer_x, np.identity(count, dtype=bool))
+        self.destabilizer_z = extend(self.destabilizer_z, np.zeros((count, count), dtype=bool))
+
+        return first
+
+    def hadamard(self, q: int):
+        self.stabilizer_r ^= self.stabilizer_x[:, q] & self.stabilizer_z[:, q]
+        for x, z in ((self.stabilizer_x, self.stabilizer_z), (self.destabilizer_x, self.destabilizer_z)):
+            x[:, q], z[:, q] = z[:, q].copy(), x[:, q].copy()
+
+    def phase(self, q: int):
+        self.stabilizer_r ^= self.stabilizer_x[:, q] & self.stabilizer_z[:, q]
+        self.stabilizer_z[:, q] ^= self.stabilizer_x[:, q]
+        self.destabilizer_z[:, q] ^= self.destabilizer_x[:, q]
+
+    def cnot(self, control: int, target: int):
+        x, z = self.stabilizer_x, self.stabilizer_z
+        self.stabilizer_r ^= x[:, control] & z[:, target] & ~(x[:, target] ^ z[:, control])
+        for x, z in ((self.stabilizer_x, self.stabilizer_z), (self.destabilizer_x, self.destabilizer_z)):
+            x[:, target] ^= x[:, control]
+            z[:, control] ^= z[:, target]
+
+    """
+    Project the given qubit onto |0> and remove it from the state
+    """
+    def postselect_zero_and_remove(self, q: int):
+        anticommuting = np.flatnonzero(self.stabilizer_x[:, q])
+
+        if len(anticommuting) > 0:
+            # random outcome, choose 0
+            p = anticommuting[0]
+            for i in anticommuting[1:]:
+                self.__multiply_stabilizer(i, p)
+            destabilizers = np.flatnonzero(self.destabilizer_x[:, q])
+            destabilizers = destabilizers[destabilizers != p]
+            self.destabilizer_x[destabilizers] ^= self.stabilizer_x[p]
+            self.destabilizer_z[destabilizers] ^= self.stabilizer_z[p]
+
+            self.destabilizer_x[p], self.destabilizer_z[p] = self.stabilizer_x[p].copy(), self.stabilizer_z[p].copy()
+            self.stabilizer_x[p] = False
+            self.stabilizer_z[p] = False
+            self.stabilizer_z[p, q] = True
+            self.stabilizer_r[p] = False
+        else:
+            # deterministic outcome, Z_q is the product of all stabilizers whose destabilizers anticommute with it
+            # combine them into a single stabilizer p and adjust the destabilizers to remain the dual basis
+            involved = np.flatnonzero(self.destabilizer_x[:, q])
+            p = involved[0]
+            for j in involved[1:]:
+                self.__multiply_stabilizer(p, j)
+                self.destabilizer_x[j] ^= self.destabilizer_x[p]
+                self.destabilizer_z[j] ^= self.destabilizer_z[p]
+
+            if self.stabilizer_r[p]:
+                self.is_zero = True # outcome 1 for sure, projecting onto |0> yields zero
+
+        self.__remove(p, q)
+
+    """
+    Contract two qubits with each other (postselect onto the bell state |00> + |11> and remove them)
+    """
+    def contract(self, q1: int, q2: int):
+        self.cnot(q1, q2)
+        self.hadamard(q1)
+        self.postselect_zero_and_remove(q1)
+        self.postselect_zero_and_remove(q2 if q2 < q1 else q2 - 1)
+
+    """
+    Returns an equivalent tableau whose stabilizer rows are in reduced row echelon form
+    Two states are equal up to a scalar if and only if their canonical stabilizers are equal
+    """
+    def canonical(self) -> "StabilizerTableau":
+        canonical = StabilizerTableau(0)
+        canonical.is_zero = self.is_zero
+        canonical.stabilizer_x = self.stabilizer_x.copy()
+        canonical.stabilizer_z = self.stabilizer_z.copy()
+        canonical.stabilizer_r = self.stabilizer_r.copy()
+        canonical.destabilizer_x = np.zeros((0, self.qubit_count()), dtype=bool)  # not required for comparisons
+        canonical.destabilizer_z = np.zeros((0, self.qubit_count()), dtype=bool)
+
+        n = self.qubit_count()
+        row = 0
+        for column in range(2 * n):
+            bits = canonical.stabilizer_x[:, column] if column < n else canonical.stabilizer_z[:, column - n]
+            candidates = np.flatnonzero(bits[row:]) + row
+            if len(candidates) == 0:
+                continue
+
+            pivot = candidates[0]
+            canonical.__swap_stabilizers(row, pivot)
+            bits = canonical.stabilizer_x[:, column] if column < n else canonical.stabilizer_z[:, column - n]
+            for i in np.flatnonzero(bits):
+                if i != row:
+                    canonical.__multiply_stabilizer(i, row)
+
+            row += 1
+            if row == len(canonical.stabilizer_r):
+                break
+
+        return canonical
+
+    def equals(self, other: "StabilizerTableau") -> bool:
+        if self.is_zero or other.is_zero:
+            return self.is_zero == other.is_zero
+        if self.qubit_count() != other.qubit_count():
+            return False
+
+        a = self.canonical()
+        b = other.canonical()
+        return (a.stabilizer_x == b.stabilizer_x).all() and (a.stabilizer_z == b.stabilizer_z).all() and (a.stabilizer_r == b.stabilizer_r).all()
+
+    """
+    Returns the tableau with its qubits reordered, qubit i of the result is qubit order[i] of this tableau
+    """
+    def permuted(self, order: np.ndarray) -> "StabilizerTableau":
+        permuted = StabilizerTableau(0)
+        permuted.is_zero = self.is_zero
+        permuted.stabilizer_x = self.stabilizer_x[:, order]
+        permuted.stabilizer_z = self.stabilizer_z[:, order]
+        permuted.stabilizer_r = self.stabilizer_r.copy()
+        permuted.destabilizer_x = self.destabilizer_x[:, order]
+        permuted.destabilizer_z = self.destabilizer_z[:, order]
+        return permuted
+
+    """
+    stabilizer h := stabilizer i * stabilizer h, see rowsum in Aaronson, Gottesman
+    """
+    def __multiply_stabilizer(self, h: int, i: int):
+        x1, z1 = self.stabilizer_x[i].astype(np.int8), self.stabilizer_z[i].astype(np.int8)
+        x2, z2 = self.stabilizer_x[h].astype(np.int8), self.stabilizer_z[h].astype(np.int8)
+
+        # exponent of i picked up by multiplying the single qubit paulis
+        g = np.where(x1 & z1, z2 - x2, 0) \
+            + np.where(x1 & (1 - z1), z2 * (2 * x2 - 1), 0) \
+            + np.where((1 - x1) & z1, x2 * (1 - 2 * z2), 0)
+        exponent = (2 * int(self.stabilizer_r[h]) + 2 * int(self.stabilizer_r[i]) + int(np.sum(g))) % 4
+
+        self.stabilizer_r[h] = exponent == 2
+        self.stabilizer_x[h] ^= self.stabilizer_x[i]
+        self.stabilizer_z[h] ^= self.stabilizer_z[i]
+
+    def __swap_stabilizers(self, i: int, j: int):
+        if i == j:
+            return
+        for a in (self.stabilizer_x, self.stabilizer_z, self.stabilizer_r):
+            a[[i, j]] = a[[j, i]]
+
+    """
+    Remove row pair p (whose stabilizer is +-Z_q) and qubit q
+    """
+    def __remove(self, p: int, q: int):
+        self.stabilizer_x = np.delete(np.delete(self.stabilizer_x, p, axis=0), q, axis=1)
+        self.stabilizer_z = np.delete(np.delete(self.stabilizer_z, p, axis=0), q, axis=1)
+        self.stabilizer_r = np.delete(self.stabilizer_r, p)
+        self.destabilizer_x = np.delete(np.delete(self.destabilizer_x, p, axis=0), q, axis=1)
+        self.destabilizer_z = np.delete(np.delete(self.destabilizer_z, p, axis=0), q, axis=1)
+
+
+"""
+Create the tableau of the state of a spider with the given number of legs and phase (multiple of pi/2)
+Z spider: |0...0> + e^(i * quarter_turns * pi/2) |1...1>, X spider: hadamard on every leg
+:returns None if the spider is the zero scalar (no legs, phase pi)
+"""
+def spider_tableau(tableau: StabilizerTableau, legs: int, quarter_turns: int, is_x_spider: bool) -> Optional[int]:
+    quarter_turns %= 4
+    if legs == 0:
+        if quarter_turns == 2:
+            tableau.is_zero = True
+        return None
+
+    first = tableau.add_qubits(legs)
+    tableau.hadamard(first)
+    for _ in range(quarter_turns):
+        tableau.phase(first)
+    for q in range(first + 1, first + legs):
+        tableau.cnot(first, q)
+
+    if is_x_spider:
+        for q in range(first, first + legs):
+            tableau.hadamard(q)
+
+    return first
@@ -12,7 +12,7 @@ from gi.repository import Rsvg
 import cairo
 from graph_tool.draw import graph_draw
 
-from zxopt.data_structures.diagram.diagram import VERTEX_BOUNDARY, INPUT, VERTEX_SPIDER_GREEN, Diagram
+from zxopt.data_structures.diagram.diagram import INPUT, Diagram
 from zxopt.visualization.render_util import to_cairo_color
 from zxopt.visualization.renderer import Renderer
 
@@ -74,7 +74,7 @@ class DiagramRenderer(Renderer):
         vertex_labels = g.new_vertex_property("string")
         vertex_fill_colors = g.new_vertex_property("string")
         for v in g.vertices():
-            if self.diagram.vertex_type_prop[v] == VERTEX_BOUNDARY:
+            if self.diagram.is_boundary(v):
                 vertex_labels[v] = "I" if self.diagram.boundary_type_prop[v] == INPUT else "O"
                 vertex_fill_colors[v] = BOUNDARY_COLOR
             else:
@@ -82,7 +82,7 @@ class DiagramRenderer(Renderer):
                 # if phase == "1.0":
                 #     phase = "π"
                 vertex_labels[v] = phase
-                if self.diagram.vertex_type_prop[v] == VERTEX_SPIDER_GREEN:
+                if self.diagram.get_spider_color(v) == "green":
                     vertex_fill_colors[v] = GREEN_SPIDER_COLOR
                 else:
                     vertex_fill_colors[v] = RED_SPIDER_COLOR